@@ -1,25 +1,36 @@
 """The Omnilogic integration."""
 import logging
 
+import aiohttp
+
 _LOGGER = logging.getLogger(__name__)
-_LOGGER.setLevel(logging.DEBUG)
 
 from omnilogic import LoginException, OmniLogic, OmniLogicException
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 
-from .common import OmniLogicUpdateCoordinator
+from .common import (
+    OmniLogicUpdateCoordinator,
+    configured_polling_interval,
+    options_requiring_reload,
+)
 from .const import (
-    CONF_SCAN_INTERVAL,
+    CONNECTION_STATS,
     COORDINATOR,
-    DEFAULT_SCAN_INTERVAL,
     DOMAIN,
+    HTTP_SESSION,
     OMNI_API,
+    SIGNAL_TELEMETRY_UPDATED,
 )
+from .services import async_register_services, async_remove_services
+from .session import create_session
+from .tracing import Tracer
+from .websocket_api import async_register_websocket_commands
 
 PLATFORMS = [
     Platform.SENSOR,
@@ -37,48 +48,116 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     username = conf[CONF_USERNAME]
     password = conf[CONF_PASSWORD]
 
-    polling_interval = conf.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    polling_interval = configured_polling_interval(entry)
 
-    session = aiohttp_client.async_get_clientsession(hass)
+    tracer = Tracer(hass, entry.entry_id)
+    tracer.async_apply_options(entry.options)
+    session, connection_stats = create_session(hass, [tracer.trace_config()])
 
     api = OmniLogic(username, password, session)
+    tracer.instrument(api)
 
     try:
-        await api.connect()
-        await api.get_telemetry_data()
-    except LoginException as error:
-        _LOGGER.error("Login Failed: %s", error)
-        _LOGGER.error("Authentication failed with email: %s. Check your credentials and ensure you're using the correct email address.", username)
-        return False
-    except OmniLogicException as error:
-        _LOGGER.error("OmniLogic API error: %s", error)
-        _LOGGER.debug("API error details: Connection attempt with email: %s", username)
-        raise ConfigEntryNotReady from error
-
-    coordinator = OmniLogicUpdateCoordinator(
-        hass=hass,
-        api=api,
-        name="Omnilogic",
-        config_entry=entry,
-        polling_interval=polling_interval,
-    )
-    await coordinator.async_config_entry_first_refresh()
-
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
-        COORDINATOR: coordinator,
-        OMNI_API: api,
-    }
-
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        try:
+            await api.connect()
+            await api.get_telemetry_data()
+        except LoginException as error:
+            await session.close()
+            _LOGGER.error(
+                "Login failed, check the email address and password of the entry: %s",
+                error,
+            )
+            return False
+        except (OmniLogicException, aiohttp.ClientError, TimeoutError) as error:
+            # Home Assistant logs this once and retries quietly.
+            raise ConfigEntryNotReady(f"OmniLogic API error: {error}") from error
+
+        coordinator = OmniLogicUpdateCoordinator(
+            hass=hass,
+            api=api,
+            session=session,
+            name="Omnilogic",
+            config_entry=entry,
+            polling_interval=polling_interval,
+            tracer=tracer,
+        )
+        await coordinator.runtime.async_load()
+        await coordinator.command_latency.async_load()
+        if coordinator.statistics is not None:
+            await coordinator.statistics.async_load()
+        await coordinator.async_config_entry_first_refresh()
+
+        # Register the backyards first so BOW sub-devices can be linked to them.
+        device_registry = dr.async_get(hass)
+        for item_id, node in coordinator.topology.items():
+            if item_id == node.backyard_id:
+                device_registry.async_get_or_create(
+                    config_entry_id=entry.entry_id, **node.device_info
+                )
+
+        hass.data.setdefault(DOMAIN, {})
+        hass.data[DOMAIN][entry.entry_id] = {
+            COORDINATOR: coordinator,
+            OMNI_API: api,
+            HTTP_SESSION: session,
+            CONNECTION_STATS: connection_stats,
+        }
+
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except BaseException:
+        # Unload never runs for an entry that failed to set up, so nothing else
+        # would close the session.
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        await session.close()
+        raise
+
+    @callback
+    def async_telemetry_updated() -> None:
+        """Let websocket subscribers know the telemetry was updated."""
+        async_dispatcher_send(hass, SIGNAL_TELEMETRY_UPDATED, entry.entry_id)
+
+    entry.async_on_unload(coordinator.async_add_listener(async_telemetry_updated))
+    coordinator.load_shedder.async_start()
+    entry.async_on_unload(coordinator.load_shedder.async_stop)
+    async_register_websocket_commands(hass)
+    async_register_services(hass)
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options, reloading only when the running entry cannot."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    api = entry_data[OMNI_API]
+    coordinator = entry_data[COORDINATOR]
+
+    if (
+        entry.data[CONF_USERNAME] != api.username
+        or entry.data[CONF_PASSWORD] != api.password
+        or options_requiring_reload(entry) != coordinator.setup_options
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    coordinator.async_apply_options()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        data[COORDINATOR].refresh_planner.async_shutdown()
+        await data[COORDINATOR].runtime.async_save()
+        await data[COORDINATOR].command_latency.async_save()
+        if data[COORDINATOR].history is not None:
+            await data[COORDINATOR].history.async_close()
+        if data[COORDINATOR].statistics is not None:
+            data[COORDINATOR].statistics.async_flush()
+            await data[COORDINATOR].statistics.async_save()
+        await data[HTTP_SESSION].close()
+        async_remove_services(hass)
 
     return unload_ok
@@ -0,0 +1,134 @@
+"""Compiled accessors for nested Omnilogic telemetry fields."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+ITEM = "item"
+BOW = "bow"
+BACKYARD = "backyard"
+
+ANCHORS = {
+    ITEM: lambda item_id: item_id,
+    BOW: lambda item_id: item_id[:4],
+    BACKYARD: lambda item_id: item_id[:2],
+}
+
+Accessor = Callable[[dict, tuple], Any]
+
+
+class FieldPath:
+    """A telemetry field declared by an entity description.
+
+    The path starts at the entity's own item, its BOW or its backyard and walks the
+    given keys. The converter is applied to the value found at the end of the path.
+    """
+
+    __slots__ = ("anchor", "keys", "converter")
+
+    def __init__(
+        self,
+        *keys: str,
+        converter: Callable[[Any], Any] | None = None,
+        anchor: str = ITEM,
+    ) -> None:
+        """Initialize the field path."""
+        self.anchor = anchor
+        self.keys = keys
+        self.converter = converter
+
+
+def yes_no(value: Any) -> bool:
+    """Convert a yes/no telemetry flag to a boolean."""
+    return value == "yes"
+
+
+def compile_path(path: FieldPath) -> Accessor:
+    """Compile a field path into a function that returns None for missing fields."""
+    resolve = ANCHORS[path.anchor]
+    keys = path.keys
+    converter = path.converter
+
+    if len(keys) == 1:
+        (key,) = keys
+
+        def walk(node: dict) -> Any:
+            return node[key]
+
+    elif len(keys) == 2:
+        first, second = keys
+
+        def walk(node: dict) -> Any:
+            return node[first][second]
+
+    elif len(keys) == 3:
+        first, second, third = keys
+
+        def walk(node: dict) -> Any:
+            return node[first][second][third]
+
+    else:
+
+        def walk(node: dict) -> Any:
+            for key in keys:
+                node = node[key]
+            return node
+
+    def accessor(data: dict, item_id: tuple) -> Any:
+        try:
+            value = walk(data[resolve(item_id)])
+            if converter is not None:
+                value = converter(value)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+        return value
+
+    return accessor
+
+
+class FieldExtractor:
+    """Run every registered field accessor once per poll."""
+
+    def __init__(self) -> None:
+        """Initialize the extractor."""
+        self.values: dict[tuple[tuple, str], Any] = {}
+        self._accessors: dict[tuple[tuple, str], Accessor] = {}
+        self._references: dict[tuple[tuple, str], int] = {}
+        self._compiled: dict[FieldPath, Accessor] = {}
+
+    def register(
+        self, data: dict | None, item_id: tuple, fields: dict[str, FieldPath]
+    ) -> Callable[[], None]:
+        """Register the fields of an entity and return a callback to unregister them."""
+        keys = []
+
+        for name, path in fields.items():
+            key = (item_id, name)
+            keys.append(key)
+            self._references[key] = self._references.get(key, 0) + 1
+            if key in self._accessors:
+                continue
+
+            # Paths are shared between entities of the same description.
+            accessor = self._compiled.get(path)
+            if accessor is None:
+                accessor = self._compiled[path] = compile_path(path)
+            self._accessors[key] = accessor
+            self.values[key] = accessor(data, item_id) if data else None
+
+        def unregister() -> None:
+            for key in keys:
+                self._references[key] -= 1
+                if self._references[key] == 0:
+                    del self._references[key]
+                    del self._accessors[key]
+                    self.values.pop(key, None)
+
+        return unregister
+
+    def extract(self, data: dict) -> None:
+        """Extract every registered field from freshly parsed telemetry."""
+        self.values = {
+            key: accessor(data, key[0]) for key, accessor in self._accessors.items()
+        }
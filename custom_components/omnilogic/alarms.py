@@ -0,0 +1,118 @@
+"""Alarm index for the Omnilogic integration."""
+
+from __future__ import annotations
+
+EVENT_ALARM_RAISED = "omnilogic_alarm_raised"
+EVENT_ALARM_CLEARED = "omnilogic_alarm_cleared"
+
+
+def alarm_code(alarm: dict) -> str:
+    """Return the code that identifies an alarm on its equipment."""
+    return str(
+        alarm.get("Code") or alarm.get("AlarmCode") or alarm.get("Message") or "unknown"
+    )
+
+
+def alarm_scope(item_id: tuple) -> tuple:
+    """Return the BOW an item belongs to, or its backyard for backyard equipment."""
+    if len(item_id) >= 4 and item_id[2] == "BOWS":
+        return item_id[:4]
+    return item_id[:2]
+
+
+class AlarmIndex:
+    """Active alarms keyed by equipment and alarm code, rebuilt on every poll."""
+
+    def __init__(self, alarms: dict[tuple[tuple, str], dict], names: dict[tuple, str]):
+        """Initialize the index."""
+        self.alarms = alarms
+        self._names = names
+        self.by_item: dict[tuple, list[dict]] = {}
+        self.by_scope: dict[tuple, list[tuple[tuple, dict]]] = {}
+
+        for (item_id, _), alarm in alarms.items():
+            self.by_item.setdefault(item_id, []).append(alarm)
+            self.by_scope.setdefault(alarm_scope(item_id), []).append((item_id, alarm))
+
+    def __len__(self) -> int:
+        """Return the number of active alarms."""
+        return len(self.alarms)
+
+    @classmethod
+    def from_telemetry(cls, data: dict) -> AlarmIndex:
+        """Build the index from flattened telemetry.
+
+        Equipment alarms are taken from each item's own Alarms list. The backyard
+        carries the full site list, so only the alarms that were not matched to any
+        equipment are indexed against the backyard itself.
+        """
+        alarms = {}
+        names = {}
+        site_alarms = []
+
+        for item_id, item in data.items():
+            item_alarms = item.get("Alarms")
+            if not item_alarms:
+                continue
+
+            if len(item_id) == 2:
+                site_alarms.append((item_id, item_alarms))
+                continue
+
+            for alarm in item_alarms:
+                alarms[(item_id, alarm_code(alarm))] = alarm
+                names[item_id] = item.get("Name", item_id[-2])
+
+        matched = {
+            (alarm.get("EquipmentID"), code) for (_, code), alarm in alarms.items()
+        }
+
+        for backyard_id, item_alarms in site_alarms:
+            for alarm in item_alarms:
+                if alarm.get("BowID") == "False":
+                    continue
+                code = alarm_code(alarm)
+                if (alarm.get("EquipmentID"), code) in matched:
+                    continue
+                alarms[(backyard_id, code)] = alarm
+                names[backyard_id] = data[backyard_id].get("BackyardName", "Backyard")
+
+        return cls(alarms, names)
+
+    def for_item(self, item_id: tuple) -> list[dict]:
+        """Return the active alarms of one piece of equipment."""
+        return self.by_item.get(item_id, [])
+
+    def for_scope(self, scope_id: tuple) -> list[tuple[tuple, dict]]:
+        """Return the active alarms within a BOW or on backyard equipment."""
+        return self.by_scope.get(scope_id, [])
+
+    def describe(self, item_id: tuple, alarm: dict) -> str:
+        """Return a one-line description of an alarm."""
+        return f"{self._names.get(item_id, item_id[-2])}: {alarm.get('Message')}"
+
+    def diff(self, previous: AlarmIndex) -> tuple[list, list]:
+        """Return the alarm keys raised and cleared since the previous index."""
+        raised = [key for key in self.alarms if key not in previous.alarms]
+        cleared = [key for key in previous.alarms if key not in self.alarms]
+        return raised, cleared
+
+    def event_data(self, key: tuple[tuple, str]) -> dict:
+        """Return the compact event payload for an indexed alarm."""
+        item_id, code = key
+        alarm = self.alarms[key]
+        return compact_alarm(item_id, code, alarm, self._names.get(item_id))
+
+
+def compact_alarm(item_id: tuple, code: str, alarm: dict, name: str | None) -> dict:
+    """Return a compact description of an alarm."""
+    return {
+        "backyard_id": item_id[1],
+        "bow_id": item_id[3] if alarm_scope(item_id) != item_id[:2] else None,
+        "kind": item_id[-2],
+        "system_id": item_id[-1],
+        "name": name,
+        "code": code,
+        "message": alarm.get("Message"),
+        "severity": alarm.get("Severity"),
+    }
@@ -6,10 +6,13 @@ from homeassistant.components.binary_sensor import BinarySensorDeviceClass, Bina
 from homeassistant.config_entries import ConfigEntry
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .common import OmniLogicEntity, OmniLogicUpdateCoordinator, check_guard
-from .const import COORDINATOR, DOMAIN
+from .const import CONF_CONSOLIDATED_ALARMS, COORDINATOR, DOMAIN
+from .topology import backyard_device_info
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -27,6 +30,29 @@ async def async_setup_entry(
     )
     entities.append(entity)
 
+    consolidated = entry.options.get(CONF_CONSOLIDATED_ALARMS, False)
+    _async_remove_replaced_alarms(hass, entry, consolidated)
+
+    if consolidated:
+        # One summary per BOW and per backyard replaces the per-equipment alarms.
+        for item_id in coordinator.data:
+            if (len(item_id), item_id[-2]) not in ALARM_SUMMARY_TYPES:
+                continue
+
+            entity = OmniLogicAlarmSummarySensor(
+                coordinator=coordinator,
+                state_key="Alarms",
+                name="Alarms",
+                kind="alarm_summary",
+                item_id=item_id,
+                device_class=None,
+                icon="mdi:alarm-light",
+            )
+            entities.append(entity)
+
+        async_add_entities(entities)
+        return
+
     # Process equipment-specific alarms
     for item_id, item in coordinator.data.items():
         # Skip the top-level "Alarms" entry as it's handled separately
@@ -60,6 +86,24 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
+def _async_remove_replaced_alarms(
+    hass: HomeAssistant, entry: ConfigEntry, consolidated: bool
+) -> None:
+    """Remove the alarm entities of the layout that is not in use."""
+    entity_registry = er.async_get(hass)
+    suffix = "_alarm" if consolidated else "_alarm_summary"
+
+    for entity_entry in er.async_entries_for_config_entry(
+        entity_registry, entry.entry_id
+    ):
+        if (
+            entity_entry.domain == "binary_sensor"
+            and entity_entry.unique_id.endswith(suffix)
+            and not entity_entry.unique_id.endswith("_system_alarm")
+        ):
+            entity_registry.async_remove(entity_entry.entity_id)
+
+
 class OmnilogicSensor(OmniLogicEntity, BinarySensorEntity):
     """Defines an Omnilogic sensor entity."""
 
@@ -97,32 +141,41 @@ class OmniLogicAlarmSensor(OmnilogicSensor, BinarySensorEntity):
     @property
     def is_on(self):
         """Return the state for the alarm sensor."""
-        # Regular equipment alarm handling
-        if self._state_key in self.coordinator.data[self._item_id]:
-            alarms = len(self.coordinator.data[self._item_id][self._state_key]) > 0
-            if alarms:
-                self._attrs["alarm"] = self.coordinator.data[self._item_id][
-                    self._state_key
-                ][0]["Message"]
-                self._attrs["alarm_comment"] = self.coordinator.data[self._item_id][
-                    self._state_key
-                ][0].get("Comment")
-                self._attrs["alarm_severity"] = self.coordinator.data[self._item_id][
-                    self._state_key
-                ][0].get("Severity")
-            else:
-                self._attrs["alarm"] = "None"
-                self._attrs["alarm_comment"] = ""
-                self._attrs["alarm_severity"] = ""
-            return alarms
+        alarms = self.coordinator.alarm_index.for_item(self._item_id)
+
+        if alarms:
+            self._attrs["alarm"] = alarms[0]["Message"]
+            self._attrs["alarm_comment"] = alarms[0].get("Comment")
+            self._attrs["alarm_severity"] = alarms[0].get("Severity")
         else:
             self._attrs["alarm"] = "None"
             self._attrs["alarm_comment"] = ""
             self._attrs["alarm_severity"] = ""
-            return False
+        self._attrs["alarm_count"] = len(alarms)
+
+        return len(alarms) > 0
+
 
+class OmniLogicAlarmSummarySensor(OmnilogicSensor, BinarySensorEntity):
+    """Define an OmniLogic Alarm Summary for a BOW or backyard."""
 
-class OmniLogicSystemAlarmSensor(BinarySensorEntity):
+    @property
+    def is_on(self):
+        """Return the state for the alarm summary."""
+        alarm_index = self.coordinator.alarm_index
+        alarms = alarm_index.for_scope(self._item_id)
+
+        self._attrs["alarm_count"] = len(alarms)
+        self._attrs["alarms"] = [
+            alarm_index.describe(item_id, alarm) for item_id, alarm in alarms
+        ]
+
+        return len(alarms) > 0
+
+
+class OmniLogicSystemAlarmSensor(
+    CoordinatorEntity[OmniLogicUpdateCoordinator], BinarySensorEntity
+):
     """Define an OmniLogic System-wide Alarm Sensor."""
 
     def __init__(
@@ -132,30 +185,35 @@ class OmniLogicSystemAlarmSensor(BinarySensorEntity):
         icon: str,
     ) -> None:
         """Initialize System Alarm Entity."""
-        self.coordinator = coordinator
+        super().__init__(coordinator)
         self._icon = icon
         self._attrs = {}
-        
+
         # Find the first backyard entry to get system ID and name
         backyard_id = None
         for item_id in coordinator.data:
             if isinstance(item_id, tuple) and len(item_id) >= 2:
                 backyard_id = item_id[:2]
                 break
-        
-        if backyard_id and backyard_id in coordinator.data:
-            # Get MSP system ID and backyard name from the data
-            self._msp_system_id = coordinator.data[backyard_id].get("systemId")
-            self._backyard_name = coordinator.data[backyard_id].get("BackyardName", "Omnilogic")
-            
+
+        if backyard_id and backyard_id in coordinator.topology:
+            # Get MSP system ID, backyard name and device from the topology index
+            node = coordinator.topology[backyard_id]
+            self._msp_system_id = node.msp_system_id
+            self._backyard_name = node.backyard_name
+            self._device_info = node.device_info
+
             # Create a friendly name that includes the backyard name
             self._name = f"{self._backyard_name} {name}"
         else:
             # Fallback if we can't find the backyard data
             self._msp_system_id = coordinator.config_entry.entry_id
             self._backyard_name = "Omnilogic"
+            self._device_info = backyard_device_info(
+                self._msp_system_id, self._backyard_name
+            )
             self._name = name
-        
+
         # Generate a unique ID for this entity
         self._attr_unique_id = f"{self._msp_system_id}_system_alarm"
 
@@ -168,67 +226,41 @@ class OmniLogicSystemAlarmSensor(BinarySensorEntity):
     def icon(self):
         """Return the icon of the entity."""
         return self._icon
-        
+
     @property
     def device_info(self):
         """Define the device as back yard/MSP System."""
-        return {
-            "identifiers": {(DOMAIN, self._msp_system_id)},
-            "manufacturer": "Hayward",
-            "model": "OmniLogic",
-            "name": self._backyard_name,
-        }
-
-    @property
-    def should_poll(self) -> bool:
-        """No need to poll. Coordinator notifies entity of updates."""
-        return False
-
-    @property
-    def available(self) -> bool:
-        """Return if entity is available."""
-        return self.coordinator.last_update_success
-
-    async def async_added_to_hass(self) -> None:
-        """When entity is added to hass."""
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
-        )
+        return self._device_info
 
     async def async_update(self) -> None:
         """Update the entity."""
-        await self.coordinator.async_request_refresh()
+        self.coordinator.refresh_planner.async_request_refresh()
 
     @property
     def is_on(self):
         """Return the state for the system alarm sensor."""
-        # Check if the Alarms key exists and has entries
-        if "Alarms" in self.coordinator.data and self.coordinator.data["Alarms"]:
-            alarms = len(self.coordinator.data["Alarms"]) > 0
-            if alarms:
-                self._attrs["alarm"] = self.coordinator.data["Alarms"][0]["Message"]
-                self._attrs["alarm_comment"] = self.coordinator.data["Alarms"][0].get("Comment")
-                self._attrs["alarm_severity"] = self.coordinator.data["Alarms"][0].get("Severity")
-            else:
-                self._attrs["alarm"] = "None"
-                self._attrs["alarm_comment"] = ""
-                self._attrs["alarm_severity"] = ""
-            return alarms
+        alarm_index = self.coordinator.alarm_index
+
+        if len(alarm_index) > 0:
+            first = next(iter(alarm_index.alarms.values()))
+            self._attrs["alarm"] = first.get("Message")
+            self._attrs["alarm_comment"] = first.get("Comment")
+            self._attrs["alarm_severity"] = first.get("Severity")
         else:
-            # No alarms key or empty alarms
             self._attrs["alarm"] = "None"
             self._attrs["alarm_comment"] = ""
             self._attrs["alarm_severity"] = ""
-            return False
-            
+        self._attrs["alarm_count"] = len(alarm_index)
+
+        return len(alarm_index) > 0
+
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
         return self._attrs
 
 
-
-
+ALARM_SUMMARY_TYPES = {(2, "Backyard"), (4, "BOWS")}
 
 BINARY_SENSOR_TYPES = {
     (6, "Filter"): [
@@ -0,0 +1,244 @@
+"""Capture of Omnilogic cloud traffic, and replay of captures into a coordinator."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from omnilogic import LoginException, OmniLogicException
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .diagnostics import SYSTEM_ID_FIELDS, TO_REDACT
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_DIRECTORY = "omnilogic_captures"
+# The capture is rotated once it grows past this size, keeping one old file.
+MAX_CAPTURE_FILE_SIZE = 50_000_000
+# Fields holding IDs besides the system IDs redacted from diagnostics.
+CAPTURE_ID_FIELDS = SYSTEM_ID_FIELDS | {"MspSystemID", "BowID", "EquipmentID"}
+# The number of leading arguments of each command that are system IDs.
+COMMAND_ID_ARGS = {
+    "set_chlor_params": 2,
+    "set_equipment": 2,
+    "set_heater_onoff": 3,
+    "set_heater_temperature": 3,
+    "set_lightshow": 3,
+    "set_lightshowv2": 3,
+    "set_pump_speed": 3,
+    "set_relay_valve": 3,
+    "set_spillover_speed": 2,
+    "set_superchlorination": 3,
+}
+REPLAY_ERRORS = {
+    "LoginException": LoginException,
+    "TimeoutError": TimeoutError,
+}
+
+
+class TrafficRecorder:
+    """Append telemetry responses and commands to a gzipped NDJSON capture.
+
+    System IDs are replaced by stable pseudonyms, so a capture can be shared like
+    diagnostics and still be replayed, and credentials are redacted. Records are
+    written in the executor, and the file is rotated like the trace file so a
+    forgotten capture cannot fill the disk.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize the recorder."""
+        self._hass = hass
+        self.path = path
+        self._pseudonyms: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_entry(cls, hass: HomeAssistant, entry_id: str) -> TrafficRecorder:
+        """Create a recorder writing to a new capture file of a config entry."""
+        stamp = dt_util.utcnow().strftime("%Y%m%dT%H%M%SZ")
+        return cls(
+            hass, hass.config.path(CAPTURE_DIRECTORY, f"{entry_id}_{stamp}.ndjson.gz")
+        )
+
+    def pseudonym(self, value: Any) -> Any:
+        """Return the stable pseudonym of a system ID."""
+        if not str(value).isdigit():
+            return value
+        return self._pseudonyms.setdefault(str(value), str(len(self._pseudonyms) + 1))
+
+    def redact(self, data: Any) -> Any:
+        """Return a copy of data with IDs pseudonymized and credentials redacted."""
+        if isinstance(data, dict):
+            result = {}
+            for key, value in data.items():
+                if key in CAPTURE_ID_FIELDS:
+                    result[key] = self.pseudonym(value)
+                elif key in TO_REDACT:
+                    result[key] = "**REDACTED**"
+                else:
+                    result[key] = self.redact(value)
+            return result
+        if isinstance(data, (list, tuple)):
+            return [self.redact(item) for item in data]
+        return data
+
+    @callback
+    def record_telemetry(self, data: Any = None, error: BaseException | None = None) -> None:
+        """Record a telemetry response, or the error that replaced it."""
+        if error is not None:
+            self._record({"type": "telemetry", "error": type(error).__name__})
+        else:
+            self._record({"type": "telemetry", "data": self.redact(data)})
+
+    @callback
+    def record_msp_config(self, msp_config: Any) -> None:
+        """Record an MSP configuration response."""
+        self._record({"type": "msp_config", "data": self.redact(msp_config)})
+
+    @callback
+    def record_command(
+        self, item_id: tuple, method: str, args: tuple, result: Any
+    ) -> None:
+        """Record a command sent to the API and its result."""
+        id_args = COMMAND_ID_ARGS.get(method, 0)
+        self._record(
+            {
+                "type": "command",
+                "item_id": [
+                    self.pseudonym(part) if index % 2 else part
+                    for index, part in enumerate(item_id)
+                ],
+                "method": method,
+                "args": [
+                    self.pseudonym(arg) if index < id_args else arg
+                    for index, arg in enumerate(args)
+                ],
+                "result": result,
+            }
+        )
+
+    def _record(self, record: dict) -> None:
+        """Write a record in the executor."""
+        record["time"] = time.time()
+        self._hass.async_add_executor_job(self._write, json.dumps(record, default=str))
+
+    def _write(self, line: str) -> None:
+        """Append one record to the capture."""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if (
+                    os.path.exists(self.path)
+                    and os.path.getsize(self.path) > MAX_CAPTURE_FILE_SIZE
+                ):
+                    os.replace(self.path, self.path + ".1")
+                # Each record is its own gzip member, so a capture stays readable
+                # up to the last complete record.
+                with gzip.open(self.path, "at", encoding="utf-8") as file:
+                    file.write(line + "\n")
+            except OSError as error:
+                _LOGGER.warning("Could not write capture %s: %s", self.path, error)
+
+
+def read_capture(path: str) -> Iterator[dict]:
+    """Yield the records of a capture in the order they were made.
+
+    The part rotated out of a capture is read along with it.
+    """
+    records = []
+    for part in (path + ".1", path):
+        if part != path and not os.path.exists(part):
+            continue
+        with gzip.open(part, "rt", encoding="utf-8") as file:
+            records.extend(json.loads(line) for line in file if line.strip())
+    yield from sorted(records, key=lambda record: record["time"])
+
+
+class ReplayTransport:
+    """Stand in for the omnilogic client and answer from a capture.
+
+    Telemetry responses and recorded errors are returned in capture order, each
+    time telemetry is fetched. Commands succeed with their recorded result, or
+    with True when the capture has no more of them.
+    """
+
+    def __init__(self, records: list[dict]) -> None:
+        """Initialize the transport."""
+        self.username = None
+        self.password = None
+        self.token = "replay"
+        self.systems = []
+        self.telemetry = [record for record in records if record["type"] == "telemetry"]
+        self._msp_config = [
+            record["data"] for record in records if record["type"] == "msp_config"
+        ]
+        self._results: dict[str, list] = {}
+        for record in records:
+            if record["type"] == "command":
+                self._results.setdefault(record["method"], []).append(record["result"])
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> ReplayTransport:
+        """Load a capture file."""
+        return cls(list(read_capture(path)))
+
+    @property
+    def exhausted(self) -> bool:
+        """Return True once every telemetry record has been replayed."""
+        return self.position >= len(self.telemetry)
+
+    async def connect(self) -> bool:
+        """Pretend to log in."""
+        return True
+
+    async def get_telemetry_data(self) -> Any:
+        """Return the next captured telemetry response."""
+        if self.exhausted:
+            raise OmniLogicException("Capture exhausted")
+        record = self.telemetry[self.position]
+        self.position += 1
+        if "error" in record:
+            raise REPLAY_ERRORS.get(record["error"], OmniLogicException)(record["error"])
+        return record["data"]
+
+    async def get_msp_config_file(self) -> Any:
+        """Return the last captured MSP configuration."""
+        return self._msp_config[-1] if self._msp_config else []
+
+    def __getattr__(self, name: str):
+        """Answer command methods with their captured results."""
+        if not name.startswith("set_"):
+            raise AttributeError(name)
+
+        async def command(*args: Any) -> Any:
+            results = self._results.get(name)
+            result = results.pop(0) if results else True
+            return tuple(result) if isinstance(result, list) else result
+
+        command.__name__ = name
+        return command
+
+
+async def async_replay(coordinator, transport: ReplayTransport, speed: float = 1.0) -> None:
+    """Feed a capture through a coordinator created on the replay transport.
+
+    Polls are spaced like the captured ones divided by speed. A speed of 0 replays
+    every poll back to back.
+    """
+    previous = None
+    while not transport.exhausted:
+        captured_at = transport.telemetry[transport.position]["time"]
+        if previous is not None and speed > 0:
+            await asyncio.sleep(max(captured_at - previous, 0) / speed)
+        previous = captured_at
+        await coordinator.async_refresh()
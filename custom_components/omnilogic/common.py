@@ -1,14 +1,18 @@
 """Common classes and elements for Omnilogic Integration."""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import timedelta
 import logging
+import time
 
+import aiohttp
 import async_timeout
 
 from omnilogic import OmniLogic, OmniLogicException, LoginException
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.update_coordinator import (
@@ -16,8 +20,45 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
-
-from .const import ALL_ITEM_KINDS, DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .accessors import FieldExtractor
+from .alarms import EVENT_ALARM_CLEARED, EVENT_ALARM_RAISED, AlarmIndex
+from .capture import TrafficRecorder
+from .const import (
+    CONF_BOW_DEVICES,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_EXCLUDED_BOWS,
+    CONF_EXCLUDED_KINDS,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_PUMP_RATED_POWER,
+    CONF_SCAN_INTERVAL,
+    CONF_SCHEDULE_POLLING,
+    CONF_STREAMING_TELEMETRY,
+    CONF_TELEMETRY_HISTORY,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_PUMP_RATED_POWER,
+    DEFAULT_SCAN_INTERVAL,
+    RELOAD_OPTIONS,
+)
+from .history import TelemetryHistory
+from .latency import CommandLatency
+from .loadshed import LoadShedder
+from .logs import FlightRecorder, RateLimitedLogger
+from .refresh import RefreshPlanner
+from .runtime import RuntimeAccumulator
+from .scheduler import RequestScheduler
+from .schedules import SCHEDULE_REFRESH_INTERVAL, SCHEDULE_SETTLE_DELAY, ScheduleIndex
+from .statistics import StatisticsAggregator
+from .streaming import (
+    CONFIG_BACKED_KINDS,
+    StreamingTelemetryClient,
+    StreamingTelemetryError,
+)
+from .telemetry import TelemetryFlattener
+from .topology import build_topology
+from .tracing import Tracer, current_entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,15 +70,51 @@ class OmniLogicUpdateCoordinator(DataUpdateCoordinator):
         self,
         hass: HomeAssistant,
         api: OmniLogic,
+        session: aiohttp.ClientSession,
         name: str,
         config_entry: ConfigEntry,
         polling_interval: int,
+        tracer: Tracer | None = None,
     ) -> None:
         """Initialize the global Omnilogic data updater."""
         self.api = api
+        self.session = session
         self.config_entry = config_entry
+        self.tracer = tracer or Tracer(hass, config_entry.entry_id)
         self._last_data = None
         self._timeout_count = 0
+        self._log = RateLimitedLogger(_LOGGER)
+        self.flight_recorder = FlightRecorder()
+        self._stage_timings: dict[str, float] = {}
+        self.refresh_planner = RefreshPlanner(hass, self)
+        self.scheduler = RequestScheduler()
+        self.schedule_index = None
+        self.alarm_index = AlarmIndex({}, {})
+        self._alarms_indexed = False
+        self.topology = {}
+        self._topology_ids = None
+        self.fields = FieldExtractor()
+        self.available_bows = {}
+        self.shared_links = {}
+        self.streaming = None
+        if config_entry.options.get(CONF_STREAMING_TELEMETRY, False):
+            self.streaming = StreamingTelemetryClient(api, session)
+        self.capture = None
+        if config_entry.options.get(CONF_CAPTURE_TRAFFIC, False):
+            self.capture = TrafficRecorder.for_entry(hass, config_entry.entry_id)
+        self.runtime = RuntimeAccumulator(hass, config_entry.entry_id)
+        self.command_latency = CommandLatency(hass, config_entry.entry_id)
+        self.load_shedder = LoadShedder(hass)
+        self._flatten_time = 0.0
+        self.statistics = None
+        if config_entry.options.get(CONF_EXTERNAL_STATISTICS, False):
+            self.statistics = StatisticsAggregator(hass, config_entry.entry_id)
+        self.history = None
+        if config_entry.options.get(CONF_TELEMETRY_HISTORY, False):
+            self.history = TelemetryHistory(hass)
+        self._schedules_loaded_at = None
+        self._polling_interval = polling_interval
+        self.setup_options = options_requiring_reload(config_entry)
 
         super().__init__(
             hass=hass,
@@ -46,13 +123,153 @@ class OmniLogicUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=polling_interval),
         )
 
-    async def _async_update_data(self):
-        """Fetch data from OmniLogic."""
+    async def async_send_command(
+        self, item_id: tuple, method: str, *args, confirm=None, confirm_id=None
+    ):
+        """Send a command to the OmniLogic API and plan the refresh that confirms it.
+
+        confirm is an optional check run against the item's telemetry that returns
+        True once the change has been applied by the MSP. It is run against the
+        item confirm_id instead when the change shows up on another item.
+        """
+        started = time.monotonic()
+        entity_id = current_entity.get()
+        try:
+            with self.tracer.span(
+                "command",
+                method=method,
+                item="/".join(str(part) for part in item_id),
+                entity_id=entity_id,
+            ):
+                result = await self.scheduler.async_command(
+                    getattr(self.api, method), *args
+                )
+        except Exception as error:
+            self.flight_recorder.async_record_command(
+                started, method, item_id, error=error, entity_id=entity_id
+            )
+            raise
+        self.flight_recorder.async_record_command(
+            started, method, item_id, result, entity_id=entity_id
+        )
+        if self.capture is not None:
+            self.capture.record_command(item_id, method, args, result)
+
+        success = result[0] if isinstance(result, tuple) else result
+        if success:
+            self.refresh_planner.async_request_refresh(
+                item_id, confirm, confirm_id, method
+            )
+
+        return result
+
+    async def _async_fetch_telemetry(self) -> TelemetryFlattener:
+        """Fetch telemetry from the OmniLogic cloud into a flattener."""
+        options = self.config_entry.options
+        excluded_bows = frozenset(options.get(CONF_EXCLUDED_BOWS, []))
+        excluded_kinds = frozenset(options.get(CONF_EXCLUDED_KINDS, []))
+        flattener = TelemetryFlattener(excluded_bows, excluded_kinds)
+
         try:
             async with async_timeout.timeout(30):
+                # Captures hold library responses, so capturing bypasses streaming.
+                if self.streaming is not None and self.capture is None:
+                    if self.refresh_planner.pending_kinds & CONFIG_BACKED_KINDS:
+                        # Heater commands only show up in the MSP configuration, so
+                        # it is read again until they are confirmed.
+                        self.streaming.invalidate_config()
+                    try:
+                        with self.tracer.span(
+                            "api.get_telemetry_data", client=True, streaming=True
+                        ):
+                            await self.streaming.async_fetch(flattener)
+                        return flattener
+                    except StreamingTelemetryError as error:
+                        _LOGGER.warning(
+                            "Streaming telemetry failed, using the omnilogic library "
+                            "from now on: %s",
+                            error,
+                        )
+                        self.streaming = None
+                        flattener = TelemetryFlattener(excluded_bows, excluded_kinds)
+
                 data = await self.api.get_telemetry_data()
+        except (OmniLogicException, LoginException, TimeoutError) as error:
+            if self.capture is not None:
+                self.capture.record_telemetry(error=error)
+            raise
+
+        if self.capture is not None:
+            self.capture.record_telemetry(data)
+        began = self.hass.loop.time()
+        with self._stage("flatten"):
+            flattener.add_tree(data)
+        self._flatten_time = self.hass.loop.time() - began
+
+        return flattener
+
+    async def _async_fetch_msp_config(self):
+        """Fetch the MSP configuration from the OmniLogic cloud."""
+        async with async_timeout.timeout(30):
+            msp_config = await self.api.get_msp_config_file()
+
+        if self.capture is not None:
+            self.capture.record_msp_config(msp_config)
+
+        return msp_config
+
+    async def _async_update_data(self):
+        """Fetch data from OmniLogic and record a summary of the poll."""
+        started = time.monotonic()
+        self._stage_timings = {}
+        try:
+            parsed_data, stale = await self._async_poll()
+        except UpdateFailed as error:
+            self.flight_recorder.async_record_poll(
+                started,
+                "failed",
+                error=error.__cause__ or error,
+                stages=self._stage_timings,
+            )
+            raise
+
+        self.flight_recorder.async_record_poll(
+            started,
+            "stale" if stale else "ok",
+            data=parsed_data,
+            previous=None if stale else self.data,
+            stages=self._stage_timings,
+            streaming=self.streaming is not None,
+            shedding_level=self.load_shedder.level,
+            next_poll=self.update_interval.total_seconds(),
+        )
+        return parsed_data
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Time a stage of a poll for the flight recorder, in a span of its own."""
+        began = time.monotonic()
+        try:
+            with self.tracer.span(name):
+                yield
+        finally:
+            self._stage_timings[name] = time.monotonic() - began
+
+    async def _async_poll(self) -> tuple[dict, bool]:
+        """Fetch and process telemetry.
+
+        Returns the parsed telemetry and whether it is the last telemetry kept
+        through a timeout.
+        """
+        stale = False
+        try:
+            with self._stage("fetch"):
+                telemetry = await self.scheduler.async_poll(
+                    self._async_fetch_telemetry
+                )
 
             self._timeout_count = 0
+            self._log.reset("timeout")
 
         except OmniLogicException as error:
             raise UpdateFailed(f"Error updating from OmniLogic: {error}") from error
@@ -63,34 +280,217 @@ class OmniLogicUpdateCoordinator(DataUpdateCoordinator):
         except TimeoutError as error:
             self._timeout_count += 1
 
-            if self._timeout_count > 10 or not self._last_data:
+            if self._timeout_count > 10 or self._last_data is None:
                 raise UpdateFailed(f"Timeout updating OmniLogic from cloud: {error}") from error
             else:
-                data = self._last_data
+                self._log.log(
+                    logging.WARNING,
+                    "timeout",
+                    "Timed out updating OmniLogic, keeping the last telemetry",
+                )
+                telemetry = self._last_data
+                stale = True
+
+        # Time spent on the event loop, from flattening the response onwards.
+        started = self.hass.loop.time() - self._flatten_time
+        self._flatten_time = 0.0
+        self._last_data = telemetry
+
+        self.available_bows = telemetry.available_bows
+        self.shared_links = telemetry.shared_links
+        parsed_data = telemetry.items
+
+        with self._stage("topology"):
+            self._update_topology(parsed_data)
+        with self._stage("refresh_planner"):
+            self.refresh_planner.async_process_update(parsed_data, stale)
+        with self._stage("alarms"):
+            self._update_alarm_index(parsed_data)
+        with self._stage("fields"):
+            self.fields.extract(parsed_data)
+        with self._stage("runtime"):
+            if stale:
+                # The equipment may have changed since the kept telemetry, so the
+                # time until the next fresh poll is not counted.
+                self.runtime.async_skip()
+            else:
+                self.runtime.async_update(
+                    parsed_data,
+                    self.config_entry.options.get(
+                        CONF_PUMP_RATED_POWER, DEFAULT_PUMP_RATED_POWER
+                    ),
+                )
+
+        # While shedding load, skipped polls leave gaps in the history. Statistics
+        # lose nothing, as each reading holds until the next flush accounts for it.
+        # Stale polls only repeat the kept telemetry, so they are not recorded.
+        shedding = self.load_shedder.async_evaluate(
+            self.config_entry.options, self.hass.loop.time() - started
+        )
+        if self.history is not None and not stale:
+            if shedding:
+                self.load_shedder.async_count("history_skipped")
+            else:
+                with self._stage("history"):
+                    await self.history.async_record(parsed_data)
+        if self.config_entry.options.get(CONF_SCHEDULE_POLLING, False):
+            with self._stage("schedules"):
+                await self._async_load_schedules()
+        if self.statistics is not None:
+            if shedding:
+                self.load_shedder.async_count("statistics_postponed")
+            else:
+                with self._stage("statistics"):
+                    self.statistics.async_flush()
+        self.update_interval = self._next_update_interval()
+
+        return parsed_data, stale
+
+    def _next_update_interval(self) -> timedelta:
+        """Return the interval until the next poll, stretched while shedding load."""
+        if (
+            self.config_entry.options.get(CONF_SCHEDULE_POLLING, False)
+            and self.schedule_index is not None
+        ):
+            interval = self._schedule_poll_interval()
+        else:
+            interval = timedelta(seconds=self._polling_interval)
+        return interval * self.load_shedder.interval_factor
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        """Refresh data and update listeners, as the root span of a poll's trace."""
+        with self.tracer.span("coordinator.refresh") as span:
+            await super()._async_refresh(*args, **kwargs)
+            span.set("success", self.last_update_success)
+            if not self.last_update_success:
+                span.fail(str(self.last_exception))
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, in batches while shedding load."""
+        with self.tracer.span("update_listeners", listeners=len(self._listeners)) as span:
+            if self.load_shedder.shedding:
+                span.set("batched", True)
+                self.load_shedder.async_run_batched(self._listeners)
+                return
+
+            began = self.hass.loop.time()
+            super().async_update_listeners()
+            self.load_shedder.last_write_time = self.hass.loop.time() - began
+
+    @callback
+    def async_apply_options(self) -> None:
+        """Apply changed options that do not need the entry to be reloaded."""
+        options = self.config_entry.options
+
+        self._polling_interval = configured_polling_interval(self.config_entry)
+        if not options.get(CONF_STREAMING_TELEMETRY, False):
+            self.streaming = None
+        elif self.streaming is None:
+            self.streaming = StreamingTelemetryClient(self.api, self.session)
+        if not options.get(CONF_CAPTURE_TRAFFIC, False):
+            self.capture = None
+        elif self.capture is None:
+            self.capture = TrafficRecorder.for_entry(self.hass, self.config_entry.entry_id)
+        if not options.get(CONF_TELEMETRY_HISTORY, False):
+            if self.history is not None:
+                self.hass.async_create_task(self.history.async_close())
+            self.history = None
+        elif self.history is None:
+            self.history = TelemetryHistory(self.hass)
+        self.tracer.async_apply_options(options)
+
+        self.update_interval = self._next_update_interval()
+        self._schedule_refresh()
+        # Entities read options such as the pH offset when they write their state.
+        self.async_update_listeners()
+
+    def _update_topology(self, parsed_data):
+        """Rebuild the topology index when equipment is discovered or removed."""
+        item_ids = parsed_data.keys()
+        if self._topology_ids is not None and item_ids == self._topology_ids:
+            return
+
+        self.topology = build_topology(
+            parsed_data,
+            self.config_entry.options.get(CONF_BOW_DEVICES, False),
+            self.shared_links,
+        )
+        self._topology_ids = frozenset(item_ids)
+
+    def _update_alarm_index(self, parsed_data):
+        """Rebuild the alarm index and fire events for raised and cleared alarms."""
+        alarm_index = AlarmIndex.from_telemetry(parsed_data)
+        previous = self.alarm_index
+        self.alarm_index = alarm_index
+
+        # Alarms already active at startup are not reported as newly raised.
+        if not self._alarms_indexed:
+            self._alarms_indexed = True
+            return
+
+        raised, cleared = alarm_index.diff(previous)
+        for key in raised:
+            self.hass.bus.async_fire(EVENT_ALARM_RAISED, alarm_index.event_data(key))
+        for key in cleared:
+            self.hass.bus.async_fire(EVENT_ALARM_CLEARED, previous.event_data(key))
+
+    async def _async_load_schedules(self):
+        """Read the MSP schedules when they are missing or stale."""
+        now = dt_util.utcnow()
+        if (
+            self._schedules_loaded_at is not None
+            and now - self._schedules_loaded_at < SCHEDULE_REFRESH_INTERVAL
+        ):
+            return
 
-        parsed_data = {}
-        self._last_data = data
+        try:
+            msp_config = await self.scheduler.async_poll(self._async_fetch_msp_config)
+        except (OmniLogicException, LoginException, TimeoutError) as error:
+            self._log.log(
+                logging.DEBUG, "schedules", "Could not read MSP schedules: %s", error
+            )
+            return
+
+        self.schedule_index = ScheduleIndex.from_msp_config(msp_config)
+        self._schedules_loaded_at = now
+        _LOGGER.debug("Indexed %s schedule transitions", len(self.schedule_index))
+
+    def _schedule_poll_interval(self) -> timedelta:
+        """Return the interval that lands the next poll just after a scheduled change."""
+        idle_interval = self.config_entry.options.get(
+            CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL
+        )
 
-        def get_item_data(item, item_kind, current_id, data):
-            """Get data per kind of Omnilogic API item."""
-            if isinstance(item, list):
-                for single_item in item:
-                    data = get_item_data(single_item, item_kind, current_id, data)
+        next_transition = None
+        if self.schedule_index is not None:
+            now = dt_util.now()
+            next_transition = self.schedule_index.next_transition(now)
 
-            if "systemId" in item:
-                system_id = item["systemId"]
-                current_id = current_id + (item_kind, system_id)
-                data[current_id] = item
+        if next_transition is None:
+            return timedelta(seconds=idle_interval)
 
-            for kind in ALL_ITEM_KINDS:
-                if kind in item:
-                    data = get_item_data(item[kind], kind, current_id, data)
+        seconds = (next_transition - now).total_seconds() + SCHEDULE_SETTLE_DELAY
 
-            return data
+        return timedelta(seconds=min(max(seconds, SCHEDULE_SETTLE_DELAY), idle_interval))
 
-        parsed_data = get_item_data(data, "Backyard", (), parsed_data)
 
-        return parsed_data
+def configured_polling_interval(config_entry: ConfigEntry) -> int:
+    """Return the polling interval from the options, or the entry data before that."""
+    return config_entry.options.get(
+        CONF_SCAN_INTERVAL,
+        config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+    )
+
+
+def options_requiring_reload(config_entry: ConfigEntry) -> dict:
+    """Return the options that only take effect when the entry is reloaded."""
+    snapshot = {}
+    for key in RELOAD_OPTIONS:
+        # Unset, False and an empty exclusion list all mean the default.
+        value = config_entry.options.get(key) or None
+        snapshot[key] = tuple(sorted(value)) if isinstance(value, list) else value
+    return snapshot
 
 
 class OmniLogicEntity(CoordinatorEntity[OmniLogicUpdateCoordinator]):
@@ -103,48 +503,52 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicUpdateCoordinator]):
         name: str,
         item_id: tuple,
         icon: str,
+        fields: dict | None = None,
     ) -> None:
         """Initialize the OmniLogic Entity."""
         super().__init__(coordinator)
 
-        bow_id = None
-        entity_data = coordinator.data[item_id]
-
-        backyard_id = item_id[:2]
-        if len(item_id) == 6:
-            bow_id = item_id[:4]
-
-        msp_system_id = coordinator.data[backyard_id]["systemId"]
-        entity_friendly_name = f"{coordinator.data[backyard_id]['BackyardName']} "
-        unique_id = f"{msp_system_id}"
-
-        if bow_id is not None:
-            unique_id = f"{unique_id}_{coordinator.data[bow_id]['systemId']}"
-
-            if kind != "Heaters":
-                entity_friendly_name = (
-                    f"{entity_friendly_name}{coordinator.data[bow_id]['Name']} "
-                )
-            else:
-                entity_friendly_name = f"{entity_friendly_name}{coordinator.data[bow_id]['Operation']['VirtualHeater']['Name']} "
-
-        unique_id = f"{unique_id}_{coordinator.data[item_id]['systemId']}_{kind}"
-
-        if entity_data.get("Name") is not None:
-            entity_friendly_name = f"{entity_friendly_name} {entity_data['Name']}"
-
-        entity_friendly_name = f"{entity_friendly_name} {name}"
-
-        unique_id = unique_id.replace(" ", "_")
+        node = coordinator.topology[item_id]
 
         self._kind = kind
-        self._name = entity_friendly_name
-        self._unique_id = unique_id
+        self._name = node.entity_name(name)
+        self._unique_id = node.entity_unique_id(kind)
         self._item_id = item_id
         self._icon = icon
         self._attrs = {}
-        self._msp_system_id = msp_system_id
-        self._backyard_name = coordinator.data[backyard_id]["BackyardName"]
+        self._msp_system_id = node.msp_system_id
+        self._backyard_name = node.backyard_name
+        self._device_info = node.device_info
+        self._fields = fields or {}
+
+        if node.shared_bows:
+            self._attrs["shared_with"] = [
+                coordinator.data[bow_id].get("Name") for bow_id in node.shared_bows
+            ]
+
+    @callback
+    def async_set_context(self, context) -> None:
+        """Set the context of a service call, noting the entity for its spans.
+
+        Home Assistant sets the context right before it starts the task that runs
+        the entity's service method, so the task sees the entity.
+        """
+        super().async_set_context(context)
+        current_entity.set(self.entity_id)
+
+    async def async_added_to_hass(self) -> None:
+        """Register the entity's telemetry fields when added to hass."""
+        await super().async_added_to_hass()
+        if self._fields:
+            self.async_on_remove(
+                self.coordinator.fields.register(
+                    self.coordinator.data, self._item_id, self._fields
+                )
+            )
+
+    def _field(self, name: str):
+        """Return a telemetry field extracted for this entity in the last poll."""
+        return self.coordinator.fields.values.get((self._item_id, name))
 
     @property
     def unique_id(self) -> str:
@@ -168,13 +572,8 @@ class OmniLogicEntity(CoordinatorEntity[OmniLogicUpdateCoordinator]):
 
     @property
     def device_info(self) -> DeviceInfo:
-        """Define the device as back yard/MSP System."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._msp_system_id)},
-            manufacturer="Hayward",
-            model="OmniLogic",
-            name=self._backyard_name,
-        )
+        """Define the device as back yard/MSP System, or its BOW sub-device."""
+        return self._device_info
 
 
 def check_guard(state_key, item, entity_setting):
@@ -7,9 +7,39 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
-from homeassistant.helpers import aiohttp_client
+from homeassistant.helpers import config_validation as cv
 
-from .const import CONF_SCAN_INTERVAL, DEFAULT_PH_OFFSET, DEFAULT_SCAN_INTERVAL, DOMAIN
+from .const import (
+    CONF_BOW_DEVICES,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_CONSOLIDATED_ALARMS,
+    CONF_EXCLUDED_BOWS,
+    CONF_EXCLUDED_KINDS,
+    CONF_EXTERNAL_STATISTICS,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_LAG_THRESHOLD,
+    CONF_PUMP_RATED_POWER,
+    CONF_SCAN_INTERVAL,
+    CONF_SCHEDULE_POLLING,
+    CONF_STREAMING_TELEMETRY,
+    CONF_OTLP_ENDPOINT,
+    CONF_TELEMETRY_HISTORY,
+    CONF_TRACE_FILE,
+    CONF_UPDATE_BUDGET,
+    COORDINATOR,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_LAG_THRESHOLD,
+    DEFAULT_PH_OFFSET,
+    DEFAULT_PUMP_RATED_POWER,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_UPDATE_BUDGET,
+    DOMAIN,
+    SELECTABLE_ITEM_KINDS,
+)
+from .session import create_session
+
+CONF_INCLUDED_BOWS = "included_bows"
+CONF_INCLUDED_KINDS = "included_kinds"
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,7 +69,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             username = user_input[CONF_USERNAME]
             password = user_input[CONF_PASSWORD]
 
-            session = aiohttp_client.async_get_clientsession(self.hass)
+            session, _ = create_session(self.hass)
             omni = OmniLogic(username, password, session)
 
             try:
@@ -51,7 +81,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             except Exception:  # pylint: disable=broad-except
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
-            else:
+            finally:
+                await session.close()
+
+            if not errors:
                 # Use email address as the unique ID
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
@@ -78,7 +111,11 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     def _get_data_schema(self):
         """Get the data schema for the options flow."""
-        return vol.Schema(
+        available_bows = self._available_bows()
+        excluded_bows = self.config_entry.options.get(CONF_EXCLUDED_BOWS, [])
+        excluded_kinds = self.config_entry.options.get(CONF_EXCLUDED_KINDS, [])
+
+        schema = vol.Schema(
             {
                 vol.Required(
                     CONF_USERNAME,
@@ -100,9 +137,110 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         "ph_offset", DEFAULT_PH_OFFSET
                     ),
                 ): vol.All(vol.Coerce(float), vol.Range(min=-14.0, max=14.0)),
+                vol.Optional(
+                    CONF_PUMP_RATED_POWER,
+                    default=self.config_entry.options.get(
+                        CONF_PUMP_RATED_POWER, DEFAULT_PUMP_RATED_POWER
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_SCHEDULE_POLLING,
+                    default=self.config_entry.options.get(CONF_SCHEDULE_POLLING, False),
+                ): bool,
+                vol.Optional(
+                    CONF_IDLE_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL
+                    ),
+                ): int,
+                vol.Optional(
+                    CONF_LAG_THRESHOLD,
+                    default=self.config_entry.options.get(
+                        CONF_LAG_THRESHOLD, DEFAULT_LAG_THRESHOLD
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_UPDATE_BUDGET,
+                    default=self.config_entry.options.get(
+                        CONF_UPDATE_BUDGET, DEFAULT_UPDATE_BUDGET
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CONSOLIDATED_ALARMS,
+                    default=self.config_entry.options.get(
+                        CONF_CONSOLIDATED_ALARMS, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_BOW_DEVICES,
+                    default=self.config_entry.options.get(CONF_BOW_DEVICES, False),
+                ): bool,
+                vol.Optional(
+                    CONF_STREAMING_TELEMETRY,
+                    default=self.config_entry.options.get(
+                        CONF_STREAMING_TELEMETRY, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_CAPTURE_TRAFFIC,
+                    default=self.config_entry.options.get(CONF_CAPTURE_TRAFFIC, False),
+                ): bool,
+                vol.Optional(
+                    CONF_EXTERNAL_STATISTICS,
+                    default=self.config_entry.options.get(
+                        CONF_EXTERNAL_STATISTICS, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_TELEMETRY_HISTORY,
+                    default=self.config_entry.options.get(
+                        CONF_TELEMETRY_HISTORY, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_TRACE_FILE,
+                    default=self.config_entry.options.get(CONF_TRACE_FILE, False),
+                ): bool,
+                vol.Optional(
+                    CONF_OTLP_ENDPOINT,
+                    default=self.config_entry.options.get(CONF_OTLP_ENDPOINT, ""),
+                ): str,
+                vol.Optional(
+                    CONF_INCLUDED_KINDS,
+                    default=[
+                        kind
+                        for kind in SELECTABLE_ITEM_KINDS
+                        if kind not in excluded_kinds
+                    ],
+                ): cv.multi_select(SELECTABLE_ITEM_KINDS),
             }
         )
 
+        # The BOWs are only known while the entry is loaded; otherwise the field is
+        # left out and the stored exclusions are kept as they are.
+        if available_bows:
+            schema = schema.extend(
+                {
+                    vol.Optional(
+                        CONF_INCLUDED_BOWS,
+                        default=[
+                            bow_id
+                            for bow_id in available_bows
+                            if bow_id not in excluded_bows
+                        ],
+                    ): cv.multi_select(available_bows),
+                }
+            )
+
+        return schema
+
+    def _available_bows(self):
+        """Return every BOW of the running entry, including excluded ones."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        if entry_data is None:
+            return {}
+        return dict(entry_data[COORDINATOR].available_bows)
+
     async def async_step_init(self, user_input=None):
         """Manage options."""
         # Data stores Omnilogic credentials. Options stores runtime options (pH offset and scan rate).
@@ -110,16 +248,33 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         # by writing all settings to both Data and Options config entries.
 
         if user_input is not None:
+            # Store what is left out, so equipment added later is included by default.
+            user_input = dict(user_input)
+            included_bows = user_input.pop(CONF_INCLUDED_BOWS, None)
+            included_kinds = user_input.pop(CONF_INCLUDED_KINDS, None)
+            available_bows = self._available_bows()
+            if included_bows is not None and available_bows:
+                user_input[CONF_EXCLUDED_BOWS] = [
+                    bow_id for bow_id in available_bows if bow_id not in included_bows
+                ]
+            else:
+                user_input[CONF_EXCLUDED_BOWS] = self.config_entry.options.get(
+                    CONF_EXCLUDED_BOWS, []
+                )
+            if included_kinds is not None:
+                user_input[CONF_EXCLUDED_KINDS] = [
+                    kind for kind in SELECTABLE_ITEM_KINDS if kind not in included_kinds
+                ]
+            else:
+                user_input[CONF_EXCLUDED_KINDS] = self.config_entry.options.get(
+                    CONF_EXCLUDED_KINDS, []
+                )
 
-            # write updated config entries
+            # Write data and options in one update, so the entry's update listener
+            # runs once and applies the changes, reloading only if it must.
             self.hass.config_entries.async_update_entry(
-                self.config_entry, data=user_input, options=self.config_entry.options
+                self.config_entry, data=user_input, options=user_input
             )
-            # reload updated config entries
-            await self.hass.config_entries.async_reload(self.config_entry.entry_id)
-            self.async_abort(reason="configuration updated")
-
-            # write options entries
             return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(step_id="init", data_schema=self._get_data_schema())
@@ -4,8 +4,41 @@ DOMAIN = "omnilogic"
 CONF_SCAN_INTERVAL = "polling_interval"
 DEFAULT_SCAN_INTERVAL = 30
 DEFAULT_PH_OFFSET = 0
+CONF_PUMP_RATED_POWER = "pump_rated_power"
+DEFAULT_PUMP_RATED_POWER = 1500
+CONF_SCHEDULE_POLLING = "schedule_polling"
+CONF_IDLE_SCAN_INTERVAL = "idle_polling_interval"
+DEFAULT_IDLE_SCAN_INTERVAL = 300
+CONF_CONSOLIDATED_ALARMS = "consolidated_alarms"
+CONF_BOW_DEVICES = "bow_devices"
+CONF_EXCLUDED_BOWS = "excluded_bows"
+CONF_EXCLUDED_KINDS = "excluded_kinds"
+CONF_STREAMING_TELEMETRY = "streaming_telemetry"
+CONF_CAPTURE_TRAFFIC = "capture_traffic"
+CONF_EXTERNAL_STATISTICS = "external_statistics"
+CONF_TELEMETRY_HISTORY = "telemetry_history"
+CONF_TRACE_FILE = "trace_file"
+CONF_OTLP_ENDPOINT = "otlp_endpoint"
+# Load shedding thresholds in milliseconds, 0 turns a check off.
+CONF_LAG_THRESHOLD = "lag_threshold"
+DEFAULT_LAG_THRESHOLD = 250
+CONF_UPDATE_BUDGET = "update_budget"
+DEFAULT_UPDATE_BUDGET = 200
+# Options that change which entities and devices exist, or how sensors are
+# described to the recorder, applied by a reload.
+RELOAD_OPTIONS = (
+    CONF_BOW_DEVICES,
+    CONF_CONSOLIDATED_ALARMS,
+    CONF_EXCLUDED_BOWS,
+    CONF_EXCLUDED_KINDS,
+    CONF_EXTERNAL_STATISTICS,
+)
 COORDINATOR = "coordinator"
+# Sent with the entry ID after each coordinator update.
+SIGNAL_TELEMETRY_UPDATED = f"{DOMAIN}_telemetry_updated"
 OMNI_API = "omni_api"
+HTTP_SESSION = "http_session"
+CONNECTION_STATS = "connection_stats"
 
 PUMP_TYPES = {
     "FMT_VARIABLE_SPEED_PUMP": "VARIABLE",
@@ -16,6 +49,24 @@ PUMP_TYPES = {
     "PMP_DUAL_SPEED": "DUAL",
 }
 
+# Equipment kinds that can be excluded from telemetry in the options.
+SELECTABLE_ITEM_KINDS = {
+    "Filter": "Filters",
+    "Pumps": "Pumps",
+    "Heaters": "Heaters",
+    "Chlorinator": "Chlorinators",
+    "CSAD": "CSAD (pH/ORP)",
+    "Lights": "Lights",
+    "Relays": "Relays",
+    "ValveActuators": "Valve actuators",
+}
+# Shared-Type of equipment used by more than one body of water.
+SHARED_EQUIPMENT = "BOW_SHARED_EQUIPMENT"
+
+# Valve actuators are relays of this type.
+VALVE_ACTUATOR_KIND = "ValveActuators"
+VALVE_ACTUATOR_TYPE = "RLY_VALVE_ACTUATOR"
+
 ALL_ITEM_KINDS = {
     "BOWS",
     "Filter",
@@ -10,7 +10,7 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant
 
-from .const import COORDINATOR, DOMAIN, OMNI_API
+from .const import CONNECTION_STATS, COORDINATOR, DOMAIN, OMNI_API
 
 TO_REDACT = {CONF_USERNAME, CONF_PASSWORD}
 SYSTEM_ID_FIELDS = {"systemId", "System-Id"}
@@ -44,6 +44,14 @@ def make_serializable(obj):
         return str(obj)
 
 
+def redact_key(key):
+    """Redact the numeric parts of a key that look like system IDs."""
+    if isinstance(key, str) and any(part.isdigit() and len(part) >= 4 for part in key.split("_")):
+        parts = key.split("_")
+        return "_".join(["**REDACTED**" if part.isdigit() and len(part) >= 4 else part for part in parts])
+    return key
+
+
 def redact_system_ids(data):
     """Recursively redact system IDs in the data."""
     if isinstance(data, dict):
@@ -54,12 +62,8 @@ def redact_system_ids(data):
                 result[k] = "**REDACTED**"
             else:
                 # Check if the key contains a system ID (like "Backyard_49840")
-                new_k = k
-                if isinstance(k, str) and any(part.isdigit() and len(part) >= 4 for part in k.split("_")):
-                    # Replace numeric parts that look like IDs with REDACTED
-                    parts = k.split("_")
-                    new_k = "_".join(["**REDACTED**" if part.isdigit() and len(part) >= 4 else part for part in parts])
-                
+                new_k = redact_key(k)
+
                 # Recursively process the value
                 result[new_k] = redact_system_ids(v)
         return result
@@ -94,11 +98,23 @@ async def async_get_config_entry_diagnostics(
     telemetry_data = redact_system_ids(telemetry_data)
     msp_config = redact_system_ids(msp_config)
     
+    # Records of the latest polls and commands, keyed and named by item
+    flight_recorder = redact_system_ids(coordinator.flight_recorder.as_dict())
+    for command in flight_recorder["commands"]:
+        command["item"] = redact_key(command["item"])
+
     # Create diagnostics data
     diagnostics_data = {
         "entry": async_redact_data(entry.as_dict(), TO_REDACT),
         "msp_config": msp_config,
         "telemetry_data": telemetry_data,
+        "connection": hass.data[DOMAIN][entry.entry_id][CONNECTION_STATS].as_dict(),
+        "load_shedding": coordinator.load_shedder.as_dict(),
+        "flight_recorder": flight_recorder,
+        "command_latency": {
+            **coordinator.command_latency.as_dict(),
+            "learned_refresh_delay": coordinator.refresh_planner.learned_latency,
+        },
     }
 
     return diagnostics_data
@@ -0,0 +1,248 @@
+"""Memory-mapped ring files of numeric telemetry, one per backyard."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+HISTORY_DIRECTORY = "omnilogic_history"
+MAGIC = b"OLH1"
+# Magic, record size, capacity, next slot and number of records written.
+HEADER = struct.Struct("<4sHIII")
+HEADER_SIZE = 32
+# Seconds since the epoch, field index and value.
+RECORD = struct.Struct("<IHf")
+# About 10 MB per backyard, several days of 40 fields polled every 30 seconds.
+DEFAULT_CAPACITY = 1_000_000
+
+
+def numeric_fields(item: dict) -> Iterator[tuple[str, float]]:
+    """Yield the numeric telemetry fields of an item.
+
+    Telemetry attributes are lower camel case, while configuration and IDs such as
+    Max-Pump-Speed or systemId are not, or do not change between polls.
+    """
+    for key, value in item.items():
+        if not key[:1].islower() or key == "systemId" or not isinstance(value, str):
+            continue
+        try:
+            yield key, float(value)
+        except ValueError:
+            continue
+
+
+def field_key(item_id: tuple, field: str) -> str:
+    """Return the key a field is indexed by."""
+    return "/".join(str(part) for part in item_id) + ":" + field
+
+
+class HistoryRing:
+    """A fixed-size ring of telemetry samples in a memory-mapped file.
+
+    Samples are written to the mapping in place, so readers only touch the pages
+    they go through. Field keys are indexed in a JSON file next to the ring.
+    Touching the mapping can block on disk, so the ring is only used from the
+    executor, and record, samples and close hold a lock so a read never sees a
+    half-written poll or a closed map.
+    """
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the ring. It must be opened before use."""
+        self.path = path
+        self.capacity = capacity
+        self.fields: dict[str, int] = {}
+        self.fields_changed = False
+        self.lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._head = 0
+        self._count = 0
+
+    @property
+    def fields_path(self) -> str:
+        """Return the path of the field index."""
+        return self.path + ".fields.json"
+
+    def open(self) -> None:
+        """Open the ring file, creating it or starting over if it does not fit."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        size = HEADER_SIZE + self.capacity * RECORD.size
+        existing = os.path.exists(self.path) and os.path.getsize(self.path) == size
+
+        self._file = open(self.path, "r+b" if existing else "w+b")
+        if not existing:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+        magic, record_size, capacity, head, count = HEADER.unpack_from(self._map)
+        if (magic, record_size, capacity) == (MAGIC, RECORD.size, self.capacity):
+            self._head, self._count = head, count
+            try:
+                with open(self.fields_path, encoding="utf-8") as file:
+                    self.fields = json.load(file)
+            except (OSError, ValueError):
+                # Samples cannot be told apart without their index.
+                self._head = self._count = 0
+        self.write_header()
+
+    def close(self) -> None:
+        """Write the field index and close the file."""
+        with self.lock:
+            if self._map is None:
+                return
+            self.save_fields()
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def record(self, timestamp: int, samples: list[tuple[str, float]]) -> None:
+        """Append the samples of one poll and write the header and field index."""
+        with self.lock:
+            if self._map is None:
+                return
+            for key, value in samples:
+                self.append(timestamp, key, value)
+            self.write_header()
+            self.save_fields()
+
+    def save_fields(self) -> None:
+        """Write the field index when fields were added."""
+        if not self.fields_changed:
+            return
+        self.fields_changed = False
+        with open(self.fields_path, "w", encoding="utf-8") as file:
+            json.dump(self.fields, file)
+
+    def append(self, timestamp: int, key: str, value: float) -> None:
+        """Write one sample, overwriting the oldest once the ring is full."""
+        index = self.fields.get(key)
+        if index is None:
+            index = self.fields[key] = len(self.fields)
+            self.fields_changed = True
+
+        RECORD.pack_into(
+            self._map, HEADER_SIZE + self._head * RECORD.size, timestamp, index, value
+        )
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def write_header(self) -> None:
+        """Write the position of the newest sample after appending."""
+        HEADER.pack_into(
+            self._map, 0, MAGIC, RECORD.size, self.capacity, self._head, self._count
+        )
+
+    def samples(
+        self, keys: set[str] | None = None, since: int = 0
+    ) -> list[tuple[int, str, float]]:
+        """Return the samples of some or all fields since a time, oldest first.
+
+        The ring is read backwards from the newest sample and stops at the first one
+        older than since.
+        """
+        with self.lock:
+            if self._map is None:
+                return []
+            names = {index: key for key, index in self.fields.items()}
+            wanted = None
+            if keys is not None:
+                wanted = {self.fields[key] for key in keys if key in self.fields}
+
+            result = []
+            slot = self._head
+            for _ in range(self._count):
+                slot = (slot - 1) % self.capacity
+                timestamp, index, value = RECORD.unpack_from(
+                    self._map, HEADER_SIZE + slot * RECORD.size
+                )
+                if timestamp < since:
+                    break
+                if wanted is None or index in wanted:
+                    result.append((timestamp, names[index], value))
+
+        result.reverse()
+        return result
+
+
+class TelemetryHistory:
+    """Record every poll's numeric telemetry into one ring per backyard."""
+
+    def __init__(self, hass: HomeAssistant, capacity: int = DEFAULT_CAPACITY) -> None:
+        """Initialize the history."""
+        self._hass = hass
+        self._capacity = capacity
+        self.rings: dict[tuple, HistoryRing] = {}
+        self._unavailable: set[tuple] = set()
+
+    async def async_record(self, data: dict) -> None:
+        """Append the numeric fields of a poll to the rings of their backyards.
+
+        The fields are collected on the event loop and written in one executor job.
+        """
+        timestamp = int(dt_util.utcnow().timestamp())
+        batches: dict[HistoryRing, list[tuple[str, float]]] = {}
+
+        for item_id, item in data.items():
+            backyard_id = item_id[:2]
+            ring = self.rings.get(backyard_id)
+            if ring is None:
+                if backyard_id in self._unavailable:
+                    continue
+                ring = await self._async_open(backyard_id)
+                if ring is None:
+                    continue
+            batches.setdefault(ring, []).extend(
+                (field_key(item_id, field), value)
+                for field, value in numeric_fields(item)
+            )
+
+        if batches:
+            await self._hass.async_add_executor_job(_record, timestamp, batches)
+
+    async def _async_open(self, backyard_id: tuple) -> HistoryRing | None:
+        """Open the ring of a backyard."""
+        path = self._hass.config.path(HISTORY_DIRECTORY, f"{backyard_id[1]}.ring")
+        ring = HistoryRing(path, self._capacity)
+        try:
+            await self._hass.async_add_executor_job(ring.open)
+        except OSError as error:
+            # Not retried until the entry is reloaded, to keep the log readable.
+            _LOGGER.warning("Could not open telemetry history %s: %s", path, error)
+            self._unavailable.add(backyard_id)
+            ring = None
+        else:
+            self.rings[backyard_id] = ring
+        return ring
+
+    async def async_samples(
+        self, backyard_id: tuple, keys: set[str] | None = None, since: int = 0
+    ) -> list[tuple[int, str, float]]:
+        """Return the samples of a backyard, read in the executor."""
+        ring = self.rings.get(backyard_id)
+        if ring is None:
+            return []
+        return await self._hass.async_add_executor_job(ring.samples, keys, since)
+
+    async def async_close(self) -> None:
+        """Close every ring."""
+        rings = list(self.rings.values())
+        self.rings = {}
+        for ring in rings:
+            await self._hass.async_add_executor_job(ring.close)
+
+
+def _record(timestamp: int, batches: dict[HistoryRing, list[tuple[str, float]]]) -> None:
+    """Write the samples of one poll to their rings."""
+    for ring, samples in batches.items():
+        ring.record(timestamp, samples)
@@ -0,0 +1,177 @@
+"""Histograms of the time the Omnilogic cloud takes to apply commands."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+# Upper bounds of the histogram buckets in seconds. Slower samples fall in a last,
+# open-ended bucket.
+BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180)
+# The equipment kinds commands are sent to.
+COMMAND_KINDS = ("Filter", "Pumps", "Heaters", "Chlorinator", "Lights", "Relays")
+
+
+class LatencyHistogram:
+    """Counts of command-to-confirmation latencies in fixed buckets."""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum", "timeouts")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+        self.timeouts = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LatencyHistogram:
+        """Restore a stored histogram, starting over if the buckets changed."""
+        histogram = cls()
+        if len(data.get("counts", ())) != len(histogram.counts):
+            return histogram
+        histogram.counts = list(data["counts"])
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.minimum = data["minimum"]
+        histogram.maximum = data["maximum"]
+        histogram.timeouts = data["timeouts"]
+        return histogram
+
+    def to_dict(self) -> dict:
+        """Return the histogram to store."""
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def add(self, sample: float) -> None:
+        """Count one latency sample in seconds."""
+        index = next(
+            (index for index, bound in enumerate(BUCKETS) if sample <= bound),
+            len(BUCKETS),
+        )
+        self.counts[index] += 1
+        self.count += 1
+        self.total += sample
+        self.minimum = sample if self.minimum is None else min(self.minimum, sample)
+        self.maximum = sample if self.maximum is None else max(self.maximum, sample)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the counts of another histogram to this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.timeouts += other.timeouts
+        if other.minimum is not None:
+            self.minimum = (
+                other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+            )
+            self.maximum = (
+                other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+            )
+
+    def quantile(self, fraction: float) -> float | None:
+        """Estimate a quantile, interpolating within its bucket."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.maximum
+                value = lower + (upper - lower) * (rank - seen) / count
+                return round(min(max(value, self.minimum), self.maximum), 1)
+            seen += count
+        return self.maximum
+
+    def summary(self) -> dict:
+        """Return the statistics and bucket counts."""
+        buckets = {f"le_{bound}s": count for bound, count in zip(BUCKETS, self.counts)}
+        buckets[f"gt_{BUCKETS[-1]}s"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "mean": round(self.total / self.count, 1) if self.count else None,
+            "min": round(self.minimum, 1) if self.minimum is not None else None,
+            "median": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "max": round(self.maximum, 1) if self.maximum is not None else None,
+            "buckets": buckets,
+        }
+
+
+class CommandLatency:
+    """Latency histograms per equipment kind of one account.
+
+    A sample is the time from the cloud accepting a command to the first poll whose
+    telemetry shows the change, so it is rounded up to the next poll. Histograms
+    are stored across restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the histograms."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.latency")
+        self.kinds: dict[str, LatencyHistogram] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored histograms."""
+        stored = await self._store.async_load()
+        if stored:
+            self.kinds = {
+                kind: LatencyHistogram.from_dict(data)
+                for kind, data in stored.get("kinds", {}).items()
+            }
+
+    async def async_save(self) -> None:
+        """Store the histograms now."""
+        await self._store.async_save(self._data_to_store())
+
+    @callback
+    def async_record(self, kind: str, sample: float) -> None:
+        """Count a confirmed command of a kind."""
+        self._histogram(kind).add(sample)
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    @callback
+    def async_record_timeout(self, kind: str) -> None:
+        """Count a command of a kind that was never confirmed."""
+        self._histogram(kind).timeouts += 1
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    def account(self) -> LatencyHistogram:
+        """Return the histogram of every kind together."""
+        histogram = LatencyHistogram()
+        for kind_histogram in self.kinds.values():
+            histogram.merge(kind_histogram)
+        return histogram
+
+    def as_dict(self) -> dict:
+        """Return the summaries for diagnostics."""
+        return {
+            "account": self.account().summary(),
+            "kinds": {
+                kind: histogram.summary() for kind, histogram in self.kinds.items()
+            },
+        }
+
+    def _histogram(self, kind: str) -> LatencyHistogram:
+        """Return the histogram of a kind, creating it when missing."""
+        histogram = self.kinds.get(kind)
+        if histogram is None:
+            histogram = self.kinds[kind] = LatencyHistogram()
+        return histogram
+
+    @callback
+    def _data_to_store(self) -> dict:
+        """Return the histograms to store."""
+        return {
+            "kinds": {
+                kind: histogram.to_dict() for kind, histogram in self.kinds.items()
+            }
+        }
@@ -9,11 +9,17 @@ from homeassistant.components.light import LightEntityFeature
 from homeassistant.const import ATTR_ENTITY_ID
 from homeassistant.helpers import config_validation as cv, entity_platform
 
+from .accessors import FieldPath
 from .common import OmniLogicEntity, OmniLogicUpdateCoordinator
 from .const import COORDINATOR, DOMAIN
 
 SERVICE_SET_V2EFFECT = "set_v2_lights"
 
+# V1 lights only support the first 17 shows.
+V1_EFFECT_LIST = tuple(LightEffect.__members__)[:17]
+V2_EFFECT_LIST = tuple(LightEffect.__members__)
+EFFECT_NAMES = {effect.value: effect.name for effect in LightEffect}
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up the light platform."""
@@ -52,6 +58,7 @@ async def async_setup_entry(hass, entry, async_add_entities):
                     kind=entity_setting["kind"],
                     item_id=item_id,
                     icon=entity_setting["icon"],
+                    fields=entity_setting["fields"],
                 )
 
                 entities.append(entity)
@@ -74,7 +81,11 @@ async def async_setup_entry(hass, entry, async_add_entities):
 
 
 class OmniLogicLightControl(OmniLogicEntity, LightEntity):
-    """Define an Omnilogic Water Heater entity."""
+    """Define an Omnilogic Light entity."""
+
+    _attr_supported_color_modes = frozenset({ColorMode.ONOFF})
+    _attr_color_mode = ColorMode.ONOFF
+    _attr_supported_features = LightEntityFeature.EFFECT
 
     def __init__(
         self,
@@ -84,6 +95,7 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
         icon: str,
         item_id: tuple,
         state_key: str,
+        fields: dict,
     ):
         """Initialize Entities."""
         super().__init__(
@@ -92,6 +104,7 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
             name=name,
             item_id=item_id,
             icon=icon,
+            fields=fields,
         )
 
         self._state_key = state_key
@@ -100,26 +113,25 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
             self._version = 2
             self._brightness = 4
             self._speed = 4
+            self._attr_effect_list = V2_EFFECT_LIST
         else:
             self._version = 1
+            self._attr_effect_list = V1_EFFECT_LIST
 
         self._last_action = 0
         self._state = None
         self._state_delay = 60
         self._effect = None
-        self._attr_supported_color_modes = {ColorMode.ONOFF}
 
     @property
     def is_on(self):
         """Return if the light is on."""
         if self._last_action < (time.time() - self._state_delay):
             if self._version == 2:
-                self._attrs["brightness"] = self.coordinator.data[self._item_id].get(
-                    "brightness"
-                )
-                self._attrs["speed"] = self.coordinator.data[self._item_id].get("speed")
+                self._attrs["brightness"] = self._field("brightness")
+                self._attrs["speed"] = self._field("speed")
 
-            self._state = int(self.coordinator.data[self._item_id][self._state_key])
+            self._state = self._field("state")
 
         return self._state
 
@@ -128,42 +140,24 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
         """Return the current light effect."""
 
         if self._last_action < (time.time() - self._state_delay):
-            self._effect = LightEffect(
-                self.coordinator.data[self._item_id]["currentShow"]
-            ).name
+            self._effect = EFFECT_NAMES.get(self._field("current_show"))
 
         return self._effect
 
-    @property
-    def effect_list(self):
-        """Return the supported light effects."""
-        effect_list = list(LightEffect.__members__)[:17]
-        if self._version == 2:
-            effect_list = list(LightEffect.__members__)
-
-        return effect_list
-
-    @property
-    def supported_features(self):
-        """Return the list of supported features of the light."""
-        return LightEntityFeature.EFFECT
-        
-    @property
-    def color_mode(self):
-        """Return the color mode of the light."""
-        return ColorMode.ONOFF
-
     async def async_set_effect(self, effect):
         """Set the light show effect."""
         self._last_action = time.time()
-        self._effect = LightEffect[effect].value
+        self._effect = effect
         self.async_schedule_update_ha_state()
 
-        await self.coordinator.api.set_lightshow(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_lightshow",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._item_id[-1]),
             int(LightEffect[effect].value),
+            confirm=lambda item: item["currentShow"] == LightEffect[effect].value,
         )
 
     async def async_turn_on(self, **kwargs):
@@ -175,11 +169,14 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
         if kwargs.get(ATTR_EFFECT):
             await self.async_set_effect(kwargs[ATTR_EFFECT])
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._item_id[-1]),
             1,
+            confirm=lambda item: item[self._state_key] != "0",
         )
 
     async def async_turn_off(self, **kwargs):
@@ -188,11 +185,14 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
         self._state = False
         self.async_schedule_update_ha_state()
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._item_id[-1]),
             0,
+            confirm=lambda item: item[self._state_key] == "0",
         )
 
     async def async_set_v2effect(self, **kwargs):
@@ -202,13 +202,17 @@ class OmniLogicLightControl(OmniLogicEntity, LightEntity):
             speed = kwargs.get("speed", self._speed)
             brightness = kwargs.get("brightness", self._brightness)
             if 0 <= speed <= 8 and 0 <= brightness <= 4:
-                await self.coordinator.api.set_lightshowv2(
+                await self.coordinator.async_send_command(
+                    self._item_id,
+                    "set_lightshowv2",
                     int(self._item_id[1]),
                     int(self._item_id[3]),
                     int(self._item_id[-1]),
                     int(self.coordinator.data[self._item_id]["currentShow"]),
                     speed,
                     brightness,
+                    confirm=lambda item: int(item["speed"]) == speed
+                    and int(item["brightness"]) == brightness,
                 )
 
             else:
@@ -227,6 +231,12 @@ LIGHT_TYPES = {
             "kind": "lights",
             "icon": None,
             "guard_condition": [],
+            "fields": {
+                "state": FieldPath("lightState", converter=int),
+                "current_show": FieldPath("currentShow"),
+                "brightness": FieldPath("brightness"),
+                "speed": FieldPath("speed"),
+            },
         },
     ],
 }
\ No newline at end of file
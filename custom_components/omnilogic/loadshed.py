@@ -0,0 +1,144 @@
+"""Event loop lag monitoring and load shedding for the Omnilogic integration."""
+
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_LAG_THRESHOLD,
+    CONF_UPDATE_BUDGET,
+    DEFAULT_LAG_THRESHOLD,
+    DEFAULT_UPDATE_BUDGET,
+)
+
+# How often the event loop is sampled, in seconds.
+LAG_SAMPLE_INTERVAL = 0.5
+# Each level doubles the poll interval, up to 8 times the configured one.
+MAX_LEVEL = 3
+# Entity writes per loop iteration while shedding load.
+WRITE_BATCH_SIZE = 10
+
+
+class LoadShedder:
+    """Measure event loop lag and update cost, and decide how far to back off.
+
+    Every overloaded update raises the shedding level by one and every calm update
+    lowers it by one. While the level is above zero, polls are spaced further
+    apart, history samples are skipped, statistics imports are postponed and
+    entity writes are spread over several loop iterations.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the shedder."""
+        self._hass = hass
+        self._timer: asyncio.TimerHandle | None = None
+        self._expected = None
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.last_update_time = 0.0
+        self.last_write_time = 0.0
+        self.level = 0
+        self.counters = {
+            "overloaded_updates": 0,
+            "interval_stretched": 0,
+            "history_skipped": 0,
+            "statistics_postponed": 0,
+            "writes_batched": 0,
+        }
+
+    @property
+    def shedding(self) -> bool:
+        """Return True while load is being shed."""
+        return self.level > 0
+
+    @property
+    def interval_factor(self) -> int:
+        """Return how many times the poll interval is stretched."""
+        return 2**self.level
+
+    @callback
+    def async_start(self) -> None:
+        """Start sampling the event loop lag."""
+        self._schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop sampling the event loop lag."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self) -> None:
+        """Schedule the next lag sample."""
+        loop = self._hass.loop
+        self._expected = loop.time() + LAG_SAMPLE_INTERVAL
+        self._timer = loop.call_at(self._expected, self._sample)
+
+    def _sample(self) -> None:
+        """Record how late this sample ran."""
+        self.max_lag = max(self.max_lag, self._hass.loop.time() - self._expected)
+        self._schedule()
+
+    @callback
+    def async_evaluate(self, options, update_time: float) -> bool:
+        """Update the shedding level from the lag and cost since the last update.
+
+        update_time is what this update spent on the event loop so far, in seconds.
+        Returns True while load is being shed.
+        """
+        lag_threshold = options.get(CONF_LAG_THRESHOLD, DEFAULT_LAG_THRESHOLD) / 1000
+        update_budget = options.get(CONF_UPDATE_BUDGET, DEFAULT_UPDATE_BUDGET) / 1000
+
+        self.last_lag, self.max_lag = self.max_lag, 0.0
+        self.last_update_time = update_time + self.last_write_time
+        overloaded = (lag_threshold > 0 and self.last_lag > lag_threshold) or (
+            update_budget > 0 and self.last_update_time > update_budget
+        )
+
+        if overloaded:
+            self.counters["overloaded_updates"] += 1
+            self.level = min(self.level + 1, MAX_LEVEL)
+        else:
+            self.level = max(self.level - 1, 0)
+
+        if self.shedding:
+            self.counters["interval_stretched"] += 1
+        return self.shedding
+
+    @callback
+    def async_count(self, counter: str) -> None:
+        """Count one skipped, postponed or batched piece of work."""
+        self.counters[counter] += 1
+
+    @callback
+    def async_run_batched(self, listeners: dict) -> None:
+        """Call coordinator listeners in batches over several loop iterations.
+
+        Listeners removed before their batch runs are skipped.
+        """
+        self.counters["writes_batched"] += 1
+        self.last_write_time = 0.0
+        keys = list(listeners)
+
+        def run_batch(start: int) -> None:
+            began = self._hass.loop.time()
+            for key in keys[start : start + WRITE_BATCH_SIZE]:
+                if (listener := listeners.get(key)) is not None:
+                    listener[0]()
+            self.last_write_time += self._hass.loop.time() - began
+            if start + WRITE_BATCH_SIZE < len(keys):
+                self._hass.loop.call_soon(run_batch, start + WRITE_BATCH_SIZE)
+
+        run_batch(0)
+
+    def as_dict(self) -> dict:
+        """Return the state and counters for diagnostics."""
+        return {
+            "level": self.level,
+            "interval_factor": self.interval_factor,
+            "last_lag": round(self.last_lag, 3),
+            "last_update_time": round(self.last_update_time, 3),
+            **self.counters,
+        }
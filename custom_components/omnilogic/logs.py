@@ -0,0 +1,197 @@
+"""Rate-limited logging and the poll flight recorder of the Omnilogic integration."""
+
+from __future__ import annotations
+
+from collections import deque
+import hashlib
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from .telemetry import changed_fields
+
+# Polls kept in memory, about an hour at 30s, and commands.
+POLL_SUMMARY_LENGTH = 120
+COMMAND_RECORD_LENGTH = 50
+# Changed fields recorded per poll, the rest are only counted.
+MAX_CHANGED_FIELDS = 50
+# Repeats of the same message are logged at most once per interval, in seconds.
+LOG_INTERVAL = 600
+
+
+class RateLimitedLogger:
+    """Log the first occurrence of a message, then at most once per interval.
+
+    Repeats in between are counted and the count is added to the next message that
+    is logged. Nothing is formatted unless the logger would emit the record.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = LOG_INTERVAL) -> None:
+        """Initialize the logger."""
+        self._logger = logger
+        self._interval = interval
+        self._logged_at: dict[str, float] = {}
+        self._suppressed: dict[str, int] = {}
+
+    def log(self, level: int, key: str, msg: str, *args: Any) -> None:
+        """Log a message under a key unless the key was logged recently."""
+        if not self._logger.isEnabledFor(level):
+            return
+
+        now = time.monotonic()
+        logged_at = self._logged_at.get(key)
+        if logged_at is not None and now - logged_at < self._interval:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return
+
+        self._logged_at[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            msg += " (%s similar messages suppressed)"
+            args = (*args, suppressed)
+        self._logger.log(level, msg, *args)
+
+    def reset(self, key: str) -> None:
+        """Forget a key once its condition cleared, so a new one is logged at once."""
+        self._logged_at.pop(key, None)
+        self._suppressed.pop(key, None)
+
+
+class FlightRecorder:
+    """Keep compact records of the most recent polls and commands.
+
+    Polls record their stage timings, a hash of the telemetry and the fields that
+    changed since the previous poll, but never the telemetry itself, so memory stays
+    bounded by the number of records and MAX_CHANGED_FIELDS.
+
+    Only the first telemetry is hashed in full. Later hashes chain the previous one
+    with the recorded changes, so a poll without changes keeps the same hash.
+    """
+
+    def __init__(
+        self, polls: int = POLL_SUMMARY_LENGTH, commands: int = COMMAND_RECORD_LENGTH
+    ) -> None:
+        """Initialize the recorder."""
+        self.polls: deque[dict[str, Any]] = deque(maxlen=polls)
+        self.commands: deque[dict[str, Any]] = deque(maxlen=commands)
+        self._payload_hash: str | None = None
+
+    @callback
+    def async_record_poll(
+        self,
+        started: float,
+        result: str,
+        data: dict | None = None,
+        previous: dict | None = None,
+        error: BaseException | None = None,
+        stages: dict[str, float] | None = None,
+        **details: Any,
+    ) -> None:
+        """Add the record of a poll that started at a monotonic time."""
+        record = _record(started, result, error)
+        if stages:
+            record["stages"] = {
+                stage: round(duration * 1000, 1) for stage, duration in stages.items()
+            }
+        if data is not None:
+            record["items"] = len(data)
+            changes = None
+            if previous is not None:
+                changes = telemetry_changes(previous, data)
+                record.update(changes)
+            if self._payload_hash is None:
+                self._payload_hash = _hash(repr(data))
+            elif changes is not None and (changes["changes"] or len(changes) > 1):
+                self._payload_hash = _hash(self._payload_hash + repr(changes))
+            record["payload_hash"] = self._payload_hash
+        record.update(details)
+        self.polls.append(record)
+
+    @callback
+    def async_record_command(
+        self,
+        started: float,
+        method: str,
+        item_id: tuple,
+        result: Any = None,
+        error: BaseException | None = None,
+        **details: Any,
+    ) -> None:
+        """Add the record of a command that started at a monotonic time."""
+        record = _record(
+            started,
+            "failed" if error is not None or not _succeeded(result) else "ok",
+            error,
+        )
+        record.update(method=method, item=item_key(item_id), **details)
+        self.commands.append(record)
+
+    def latest(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return up to limit poll records, newest last."""
+        polls = list(self.polls)
+        if limit is not None:
+            polls = polls[-limit:] if limit else []
+        return polls
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the polls and commands for diagnostics, oldest first."""
+        return {"polls": list(self.polls), "commands": list(self.commands)}
+
+
+def item_key(item_id: tuple) -> str:
+    """Return the key of an item in records, in the form diagnostics redact."""
+    return "_".join(str(part) for part in item_id)
+
+
+def telemetry_changes(previous: dict, data: dict) -> dict[str, Any]:
+    """Return the changed fields, and the number of added and removed items."""
+    changes: dict[str, dict] = {}
+    room = MAX_CHANGED_FIELDS
+    left_out = 0
+    for item_id, item in data.items():
+        old = previous.get(item_id)
+        if old is None:
+            continue
+        fields = changed_fields(old, item)
+        if len(fields) > room:
+            left_out += len(fields) - room
+            fields = dict(list(fields.items())[:room])
+        if fields:
+            changes[item_key(item_id)] = fields
+            room -= len(fields)
+
+    result: dict[str, Any] = {"changes": changes}
+    if left_out:
+        result["changes_left_out"] = left_out
+    if added := len(data.keys() - previous.keys()):
+        result["added"] = added
+    if removed := len(previous.keys() - data.keys()):
+        result["removed"] = removed
+    return result
+
+
+def _hash(text: str) -> str:
+    """Return a short hash of a text."""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def _record(started: float, result: str, error: BaseException | None) -> dict:
+    """Return the fields every record starts with."""
+    record = {
+        "time": dt_util.utcnow().isoformat(),
+        "duration": round(time.monotonic() - started, 3),
+        "result": result,
+    }
+    if error is not None:
+        record["error_class"] = type(error).__name__
+        record["error"] = str(error)
+    return record
+
+
+def _succeeded(result: Any) -> bool:
+    """Return True unless a command's result reports a failure."""
+    success = result[0] if isinstance(result, tuple) else result
+    return success is not False
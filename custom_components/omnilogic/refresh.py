@@ -0,0 +1,230 @@
+"""Refresh planning for commands sent to the Omnilogic cloud."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+if TYPE_CHECKING:
+    from .common import OmniLogicUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait before the first refresh for a kind without any measured latency.
+DEFAULT_CONFIRM_DELAY = 5.0
+# Bounds applied to the learned delay.
+MIN_CONFIRM_DELAY = 2.0
+MAX_CONFIRM_DELAY = 60.0
+# Extra time added to the learned latency so the refresh lands after the change.
+CONFIRM_MARGIN = 1.0
+# A burst of commands never postpones the refresh by more than this.
+MAX_COALESCE_WINDOW = 30.0
+# Unconfirmed commands are dropped after this many seconds.
+CONFIRM_TIMEOUT = 180.0
+# Weight of a new latency sample in the moving average.
+LATENCY_ALPHA = 0.3
+# A change observed on the first planned refresh may have landed earlier than that
+# refresh, so such samples are scaled down to let the learned delay shrink again.
+FIRST_TRY_FACTOR = 0.8
+
+
+class PendingConfirmation:
+    """A command waiting for telemetry to reflect its change."""
+
+    __slots__ = ("kind", "confirm", "confirm_id", "sent_at", "refreshes")
+
+    def __init__(
+        self,
+        kind: str,
+        confirm: Callable[[dict], bool],
+        confirm_id: tuple,
+        sent_at: float,
+    ):
+        """Initialize the pending confirmation."""
+        self.kind = kind
+        self.confirm = confirm
+        self.confirm_id = confirm_id
+        self.sent_at = sent_at
+        self.refreshes = 0
+
+
+class RefreshPlanner:
+    """Coalesce refresh requests from commands into one delayed telemetry fetch.
+
+    Every command asks the planner for a refresh instead of refreshing right away.
+    The planner keeps a single timer that fires once the slowest equipment kind in
+    the current burst is expected to have applied its change, based on the
+    confirmation latency measured for previous commands of that kind.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: OmniLogicUpdateCoordinator
+    ) -> None:
+        """Initialize the refresh planner."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._latency: dict[str, float] = {}
+        self._pending: dict[tuple, PendingConfirmation] = {}
+        self._refresh_at: float | None = None
+        self._window_start: float | None = None
+        self._unsub_refresh: Callable[[], None] | None = None
+
+    @property
+    def learned_latency(self) -> dict[str, float]:
+        """Return the learned confirmation latency per equipment kind."""
+        return dict(self._latency)
+
+    @property
+    def pending_count(self) -> int:
+        """Return the number of commands waiting for confirmation."""
+        return len(self._pending)
+
+    @property
+    def pending_kinds(self) -> set[str]:
+        """Return the equipment kinds of the commands waiting for confirmation."""
+        return {pending.kind for pending in self._pending.values()}
+
+    def confirmation_delay(self, kind: str | None) -> float:
+        """Return the delay before a refresh is likely to show a change of this kind."""
+        latency = self._latency.get(kind, DEFAULT_CONFIRM_DELAY)
+        return min(max(latency + CONFIRM_MARGIN, MIN_CONFIRM_DELAY), MAX_CONFIRM_DELAY)
+
+    @callback
+    def async_request_refresh(
+        self,
+        item_id: tuple | None = None,
+        confirm: Callable[[dict], bool] | None = None,
+        confirm_id: tuple | None = None,
+        method: str | None = None,
+    ) -> None:
+        """Plan a refresh after a command, optionally tracking its confirmation.
+
+        confirm is run against the telemetry of confirm_id when the change shows up
+        on another item than the one commanded, and of item_id otherwise.
+        """
+        now = time.monotonic()
+        kind = item_id[-2] if item_id else None
+
+        if item_id is not None and confirm is not None:
+            # The latest command of a method supersedes an earlier one on the same
+            # item, while different commands on one item, like a light's power and
+            # its show, are each confirmed on their own.
+            self._pending[(item_id, method)] = PendingConfirmation(
+                kind, confirm, confirm_id or item_id, now
+            )
+
+        self._schedule(now, self.confirmation_delay(kind))
+
+    @callback
+    def async_process_update(self, data: dict, stale: bool = False) -> None:
+        """Check pending commands against freshly parsed telemetry.
+
+        Stale telemetry kept through a timeout predates the commands, so it neither
+        confirms nor times them out; only the next refresh is planned.
+        """
+        if not self._pending:
+            return
+
+        now = time.monotonic()
+
+        if not stale:
+            self._check_pending(data, now)
+
+        if self._pending and self._unsub_refresh is None:
+            # Still waiting on the equipment; look again one learned delay later.
+            delay = max(
+                self.confirmation_delay(pending.kind)
+                for pending in self._pending.values()
+            )
+            self._schedule(now, delay)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel any planned refresh."""
+        self._cancel()
+        self._pending.clear()
+
+    def _check_pending(self, data: dict, now: float) -> None:
+        """Drop the pending commands that are confirmed or timed out."""
+        for key, pending in list(self._pending.items()):
+            pending.refreshes += 1
+            item = data.get(pending.confirm_id)
+
+            if item is not None and _safe_confirm(pending.confirm, item):
+                sample = now - pending.sent_at
+                self._coordinator.command_latency.async_record(pending.kind, sample)
+                if pending.refreshes == 1:
+                    sample *= FIRST_TRY_FACTOR
+                self._record_latency(pending.kind, sample)
+                del self._pending[key]
+            elif now - pending.sent_at > CONFIRM_TIMEOUT:
+                _LOGGER.debug(
+                    "No confirmation for %s command %s on %s after %ss",
+                    pending.kind,
+                    key[1],
+                    key[0],
+                    CONFIRM_TIMEOUT,
+                )
+                self._coordinator.command_latency.async_record_timeout(pending.kind)
+                del self._pending[key]
+
+    def _record_latency(self, kind: str, sample: float) -> None:
+        """Fold a confirmation latency sample into the moving average for a kind."""
+        previous = self._latency.get(kind)
+        if previous is None:
+            self._latency[kind] = sample
+        else:
+            self._latency[kind] = LATENCY_ALPHA * sample + (1 - LATENCY_ALPHA) * previous
+
+        _LOGGER.debug(
+            "%s confirmed after %.1fs, learned delay %.1fs",
+            kind,
+            sample,
+            self._latency[kind],
+        )
+
+    def _schedule(self, now: float, delay: float) -> None:
+        """Move the single planned refresh so it covers a request due after delay."""
+        if self._window_start is None:
+            self._window_start = now
+
+        refresh_at = max(self._refresh_at or 0, now + delay)
+        refresh_at = max(min(refresh_at, self._window_start + MAX_COALESCE_WINDOW), now)
+
+        if refresh_at == self._refresh_at:
+            return
+
+        self._cancel(reset_window=False)
+        self._refresh_at = refresh_at
+        self._unsub_refresh = async_call_later(
+            self._hass, refresh_at - now, self._async_refresh
+        )
+
+    def _cancel(self, reset_window: bool = True) -> None:
+        """Cancel the planned refresh timer."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        self._refresh_at = None
+        if reset_window:
+            self._window_start = None
+
+    async def _async_refresh(self, _now: Any) -> None:
+        """Run the planned refresh."""
+        self._unsub_refresh = None
+        self._refresh_at = None
+        self._window_start = None
+        await self._coordinator.async_refresh()
+
+
+def _safe_confirm(confirm: Callable[[dict], bool], item: dict) -> bool:
+    """Evaluate a confirmation check, treating missing telemetry as unconfirmed."""
+    try:
+        return bool(confirm(item))
+    except (KeyError, TypeError, ValueError):
+        return False
@@ -0,0 +1,132 @@
+"""Equipment runtime and energy totals accumulated from each poll."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+# Longer gaps between polls, such as a restart, are not counted.
+MAX_GAP = timedelta(hours=1)
+
+# The state and speed fields of the equipment whose runtime is tracked.
+TRACKED_KINDS = {
+    "Filter": ("filterState", "filterSpeed"),
+    "Pumps": ("pumpState", "pumpSpeed"),
+    "Heaters": ("heaterState", None),
+    "Relays": ("relayState", None),
+}
+
+
+def pump_power(rated_power: float, speed: float) -> float:
+    """Estimate the power in W of a pump running at a speed in percent.
+
+    By the pump affinity laws, power grows with the cube of the speed.
+    """
+    return rated_power * (min(max(speed, 0), 100) / 100) ** 3
+
+
+def storage_key(item_id: tuple) -> str:
+    """Return the key of an item in the stored totals."""
+    return "/".join(str(part) for part in item_id)
+
+
+class RuntimeTotals:
+    """Accumulated runtime and energy of one item, and its state in the last poll."""
+
+    __slots__ = ("runtime", "energy", "on", "power")
+
+    def __init__(self, runtime: float = 0.0, energy: float = 0.0) -> None:
+        """Initialize the totals."""
+        self.runtime = runtime
+        self.energy = energy
+        self.on = False
+        self.power = 0.0
+
+
+class RuntimeAccumulator:
+    """Add up runtime and estimated energy of pumps, heaters and relays.
+
+    The state seen in a poll is assumed to hold until the next one. Totals only
+    ever increase and are stored across restarts.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the accumulator."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.runtime")
+        self.totals: dict[tuple, RuntimeTotals] = {}
+        self._stored: dict[str, dict] = {}
+        self._updated_at = None
+
+    async def async_load(self) -> None:
+        """Load the stored totals."""
+        stored = await self._store.async_load()
+        if stored:
+            self._stored = stored.get("items", {})
+
+    async def async_save(self) -> None:
+        """Store the totals now."""
+        await self._store.async_save(self._data_to_store())
+
+    @callback
+    def async_update(
+        self, data: dict, rated_power: float, now: datetime | None = None
+    ) -> None:
+        """Count the time since the last poll and take the states of this one."""
+        now = now or dt_util.utcnow()
+        elapsed = 0.0
+        if self._updated_at is not None and now - self._updated_at <= MAX_GAP:
+            elapsed = (now - self._updated_at).total_seconds()
+        self._updated_at = now
+
+        for item_id, item in data.items():
+            fields = TRACKED_KINDS.get(item_id[-2]) if len(item_id) >= 4 else None
+            if fields is None:
+                continue
+
+            totals = self.totals.get(item_id)
+            if totals is None:
+                stored = self._stored.get(storage_key(item_id), {})
+                totals = self.totals[item_id] = RuntimeTotals(
+                    stored.get("runtime", 0.0), stored.get("energy", 0.0)
+                )
+
+            if totals.on:
+                totals.runtime += elapsed
+                totals.energy += totals.power * elapsed / 3_600_000
+
+            state_key, speed_key = fields
+            try:
+                totals.on = int(item.get(state_key, 0)) != 0
+            except (TypeError, ValueError):
+                totals.on = False
+            totals.power = 0.0
+            if totals.on and speed_key is not None:
+                try:
+                    totals.power = pump_power(rated_power, float(item[speed_key]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+    @callback
+    def async_skip(self) -> None:
+        """Leave out the time until the next update, as no fresh states are known."""
+        self._updated_at = None
+
+    @callback
+    def _data_to_store(self) -> dict:
+        """Return the totals to store, keeping those of items not seen since."""
+        items = dict(self._stored)
+        for item_id, totals in self.totals.items():
+            items[storage_key(item_id)] = {
+                "runtime": totals.runtime,
+                "energy": totals.energy,
+            }
+        return {"items": items}
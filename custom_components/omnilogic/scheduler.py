@@ -0,0 +1,87 @@
+"""Prioritized access to the Omnilogic cloud for commands and telemetry polls."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# After this many preemptions a poll runs to completion even if commands arrive,
+# so a steady stream of commands can never starve telemetry.
+MAX_POLL_RESTARTS = 3
+
+
+class RequestScheduler:
+    """Give user commands priority over telemetry polls on the shared client.
+
+    Commands run as soon as they are issued. A poll waits until no command is in
+    flight before it starts, and a poll that is already running is cancelled and
+    restarted once the commands have finished.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the scheduler."""
+        self._commands_in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._poll_task: asyncio.Task | None = None
+        self._poll_preemptible = False
+        self._preempted_task: asyncio.Task | None = None
+        self.preempted_polls = 0
+
+    @property
+    def commands_in_flight(self) -> int:
+        """Return the number of commands currently running."""
+        return self._commands_in_flight
+
+    async def async_command(
+        self, func: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Run a command ahead of any telemetry poll."""
+        self._commands_in_flight += 1
+        self._idle.clear()
+
+        poll_task = self._poll_task
+        if poll_task is not None and self._poll_preemptible and not poll_task.done():
+            _LOGGER.debug("Preempting telemetry poll for %s", func.__name__)
+            self._preempted_task = poll_task
+            poll_task.cancel()
+
+        try:
+            return await func(*args)
+        finally:
+            self._commands_in_flight -= 1
+            if self._commands_in_flight == 0:
+                self._idle.set()
+
+    async def async_poll(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a telemetry poll once no command is pending."""
+        restarts = 0
+
+        while True:
+            preemptible = restarts < MAX_POLL_RESTARTS
+            if preemptible:
+                await self._idle.wait()
+
+            task = asyncio.ensure_future(func())
+            self._poll_task = task
+            self._poll_preemptible = preemptible
+
+            try:
+                return await task
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if task is not self._preempted_task or (
+                    current is not None and current.cancelling()
+                ):
+                    raise
+                restarts += 1
+                self.preempted_polls += 1
+            finally:
+                if self._poll_task is task:
+                    self._poll_task = None
+                if self._preempted_task is task:
+                    self._preempted_task = None
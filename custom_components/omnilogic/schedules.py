@@ -0,0 +1,89 @@
+"""Index of the schedules the MSP runs on its own."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+ALL_DAYS = 0x7F
+# Seconds after a scheduled transition before the change shows up in telemetry.
+SCHEDULE_SETTLE_DELAY = 20
+# The MSP configuration is read again after this long to pick up edited schedules.
+SCHEDULE_REFRESH_INTERVAL = timedelta(hours=6)
+
+
+class ScheduleIndex:
+    """Schedule start and end times sorted by minute of the day.
+
+    Each transition is stored as (minute of day, days mask, equipment id). The days
+    mask follows the MSP's days-active field with Monday as bit 0, and a mask of 0
+    is treated as every day.
+    """
+
+    def __init__(self, transitions: list[tuple[int, int, str]]) -> None:
+        """Initialize the index."""
+        self._transitions = sorted(transitions)
+        self._minutes = [minute for minute, _, _ in self._transitions]
+
+    def __len__(self) -> int:
+        """Return the number of indexed transitions."""
+        return len(self._transitions)
+
+    @classmethod
+    def from_msp_config(cls, msp_config: list) -> ScheduleIndex:
+        """Build the index from the parsed MSP configuration of every backyard."""
+        transitions = []
+
+        for config in msp_config or []:
+            schedules = (config.get("Schedules") or {}).get("sche") or []
+            if isinstance(schedules, dict):
+                schedules = [schedules]
+
+            for schedule in schedules:
+                if str(schedule.get("enabled", "yes")).lower() not in ("yes", "1", "true"):
+                    continue
+
+                try:
+                    days = int(schedule.get("days-active", 0)) or ALL_DAYS
+                    start = int(schedule["start-hour"]) * 60 + int(schedule["start-minute"])
+                    end = int(schedule["end-hour"]) * 60 + int(schedule["end-minute"])
+                except (KeyError, TypeError, ValueError):
+                    _LOGGER.debug("Skipping unreadable schedule %s", schedule)
+                    continue
+
+                equipment_id = schedule.get("equipment-id", "")
+                transitions.append((start % MINUTES_PER_DAY, days, equipment_id))
+                if end != start:
+                    # A schedule that runs past midnight ends on the following day.
+                    end_days = days if end > start else _next_day_mask(days)
+                    transitions.append((end % MINUTES_PER_DAY, end_days, equipment_id))
+
+        return cls(transitions)
+
+    def next_transition(self, now: datetime) -> datetime | None:
+        """Return the time of the first scheduled transition after now."""
+        if not self._transitions:
+            return None
+
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        minute_now = now.hour * 60 + now.minute
+        start = bisect_left(self._minutes, minute_now + 1)
+
+        for day_offset in range(8):
+            weekday_bit = 1 << ((now.weekday() + day_offset) % 7)
+            first = start if day_offset == 0 else 0
+
+            for minute, days, _ in self._transitions[first:]:
+                if days & weekday_bit:
+                    return midnight + timedelta(days=day_offset, minutes=minute)
+
+        return None
+
+
+def _next_day_mask(days: int) -> int:
+    """Rotate a days mask forward by one day."""
+    return ((days << 1) | (days >> 6)) & ALL_DAYS
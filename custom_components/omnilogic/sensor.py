@@ -8,16 +8,21 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     UnitOfElectricPotential,
+    UnitOfEnergy,
     UnitOfMass,
     PERCENTAGE,
     UnitOfTemperature,
+    UnitOfTime,
     UnitOfVolume,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .common import OmniLogicEntity, OmniLogicUpdateCoordinator, check_guard
 from .const import COORDINATOR, DEFAULT_PH_OFFSET, DOMAIN, PUMP_TYPES
+from .latency import COMMAND_KINDS
+from .statistics import statistic_id
 
 
 async def async_setup_entry(
@@ -55,6 +60,28 @@ async def async_setup_entry(
 
                 entities.append(entity)
 
+    # Command latency is measured per account, so its sensors sit on the first
+    # backyard: one for every command and one per kind of equipment present.
+    backyard_id = next((item_id for item_id in coordinator.data if len(item_id) == 2), None)
+    if backyard_id is not None:
+        kinds = {item_id[-2] for item_id in coordinator.data}
+        for command_kind in (None, *COMMAND_KINDS):
+            if command_kind is not None and command_kind not in kinds:
+                continue
+            entities.append(
+                OmniLogicCommandLatencySensor(
+                    coordinator=coordinator,
+                    state_key=command_kind,
+                    name=f"{command_kind or ''} Command Latency".strip(),
+                    kind="_".join(filter(None, ("command_latency", command_kind))).lower(),
+                    item_id=backyard_id,
+                    device_class=SensorDeviceClass.DURATION,
+                    state_class=None,
+                    icon="mdi:timer-sand",
+                    unit=UnitOfTime.SECONDS,
+                )
+            )
+
     async_add_entities(entities)
 
 
@@ -90,6 +117,26 @@ class OmnilogicSensor(OmniLogicEntity, SensorEntity):
         self._state_class = state_class
         self._unit = unit
         self._state_key = state_key
+        self._statistic_id = None
+
+        # The integration writes the statistics of measurements itself, so the
+        # recorder must not compile them from the states as well.
+        if (
+            state_class == SensorStateClass.MEASUREMENT
+            and coordinator.statistics is not None
+        ):
+            self._statistic_id = statistic_id(self._unique_id)
+            self._state_class = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state and add the reading to the statistics."""
+        super()._handle_coordinator_update()
+        if self._statistic_id is not None:
+            value = self.native_value
+            self.coordinator.statistics.async_add(
+                self._statistic_id, self.name, self.native_unit_of_measurement, value
+            )
 
     @property
     def device_class(self):
@@ -261,6 +308,78 @@ class OmniLogicORPSensor(OmnilogicSensor):
         return orp_state
 
 
+class OmniLogicRuntimeSensor(OmnilogicSensor):
+    """Define an OmniLogic equipment runtime sensor."""
+
+    @property
+    def native_value(self):
+        """Return the total runtime in hours."""
+        totals = self.coordinator.runtime.totals.get(self._item_id)
+        if totals is None:
+            return None
+
+        return round(totals.runtime / 3600, 3)
+
+
+class OmniLogicEnergySensor(OmnilogicSensor):
+    """Define an OmniLogic pump energy estimate sensor."""
+
+    @property
+    def native_value(self):
+        """Return the total estimated energy in kWh."""
+        totals = self.coordinator.runtime.totals.get(self._item_id)
+        if totals is None:
+            return None
+
+        self._attrs["estimated_power"] = round(totals.power)
+
+        return round(totals.energy, 3)
+
+
+class OmniLogicCommandLatencySensor(OmnilogicSensor):
+    """Define a diagnostic sensor of the median time commands take to apply.
+
+    The state key is the equipment kind, or None for every command of the account.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def native_value(self):
+        """Return the median latency in seconds, with the histogram as attributes."""
+        latency = self.coordinator.command_latency
+        if self._state_key is None:
+            histogram = latency.account()
+        else:
+            histogram = latency.kinds.get(self._state_key)
+        if histogram is None:
+            return None
+
+        summary = histogram.summary()
+        median = summary.pop("median")
+        self._attrs.update(summary)
+
+        return median
+
+
+RUNTIME_SENSOR = {
+    "name": "Runtime",
+    "device_class": SensorDeviceClass.DURATION,
+    "state_class": SensorStateClass.TOTAL_INCREASING,
+    "icon": "mdi:timer-outline",
+    "unit": UnitOfTime.HOURS,
+    "guard_condition": [{}],
+}
+ENERGY_SENSOR = {
+    "name": "Energy",
+    "device_class": SensorDeviceClass.ENERGY,
+    "state_class": SensorStateClass.TOTAL_INCREASING,
+    "icon": None,
+    "unit": UnitOfEnergy.KILO_WATT_HOUR,
+    "guard_condition": [{}],
+}
+
+
 SENSOR_TYPES = {
     (2, "Backyard"): [
         {
@@ -301,6 +420,16 @@ SENSOR_TYPES = {
                 {"Filter-Type": "FMT_SINGLE_SPEED"},
             ],
         },
+        {
+            **RUNTIME_SENSOR,
+            "entity_classes": {"filterState": OmniLogicRuntimeSensor},
+            "kind": "filter_pump_runtime",
+        },
+        {
+            **ENERGY_SENSOR,
+            "entity_classes": {"filterSpeed": OmniLogicEnergySensor},
+            "kind": "filter_pump_energy",
+        },
     ],
     (6, "Pumps"): [
         {
@@ -315,6 +444,37 @@ SENSOR_TYPES = {
                 {"Type": "PMP_SINGLE_SPEED"},
             ],
         },
+        {
+            **RUNTIME_SENSOR,
+            "entity_classes": {"pumpState": OmniLogicRuntimeSensor},
+            "kind": "pump_runtime",
+        },
+        {
+            **ENERGY_SENSOR,
+            "entity_classes": {"pumpSpeed": OmniLogicEnergySensor},
+            "kind": "pump_energy",
+        },
+    ],
+    (6, "Heaters"): [
+        {
+            **RUNTIME_SENSOR,
+            "entity_classes": {"heaterState": OmniLogicRuntimeSensor},
+            "kind": "heater_runtime",
+        },
+    ],
+    (4, "Relays"): [
+        {
+            **RUNTIME_SENSOR,
+            "entity_classes": {"relayState": OmniLogicRuntimeSensor},
+            "kind": "relay_runtime",
+        },
+    ],
+    (6, "Relays"): [
+        {
+            **RUNTIME_SENSOR,
+            "entity_classes": {"relayState": OmniLogicRuntimeSensor},
+            "kind": "relay_runtime",
+        },
     ],
     (6, "Chlorinator"): [
         {
@@ -0,0 +1,169 @@
+"""Services of the Omnilogic integration that are not bound to an entity."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .const import COORDINATOR, DOMAIN
+from .websocket_api import item_key, item_values
+
+SERVICE_GET_SNAPSHOT = "get_snapshot"
+SERVICE_GET_POLL_SUMMARIES = "get_poll_summaries"
+
+GET_SNAPSHOT_SCHEMA = vol.Schema(
+    {
+        vol.Optional("backyard"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("bow"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("kind"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("field"): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+GET_POLL_SUMMARIES_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    }
+)
+
+
+def typed_value(value: Any) -> Any:
+    """Return a telemetry value as a number or boolean where it is one."""
+    if not isinstance(value, str):
+        return value
+    if value in ("yes", "no"):
+        return value == "yes"
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def bow_of(item_id: tuple) -> tuple | None:
+    """Return the BOW of an item, which is the item itself for a BOW."""
+    if len(item_id) >= 4 and item_id[2] == "BOWS":
+        return item_id[:4]
+    return None
+
+
+def matches(wanted: list[str] | None, item: dict | None, item_id: tuple | None) -> bool:
+    """Return True if no filter is set, or it names the item or its system ID."""
+    if wanted is None:
+        return True
+    if item is None or item_id is None:
+        return False
+    return bool(
+        {item.get("Name"), item.get("BackyardName"), str(item_id[-1])} & set(wanted)
+    )
+
+
+def build_snapshot(coordinator, call_data: dict) -> list[dict[str, Any]]:
+    """Return the items of an entry that pass the filters of a service call."""
+    data = coordinator.data
+    kinds = call_data.get("kind")
+    fields = call_data.get("field")
+    items = []
+
+    for item_id, item in data.items():
+        if kinds is not None and item_id[-2] not in kinds:
+            continue
+        backyard_id = item_id[:2]
+        if not matches(call_data.get("backyard"), data.get(backyard_id), backyard_id):
+            continue
+        bow_id = bow_of(item_id)
+        if not matches(call_data.get("bow"), data.get(bow_id), bow_id):
+            continue
+
+        values = {
+            field: typed_value(value)
+            for field, value in item_values(item).items()
+            if (fields is None or field in fields)
+            and not isinstance(value, (dict, list))
+        }
+        if fields is not None and not values:
+            continue
+
+        node = coordinator.topology.get(item_id)
+        items.append(
+            {
+                "item": item_key(item_id),
+                "kind": item_id[-2],
+                "name": node.name_prefix.strip() if node else item.get("Name"),
+                "backyard": data[backyard_id].get("BackyardName"),
+                "bow": data[bow_id].get("Name") if bow_id else None,
+                "values": values,
+            }
+        )
+
+    return items
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_GET_SNAPSHOT):
+        return
+
+    async def async_get_snapshot(call: ServiceCall) -> ServiceResponse:
+        """Return the current telemetry of every entry, from memory."""
+        items = []
+        for entry_data in hass.data.get(DOMAIN, {}).values():
+            items.extend(build_snapshot(entry_data[COORDINATOR], call.data))
+        return {"items": items}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SNAPSHOT,
+        async_get_snapshot,
+        schema=GET_SNAPSHOT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_get_poll_summaries(call: ServiceCall) -> ServiceResponse:
+        """Return the summaries of the latest polls of every entry."""
+        entries = hass.data.get(DOMAIN, {})
+        if "entry_id" in call.data:
+            entries = {
+                entry_id: entry_data
+                for entry_id, entry_data in entries.items()
+                if entry_id == call.data["entry_id"]
+            }
+        return {
+            "entries": {
+                entry_id: entry_data[COORDINATOR].flight_recorder.latest(
+                    call.data.get("limit")
+                )
+                for entry_id, entry_data in entries.items()
+            }
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_POLL_SUMMARIES,
+        async_get_poll_summaries,
+        schema=GET_POLL_SUMMARIES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+@callback
+def async_remove_services(hass: HomeAssistant) -> None:
+    """Remove the integration's services once no entry is loaded."""
+    if not hass.data.get(DOMAIN):
+        hass.services.async_remove(DOMAIN, SERVICE_GET_SNAPSHOT)
+        hass.services.async_remove(DOMAIN, SERVICE_GET_POLL_SUMMARIES)
@@ -0,0 +1,137 @@
+"""Dedicated HTTP session for the Omnilogic cloud."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import aiohttp
+
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from homeassistant.util.ssl import get_default_context
+
+# Long enough to keep the connection open between polls at the default interval.
+KEEPALIVE_TIMEOUT = 75
+DNS_CACHE_TTL = 600
+# Polls, commands and token refreshes of one account rarely overlap.
+CONNECTION_LIMIT = 4
+
+USER_AGENT = f"HomeAssistant/{HA_VERSION} omnilogic"
+
+
+class ConnectionStats:
+    """Counters of connection reuse, DNS lookups and traffic on one session."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connect_time = 0.0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config that updates these counters."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(self._on_dns_cache_miss)
+        trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(self._on_response_chunk_received)
+        return trace_config
+
+    def as_dict(self) -> dict:
+        """Return the counters for diagnostics."""
+        connections = self.connections_created + self.connections_reused
+        return {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": (
+                round(self.connections_reused / connections, 3) if connections else None
+            ),
+            "average_connect_time": (
+                round(self.connect_time / self.connections_created, 3)
+                if self.connections_created
+                else None
+            ),
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params) -> None:
+        """Count a request."""
+        self.requests += 1
+
+    async def _on_connection_create_start(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Note when a new connection starts."""
+        context.connect_started = session.loop.time()
+
+    async def _on_connection_create_end(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count a new connection and the time it took."""
+        self.connections_created += 1
+        self.connect_time += session.loop.time() - context.connect_started
+
+    async def _on_connection_reuseconn(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count a reused connection."""
+        self.connections_reused += 1
+
+    async def _on_dns_cache_hit(self, session, context: SimpleNamespace, params) -> None:
+        """Count a cached DNS lookup."""
+        self.dns_cache_hits += 1
+
+    async def _on_dns_cache_miss(self, session, context: SimpleNamespace, params) -> None:
+        """Count a DNS lookup."""
+        self.dns_cache_misses += 1
+
+    async def _on_request_chunk_sent(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count the bytes of a request body."""
+        self.bytes_sent += len(params.chunk)
+
+    async def _on_response_chunk_received(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count the bytes of a response body."""
+        self.bytes_received += len(params.chunk)
+
+
+def create_session(
+    hass: HomeAssistant, trace_configs: list[aiohttp.TraceConfig] | None = None
+) -> tuple[aiohttp.ClientSession, ConnectionStats]:
+    """Create a session of its own for one Omnilogic account.
+
+    The connector keeps the TLS connection to the Hayward endpoint alive between
+    polls and caches its DNS lookups. aiohttp asks for compressed responses by
+    default, while request bodies are sent as they are since the endpoint is not
+    known to accept compressed ones. The caller owns the session and must close it.
+    Extra trace configs are added to the one that counts traffic.
+    """
+    stats = ConnectionStats()
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_LIMIT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=get_default_context(),
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": USER_AGENT},
+        trace_configs=[stats.trace_config(), *(trace_configs or [])],
+    )
+    return session, stats
@@ -0,0 +1,238 @@
+"""Hourly long-term statistics written directly to the recorder."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+HOUR = timedelta(hours=1)
+# Closed hours kept per statistic while the recorder is not running.
+MAX_PENDING_HOURS = 24
+
+
+def statistic_id(unique_id: str) -> str:
+    """Return the external statistic ID of a sensor."""
+    return f"{DOMAIN}:{slugify(unique_id)}"
+
+
+def start_of_hour(moment: datetime) -> datetime:
+    """Return the start of the UTC hour containing moment."""
+    return dt_util.as_utc(moment).replace(minute=0, second=0, microsecond=0)
+
+
+class HourBucket:
+    """Time-weighted sum, minimum and maximum of the readings in one hour."""
+
+    __slots__ = ("start", "weighted_sum", "seconds", "minimum", "maximum")
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize the bucket."""
+        self.start = start
+        self.weighted_sum = 0.0
+        self.seconds = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> HourBucket:
+        """Restore a stored bucket."""
+        bucket = cls(dt_util.parse_datetime(data["start"]))
+        bucket.weighted_sum = data["weighted_sum"]
+        bucket.seconds = data["seconds"]
+        bucket.minimum = data["minimum"]
+        bucket.maximum = data["maximum"]
+        return bucket
+
+    def to_dict(self) -> dict:
+        """Return the bucket to store."""
+        return {
+            "start": self.start.isoformat(),
+            "weighted_sum": self.weighted_sum,
+            "seconds": self.seconds,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+        }
+
+    def add(self, value: float, seconds: float) -> None:
+        """Add a reading that held for a number of seconds."""
+        self.weighted_sum += value * seconds
+        self.seconds += seconds
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def as_statistic(self) -> dict:
+        """Return the bucket as recorder statistic data."""
+        return {
+            "start": self.start,
+            "mean": self.weighted_sum / self.seconds,
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+
+class StatisticSeries:
+    """Hourly mean, minimum and maximum of one sensor.
+
+    Each reading holds until the next one, like the recorder's own compiled
+    statistics, and is split at hour boundaries. A reading of None is a gap.
+    """
+
+    def __init__(self, metadata: dict) -> None:
+        """Initialize the series."""
+        self.metadata = metadata
+        self.buckets: dict[datetime, HourBucket] = {}
+        self.pending: list[dict] = []
+        self._value = None
+        self._since = None
+
+    def add(self, value: float | None, now: datetime) -> None:
+        """Add a reading taken at now."""
+        self.advance(now)
+        self._value = value
+        self._since = now
+
+    def advance(self, now: datetime) -> None:
+        """Account for the current reading up to now."""
+        if self._value is None or now <= self._since:
+            return
+
+        moment = self._since
+        while moment < now:
+            hour = start_of_hour(moment)
+            until = min(now, hour + HOUR)
+            bucket = self.buckets.get(hour)
+            if bucket is None:
+                bucket = self.buckets[hour] = HourBucket(hour)
+            bucket.add(self._value, (until - moment).total_seconds())
+            moment = until
+        self._since = now
+
+    def close(self, before: datetime | None) -> None:
+        """Move the buckets of hours starting before a moment, or all, to pending."""
+        for hour in sorted(self.buckets):
+            if before is not None and hour >= before:
+                break
+            self.pending.append(self.buckets.pop(hour).as_statistic())
+        del self.pending[:-MAX_PENDING_HOURS]
+
+
+class StatisticsAggregator:
+    """Aggregate sensor readings in memory and import them as hourly statistics.
+
+    The recorder only accepts whole hours from external sources, so 5-minute
+    statistics are not written. Finished hours are imported in one batch per
+    statistic. The hours still open are stored, so a reload or restart resumes
+    them instead of importing a partial hour that would later be overwritten.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the aggregator."""
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.statistics")
+        self.series: dict[str, StatisticSeries] = {}
+
+    async def async_load(self) -> None:
+        """Load the stored open hours."""
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        for statistic_id, data in stored.get("series", {}).items():
+            series = self.series[statistic_id] = StatisticSeries(data["metadata"])
+            for bucket_data in data["buckets"]:
+                bucket = HourBucket.from_dict(bucket_data)
+                series.buckets[bucket.start] = bucket
+
+    async def async_save(self) -> None:
+        """Store the open hours now."""
+        await self._store.async_save(self._data_to_store())
+
+    @callback
+    def async_add(
+        self,
+        statistic_id: str,
+        name: str,
+        unit: str | None,
+        value,
+        now: datetime | None = None,
+    ) -> None:
+        """Add a sensor reading."""
+        now = now or dt_util.utcnow()
+        series = self.series.get(statistic_id)
+        if series is None:
+            series = self.series[statistic_id] = StatisticSeries(
+                {
+                    "has_mean": True,
+                    "has_sum": False,
+                    "name": name,
+                    "source": DOMAIN,
+                    "statistic_id": statistic_id,
+                    "unit_of_measurement": unit,
+                }
+            )
+        else:
+            series.metadata["unit_of_measurement"] = unit
+
+        try:
+            series.add(float(value), now)
+        except (TypeError, ValueError):
+            series.add(None, now)
+
+    @callback
+    def async_flush(self) -> None:
+        """Import the finished hours and store the open ones."""
+        now = dt_util.utcnow()
+        for series in self.series.values():
+            series.advance(now)
+            series.close(start_of_hour(now))
+        self._store.async_delay_save(self._data_to_store, SAVE_DELAY)
+
+        if "recorder" not in self._hass.config.components:
+            return
+        # Imported once the recorder is running, as its requirements may be missing
+        # from installations that do not use it.
+        from homeassistant.components.recorder.statistics import (  # pylint: disable=import-outside-toplevel
+            async_add_external_statistics,
+        )
+
+        for series in self.series.values():
+            if not series.pending:
+                continue
+            _LOGGER.debug(
+                "Importing %s hours of %s",
+                len(series.pending),
+                series.metadata["statistic_id"],
+            )
+            # The recorder imports in its own thread, so it gets a copy of the
+            # metadata that later readings cannot change.
+            async_add_external_statistics(
+                self._hass, dict(series.metadata), series.pending
+            )
+            series.pending = []
+
+    @callback
+    def _data_to_store(self) -> dict:
+        """Return the open hours to store.
+
+        Hours waiting for the recorder are left out, as they only pile up while
+        the recorder is not running.
+        """
+        return {
+            "series": {
+                statistic_id: {
+                    "metadata": series.metadata,
+                    "buckets": [bucket.to_dict() for bucket in series.buckets.values()],
+                }
+                for statistic_id, series in self.series.items()
+                if series.buckets
+            }
+        }
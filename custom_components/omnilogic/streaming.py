@@ -0,0 +1,411 @@
+"""Streaming telemetry client that parses straight into the flattened form."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import aiohttp
+from omnilogic import HAYWARD_API_URL, OmniLogic, OmniLogicException
+
+from .telemetry import TelemetryFlattener
+
+_LOGGER = logging.getLogger(__name__)
+
+CHUNK_SIZE = 16384
+# The library reads the MSP configuration on every poll. Names and equipment rarely
+# change, so the streaming client only reads it again after this long.
+CONFIG_REFRESH_INTERVAL = timedelta(hours=1)
+# Kinds whose commanded settings, such as the heater set-point, are merged in from
+# the MSP configuration rather than read from telemetry.
+CONFIG_BACKED_KINDS = frozenset({"Heaters"})
+
+SYSTEM_FIELDS = (
+    "Msp-Vsp-Speed-Format",
+    "Msp-Time-Format",
+    "Units",
+    "Msp-Chlor-Display",
+    "Msp-Language",
+)
+FILTER_FIELDS = (
+    "Name",
+    "Shared-Type",
+    "Filter-Type",
+    "Max-Pump-Speed",
+    "Min-Pump-Speed",
+    "Max-Pump-RPM",
+    "Min-Pump-RPM",
+    "Priming-Enabled",
+)
+PUMP_FIELDS = ("Name", "Type", "Function", "Min-Pump-Speed", "Max-Pump-Speed")
+RELAY_FIELDS = ("Name", "Type", "Function")
+
+# Telemetry elements stored as items, and the kind they are stored under.
+ITEM_TAGS = {
+    "Relay": "Relays",
+    "ColorLogic-Light": "Lights",
+    "Pump": "Pumps",
+    "Heater": "Heaters",
+    "Filter": "Filter",
+    "Chlorinator": "Chlorinator",
+    "CSAD": "CSAD",
+}
+
+
+class StreamingTelemetryError(Exception):
+    """Raised when a telemetry response cannot be parsed as it streams in."""
+
+
+def _as_list(value) -> list:
+    """Return a config entry that may be a single dict as a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _by_system_id(items) -> dict:
+    """Index config entries by their System-Id."""
+    return {
+        item["System-Id"]: item
+        for item in _as_list(items)
+        if isinstance(item, dict) and "System-Id" in item
+    }
+
+
+class SiteConfig:
+    """Equipment metadata of one MSP, indexed for merging into telemetry."""
+
+    def __init__(self, config_item: dict) -> None:
+        """Index the MSP configuration item returned by the omnilogic library."""
+        system = config_item.get("System", {})
+        backyard = config_item.get("Backyard", {})
+
+        self.backyard_name = config_item.get("BackyardName", "")
+        self.system_fields = {
+            field: system[field] for field in SYSTEM_FIELDS if field in system
+        }
+        if "Units" in system:
+            self.system_fields["Unit-of-Measurement"] = system["Units"]
+
+        self.relays = _by_system_id(config_item.get("Relays"))
+        self.bows = {}
+        for bow in backyard.get("BOWS", []):
+            self.bows[bow["System-Id"]] = {
+                "config": bow,
+                "relays": _by_system_id(bow.get("Relays")),
+                "lights": _by_system_id(bow.get("Lights")),
+                "pumps": _by_system_id(bow.get("Pump")),
+                "heaters": {
+                    heater["Operation"]["Heater-Equipment"]["System-Id"]: heater
+                    for heater in bow.get("Heaters", [])
+                    if isinstance(heater.get("Operation", {}).get("Heater-Equipment"), dict)
+                },
+            }
+
+        sensors = backyard.get("Sensor")
+        if sensors is None:
+            bows = backyard.get("Body-of-water")
+            sensors = bows.get("Sensor") if isinstance(bows, dict) else None
+
+        self.temperature_unit = None
+        self.has_air_sensor = False
+        for sensor in _as_list(sensors):
+            if sensor.get("Name") == "AirSensor":
+                self.has_air_sensor = True
+                self.temperature_unit = sensor.get("Units", "UNITS_FAHRENHEIT")
+        if isinstance(sensors, dict) and sensors:
+            self.temperature_unit = sensors.get("Units", "UNITS_FAHRENHEIT")
+
+
+class TelemetryStreamParser:
+    """Parse the telemetry XML of one MSP incrementally into a flattener.
+
+    Every element of the response is a flat record carrying its data in attributes,
+    so each one is merged with its configuration and stored as soon as its start
+    tag has been read, and the element is dropped again.
+    """
+
+    def __init__(
+        self, flattener: TelemetryFlattener, config: SiteConfig, site_alarms: list
+    ) -> None:
+        """Initialize the parser."""
+        self._flattener = flattener
+        self._config = config
+        self._alarms = site_alarms
+        self._parser = XMLPullParser(events=("start",))
+        self._root = None
+        self._backyard_id: tuple | None = None
+        self._bow_id: tuple | None = None
+        self._bow: dict | None = None
+        self._bow_config: dict = {}
+        self._skip_bow = False
+        self._merges = {
+            "Relays": self._merge_relay,
+            "Lights": self._merge_light,
+            "Pumps": self._merge_pump,
+            "Heaters": self._merge_heater,
+            "Filter": self._merge_filter,
+            "Chlorinator": self._merge_chlorinator,
+            "CSAD": self._merge_csad,
+        }
+        self.backyards = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """Parse the next chunk of the response."""
+        try:
+            self._parser.feed(chunk)
+            for _, element in self._parser.read_events():
+                if self._root is None:
+                    self._root = element
+                    continue
+                if "version" not in element.attrib:
+                    self._handle(element.tag, dict(element.attrib))
+            if self._root is not None:
+                self._root.clear()
+        except ParseError as error:
+            raise StreamingTelemetryError(f"Unreadable telemetry: {error}") from error
+        except (AttributeError, KeyError, TypeError) as error:
+            raise StreamingTelemetryError(
+                f"Unexpected telemetry record: {error!r}"
+            ) from error
+
+    def close(self) -> None:
+        """Finish parsing the response."""
+        try:
+            self._parser.close()
+        except ParseError as error:
+            raise StreamingTelemetryError(f"Truncated telemetry: {error}") from error
+        if not self.backyards:
+            raise OmniLogicException("Failure getting telemetry: no backyard returned")
+
+    def _item_alarms(self, system_id: str, bow_only: bool = True) -> list:
+        """Return the site alarms raised on one piece of equipment."""
+        bow_id = self._bow_id[-1] if self._bow_id else None
+        return [
+            alarm
+            for alarm in self._alarms
+            if alarm.get("EquipmentID") == system_id
+            and (not bow_only or alarm.get("BowID") == bow_id)
+        ]
+
+    def _handle(self, tag: str, record: dict) -> None:
+        """Merge one telemetry record with its configuration and store it."""
+        config = self._config
+
+        if tag == "Backyard":
+            record["BackyardName"] = config.backyard_name
+            record.update(config.system_fields)
+            record["Alarms"] = self._alarms
+            if config.temperature_unit is not None:
+                record["Unit-of-Temperature"] = config.temperature_unit
+            if not config.has_air_sensor:
+                record.pop("airTemp", None)
+            self._backyard_id = self._flattener.add(record, "Backyard", ())
+            self._bow_id = self._bow = None
+            self._skip_bow = False
+            self.backyards += 1
+            return
+
+        if self._backyard_id is None:
+            return
+
+        if tag == "BodyOfWater":
+            self._bow_config = config.bows.get(record["systemId"], {})
+            bow = self._bow_config.get("config", {})
+            record["Name"] = bow.get("Name")
+            record["Supports-Spillover"] = bow.get("Supports-Spillover")
+            self._bow_id = self._flattener.add(record, "BOWS", self._backyard_id)
+            self._bow = record
+            self._skip_bow = self._bow_id is None
+            return
+
+        if self._skip_bow:
+            return
+
+        kind = ITEM_TAGS.get(tag)
+
+        if tag == "Relay" and self._bow is None:
+            relay = config.relays.get(record["systemId"])
+            if relay is not None:
+                record.update({field: relay[field] for field in RELAY_FIELDS})
+            record["Alarms"] = self._item_alarms(record["systemId"], bow_only=False)
+            self._flattener.add(record, kind, self._backyard_id)
+            return
+
+        if self._bow is None:
+            return
+
+        merge = self._merges.get(kind)
+        if merge is not None:
+            merge(record)
+        if kind in ("Filter", "Chlorinator", "CSAD") or tag not in ITEM_TAGS:
+            self._bow[tag] = record
+        if kind is not None:
+            self._flattener.add(record, kind, self._bow_id)
+
+    def _merge_relay(self, record: dict) -> None:
+        """Merge a BOW relay with its configuration."""
+        relay = self._bow_config["relays"].get(record["systemId"])
+        if relay is not None:
+            record.update({field: relay[field] for field in RELAY_FIELDS})
+        record["Alarms"] = self._item_alarms(record["systemId"])
+
+    def _merge_light(self, record: dict) -> None:
+        """Merge a ColorLogic light with its configuration."""
+        light = self._bow_config["lights"].get(record["systemId"])
+        if light is not None:
+            record["Name"] = light["Name"]
+            record["Type"] = light["Type"]
+            record["V2"] = light.get("V2-Active", "no")
+        record["Alarms"] = self._item_alarms(record["systemId"])
+
+    def _merge_pump(self, record: dict) -> None:
+        """Merge a pump with its configuration."""
+        pump = self._bow_config["pumps"].get(record["systemId"])
+        if pump is None:
+            pumps = _as_list(self._bow_config["config"].get("Pump"))
+            pump = pumps[0] if len(pumps) == 1 else None
+        if pump is not None:
+            record.update({field: pump[field] for field in PUMP_FIELDS if field in pump})
+        record["Alarms"] = self._item_alarms(record["systemId"])
+
+    def _merge_heater(self, record: dict) -> None:
+        """Merge a heater with its virtual heater configuration."""
+        heater = self._bow_config["heaters"].get(record["systemId"])
+        if heater is not None:
+            equipment = heater["Operation"]["Heater-Equipment"]
+            virtual_heater = dict(equipment)
+            virtual_heater["Current-Set-Point"] = heater["Current-Set-Point"]
+            virtual_heater["Max-Water-Temp"] = heater["Max-Water-Temp"]
+            virtual_heater["Min-Settable-Water-Temp"] = heater["Min-Settable-Water-Temp"]
+            virtual_heater["Max-Settable-Water-Temp"] = heater["Max-Settable-Water-Temp"]
+            virtual_heater["enable"] = equipment["Enabled"]
+            virtual_heater["systemId"] = heater["System-Id"]
+            record["Shared-Type"] = heater["Shared-Type"]
+            record["Operation"] = {"VirtualHeater": virtual_heater}
+            record["Name"] = equipment["Name"]
+        record["Alarms"] = self._item_alarms(record["systemId"])
+        self._bow["Heater"] = record
+
+    def _merge_filter(self, record: dict) -> None:
+        """Merge a filter pump with its configuration."""
+        config = self._bow_config["config"].get("Filter", {})
+        record.update({field: config[field] for field in FILTER_FIELDS if field in config})
+        record["Alarms"] = self._item_alarms(record["systemId"])
+
+    def _merge_chlorinator(self, record: dict) -> None:
+        """Merge a chlorinator with its configuration."""
+        config = self._bow_config["config"].get("Chlorinator", {})
+        record["Name"] = config.get("Name")
+        record["Shared-Type"] = config.get("Shared-Type")
+        operation = config.get("Operation", [])
+        if isinstance(operation, dict):
+            record["Operation"] = [operation["Chlorinator-Equipment"]]
+        else:
+            record["Operation"] = list(operation)
+        record["Alarms"] = self._item_alarms(record["systemId"])
+
+    def _merge_csad(self, record: dict) -> None:
+        """Attach the alarms of a CSAD."""
+        record["Alarms"] = self._item_alarms(record["systemId"], bow_only=False)
+
+
+class StreamingTelemetryClient:
+    """Fetch telemetry for every MSP of an account without the nested tree.
+
+    Login, token refresh, alarms and the MSP configuration still go through the
+    omnilogic library. Only the telemetry response itself is streamed and parsed
+    here, with the library's token on the session the account was set up with.
+    """
+
+    def __init__(self, api: OmniLogic, session: aiohttp.ClientSession) -> None:
+        """Initialize the client."""
+        self.api = api
+        self._session = session
+        self._configs: dict[str, SiteConfig] = {}
+        self._configs_loaded_at: datetime | None = None
+
+    async def async_fetch(self, flattener: TelemetryFlattener) -> None:
+        """Stream the telemetry of every MSP into the flattener."""
+        api = self.api
+        if api.token is None and not await api.connect():
+            raise OmniLogicException("No authentication token available")
+        if not api.systems:
+            await api.get_site_list()
+        if not api.systems:
+            raise OmniLogicException("Failure getting telemetry: No systems found")
+
+        await self._async_load_configs()
+
+        for system in api.systems:
+            msp_system_id = system["MspSystemID"]
+            config = self._configs.get(msp_system_id)
+            if config is None:
+                _LOGGER.warning("Could not find config data for system %s", msp_system_id)
+                continue
+
+            try:
+                response = await api.call_api(
+                    "GetAlarmList",
+                    {"Token": api.token, "MspSystemID": msp_system_id, "Version": "0"},
+                )
+                site_alarms = api.alarms_to_json(response)
+                if site_alarms and site_alarms[0].get("BowID") == "False":
+                    site_alarms = []
+
+                parser = TelemetryStreamParser(flattener, config, site_alarms)
+                await self._async_stream(msp_system_id, parser)
+            except aiohttp.ClientError as error:
+                # Raised like the library does, so the poll fails the usual way.
+                raise OmniLogicException(
+                    f"Failure getting telemetry: {error}"
+                ) from error
+
+    async def _async_load_configs(self) -> None:
+        """Read the MSP configuration when it is missing or stale."""
+        now = datetime.now()
+        if (
+            self._configs_loaded_at is not None
+            and now - self._configs_loaded_at < CONFIG_REFRESH_INTERVAL
+        ):
+            return
+
+        msp_config = await self.api.get_msp_config_file()
+        self._configs = {
+            config_item["MspSystemID"]: SiteConfig(config_item)
+            for config_item in msp_config
+        }
+        self._configs_loaded_at = now
+
+    async def _async_stream(self, msp_system_id, parser: TelemetryStreamParser) -> None:
+        """Post the telemetry request and feed the response to the parser."""
+        api = self.api
+        if api.token_expiry and datetime.now() >= api.token_expiry:
+            await api.authenticate()
+
+        payload = api.buildRequest(
+            "GetTelemetryData", {"Token": api.token, "MspSystemID": msp_system_id}
+        )
+        headers = {
+            "content-type": "text/xml",
+            "cache-control": "no-cache",
+            "Token": api.token,
+            "SiteID": str(msp_system_id),
+        }
+
+        async with self._session.post(
+            HAYWARD_API_URL, data=payload, headers=headers
+        ) as resp:
+            if resp.status != 200:
+                raise OmniLogicException(
+                    f"Failure getting telemetry: HTTP status {resp.status}"
+                )
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                parser.feed(chunk)
+
+        parser.close()
+
+    def invalidate_config(self) -> None:
+        """Read the MSP configuration again on the next poll."""
+        self._configs_loaded_at = None
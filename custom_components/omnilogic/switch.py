@@ -12,7 +12,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.exceptions import IntegrationError
 
 from .common import OmniLogicEntity, OmniLogicUpdateCoordinator, check_guard
-from .const import COORDINATOR, DOMAIN, PUMP_TYPES
+from .const import COORDINATOR, DOMAIN, PUMP_TYPES, VALVE_ACTUATOR_TYPE
 
 SERVICE_SET_SPEED = "set_pump_speed"
 SERVICE_SET_CHLOR_TIMED_PERCENT = "set_chlor_timed_percent"
@@ -88,7 +88,7 @@ class OmniLogicSwitch(OmniLogicEntity, SwitchEntity):
 
         switch_type = coordinator.data[item_id].get("Type", "")
 
-        if switch_type == "RLY_VALVE_ACTUATOR":
+        if switch_type == VALVE_ACTUATOR_TYPE:
             icon = "mdi:valve"
 
         """Initialize Entities."""
@@ -138,11 +138,14 @@ class OmniLogicRelayControl(OmniLogicSwitch):
         if len(self._item_id) == 4:
             bow_id = 0
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             bow_id,
             int(self._item_id[-1]),
             1,
+            confirm=lambda item: item[self._state_key] != "0",
         )
 
     async def async_turn_off(self, **kwargs):
@@ -156,11 +159,14 @@ class OmniLogicRelayControl(OmniLogicSwitch):
         if len(self._item_id) == 4:
             bow_id = 0
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             bow_id,
             int(self._item_id[-1]),
             0,
+            confirm=lambda item: item[self._state_key] == "0",
         )
 
 
@@ -207,11 +213,14 @@ class OmniLogicPumpControl(OmniLogicSwitch):
         if self._pump_type != "SINGLE" and self._last_speed:
             on_value = self._last_speed
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._item_id[-1]),
             on_value,
+            confirm=lambda item: item[self._state_key] != "0",
         )
 
     async def async_turn_off(self, **kwargs):
@@ -226,11 +235,14 @@ class OmniLogicPumpControl(OmniLogicSwitch):
             else:
                 self._last_speed = self.coordinator.data[self._item_id]["pumpSpeed"]
 
-        await self.coordinator.api.set_relay_valve(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_relay_valve",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._item_id[-1]),
             0,
+            confirm=lambda item: item[self._state_key] == "0",
         )
 
     async def async_set_speed(self, speed):
@@ -238,11 +250,17 @@ class OmniLogicPumpControl(OmniLogicSwitch):
 
         if self._pump_type != "SINGLE":
             if self._min_speed <= speed <= self._max_speed:
-                success = await self.coordinator.api.set_relay_valve(
+                success = await self.coordinator.async_send_command(
+                    self._item_id,
+                    "set_relay_valve",
                     int(self._item_id[1]),
                     int(self._item_id[3]),
                     int(self._item_id[-1]),
                     speed,
+                    confirm=lambda item: int(
+                        item.get("filterSpeed", item.get("pumpSpeed"))
+                    )
+                    == speed,
                 )
 
                 if success:
@@ -269,39 +287,39 @@ class OmniLogicChlorinatorSwitch(OmniLogicSwitch):
 
     async def async_turn_on(self):
         """Turn the chlorinator on."""
-        success, _ = await self.coordinator.api.set_chlor_params(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_chlor_params",
             int(self._item_id[3]),  # PoolID
             int(self._equipment_id),  # ChlorID (from Operation System-Id)
-            3  # cfgState: Enable/On
+            3,  # cfgState: Enable/On
+            confirm=lambda item: item[self._state_key] != "0",
         )
-        
-        if success:
-            await self.coordinator.async_request_refresh()
 
     async def async_turn_off(self):
         """Turn the chlorinator off."""
-        success, _ = await self.coordinator.api.set_chlor_params(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_chlor_params",
             int(self._item_id[3]),  # PoolID
             int(self._equipment_id),  # ChlorID (from Operation System-Id)
-            2  # cfgState: Disable/Off
+            2,  # cfgState: Disable/Off
+            confirm=lambda item: item[self._state_key] == "0",
         )
-        
-        if success:
-            await self.coordinator.async_request_refresh()
 
     async def async_set_chlor_timed_percent(self, timed_percent):
         """Set the chlorinator timed percentage."""
-        success, _ = await self.coordinator.api.set_chlor_params(
+        await self.coordinator.async_send_command(
+            self._item_id,
+            "set_chlor_params",
             int(self._item_id[3]),  # PoolID
             int(self._equipment_id),  # ChlorID (from Operation System-Id)
             None,  # cfgState (not changing state)
             None,  # opMode (not changing)
             None,  # bowType (not changing)
-            int(timed_percent)  # timedPercent
+            int(timed_percent),  # timedPercent
+            confirm=lambda item: int(item["Timed-Percent"]) == int(timed_percent),
         )
-        
-        if success:
-            await self.coordinator.async_request_refresh()
 
 
 class OmniLogicSuperchlorinateSwitch(OmniLogicSwitch):
@@ -328,18 +346,23 @@ class OmniLogicSuperchlorinateSwitch(OmniLogicSwitch):
         # Ensure parent chlorinator is on first
         if self.coordinator.data[self._item_id]["operatingMode"] == "0":
             # Turn on chlorinator first
-            await self.coordinator.api.set_equipment(
+            await self.coordinator.async_send_command(
+                self._item_id,
+                "set_equipment",
                 int(self._item_id[3]),  # PoolID
                 int(self._equipment_id),  # EquipmentID
-                1  # IsOn
+                1,  # IsOn
             )
         
         # Then enable superchlorination
-        success = await self.coordinator.api.set_superchlorination(
+        success = await self.coordinator.async_send_command(
+            self._item_id,
+            "set_superchlorination",
             int(self._item_id[1]),  # MspSystemID
             int(self._item_id[3]),  # PoolID
             int(self._equipment_id),  # ChlorID
-            1  # IsOn
+            1,  # IsOn
+            confirm=lambda item: item[self._state_key] != "0",
         )
         
         if success:
@@ -347,11 +370,14 @@ class OmniLogicSuperchlorinateSwitch(OmniLogicSwitch):
 
     async def async_turn_off(self):
         """Turn superchlorination off."""
-        success = await self.coordinator.api.set_superchlorination(
+        success = await self.coordinator.async_send_command(
+            self._item_id,
+            "set_superchlorination",
             int(self._item_id[1]),  # MspSystemID
             int(self._item_id[3]),  # PoolID
             int(self._equipment_id),  # ChlorID
-            0  # IsOn
+            0,  # IsOn
+            confirm=lambda item: item[self._state_key] == "0",
         )
         
         if success:
@@ -0,0 +1,126 @@
+"""Flattening of Omnilogic telemetry into items keyed by their kind/systemId path."""
+
+from __future__ import annotations
+
+from .const import (
+    ALL_ITEM_KINDS,
+    SHARED_EQUIPMENT,
+    VALVE_ACTUATOR_KIND,
+    VALVE_ACTUATOR_TYPE,
+)
+
+
+def changed_fields(old: dict, new: dict) -> dict:
+    """Return the fields of an item that changed, with None for removed ones.
+
+    The child items nested in backyards and BOWs are left out.
+    """
+    fields = {
+        field: value
+        for field, value in new.items()
+        if field not in ALL_ITEM_KINDS and old.get(field) != value
+    }
+    fields.update({field: None for field in old.keys() - new.keys() - ALL_ITEM_KINDS})
+    return fields
+
+
+class TelemetryFlattener:
+    """Collect telemetry items one at a time into the flattened form.
+
+    Excluded BOWs and excluded equipment kinds are skipped along with everything
+    below them. Equipment shared between BOWs is stored once, under the first BOW
+    that lists it, with the telemetry of an active copy when one exists.
+    """
+
+    def __init__(
+        self, excluded_bows=frozenset(), excluded_kinds=frozenset()
+    ) -> None:
+        """Initialize the flattener."""
+        self.items: dict[tuple, dict] = {}
+        self.shared_links: dict[tuple, list[tuple]] = {}
+        self.available_bows: dict[str, str] = {}
+        self.kinds = [kind for kind in ALL_ITEM_KINDS if kind not in excluded_kinds]
+        self._excluded_bows = excluded_bows
+        self._excluded_kinds = excluded_kinds
+        self._skip_valves = VALVE_ACTUATOR_KIND in excluded_kinds
+        self._shared_ids: dict[tuple, tuple] = {}
+
+    def add(self, item: dict, item_kind: str, parent_id: tuple) -> tuple | None:
+        """Store an item below its parent and return its item_id.
+
+        None is returned when the item is skipped, or when it is a further copy of
+        shared equipment that is already stored.
+        """
+        system_id = item["systemId"]
+
+        if item_kind == "BOWS":
+            backyard = self.items.get(parent_id, {})
+            self.available_bows[system_id] = (
+                f"{backyard.get('BackyardName', '')} {item.get('Name', '')}".strip()
+            )
+            if system_id in self._excluded_bows:
+                return None
+        if item_kind in self._excluded_kinds:
+            return None
+        if (
+            self._skip_valves
+            and item_kind == "Relays"
+            and item.get("Type") == VALVE_ACTUATOR_TYPE
+        ):
+            return None
+
+        item_id = parent_id + (item_kind, system_id)
+
+        if item.get("Shared-Type") == SHARED_EQUIPMENT and len(parent_id) == 4:
+            shared_key = (parent_id[:2], item_kind, system_id)
+            canonical_id = self._shared_ids.get(shared_key)
+            if canonical_id is not None:
+                self.shared_links[canonical_id].append(parent_id)
+                if (
+                    self.items[canonical_id].get("status") == "0"
+                    and item.get("status") != "0"
+                ):
+                    self.items[canonical_id] = item
+                return None
+            self._shared_ids[shared_key] = item_id
+            self.shared_links[item_id] = [parent_id]
+
+        self.items[item_id] = item
+        return item_id
+
+    def add_tree(self, data) -> None:
+        """Add every item of the nested telemetry returned by the omnilogic library."""
+
+        def get_item_data(item, item_kind, current_id):
+            """Get data per kind of Omnilogic API item."""
+            if isinstance(item, list):
+                for single_item in item:
+                    get_item_data(single_item, item_kind, current_id)
+                return
+
+            if "systemId" in item:
+                current_id = self.add(item, item_kind, current_id)
+                if current_id is None:
+                    return
+
+            for kind in self.kinds:
+                if kind in item:
+                    get_item_data(item[kind], kind, current_id)
+
+        get_item_data(data, "Backyard", ())
+
+
+def flatten_telemetry(
+    data, excluded_bows=frozenset(), excluded_kinds=frozenset(), shared_links=None
+) -> dict:
+    """Flatten the telemetry tree into items keyed by their kind/systemId path.
+
+    The BOWs using each shared item are added to shared_links when it is given.
+    """
+    flattener = TelemetryFlattener(excluded_bows, excluded_kinds)
+    flattener.add_tree(data)
+
+    if shared_links is not None:
+        shared_links.update(flattener.shared_links)
+
+    return flattener.items
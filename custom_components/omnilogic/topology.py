@@ -0,0 +1,133 @@
+"""Topology index for the Omnilogic integration."""
+
+from __future__ import annotations
+
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import DOMAIN
+
+
+class TopologyNode:
+    """Where an item sits in the equipment tree and how its entities are named."""
+
+    __slots__ = (
+        "backyard_id",
+        "bow_id",
+        "msp_system_id",
+        "backyard_name",
+        "name_prefix",
+        "unique_id_prefix",
+        "device_info",
+        "shared_bows",
+    )
+
+    def __init__(
+        self,
+        backyard_id: tuple,
+        bow_id: tuple | None,
+        msp_system_id: str,
+        backyard_name: str,
+        name_prefix: str,
+        unique_id_prefix: str,
+        device_info: DeviceInfo,
+        shared_bows: tuple = (),
+    ) -> None:
+        """Initialize the node."""
+        self.backyard_id = backyard_id
+        self.bow_id = bow_id
+        self.msp_system_id = msp_system_id
+        self.backyard_name = backyard_name
+        self.name_prefix = name_prefix
+        self.unique_id_prefix = unique_id_prefix
+        self.device_info = device_info
+        self.shared_bows = shared_bows
+
+    def entity_name(self, name: str) -> str:
+        """Return the friendly name of an entity of this item."""
+        return f"{self.name_prefix} {name}"
+
+    def entity_unique_id(self, kind: str) -> str:
+        """Return the unique ID of an entity of this item."""
+        return f"{self.unique_id_prefix}_{kind}".replace(" ", "_")
+
+
+def backyard_device_info(msp_system_id: str, backyard_name: str) -> DeviceInfo:
+    """Return the device describing a backyard/MSP system."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, msp_system_id)},
+        manufacturer="Hayward",
+        model="OmniLogic",
+        name=backyard_name,
+    )
+
+
+def build_topology(
+    data: dict, bow_devices: bool = False, shared_links: dict | None = None
+) -> dict[tuple, TopologyNode]:
+    """Index every flattened item by its backyard, BOW, names and device.
+
+    Shared equipment also records every BOW that uses it, from shared_links.
+
+    Device descriptors are shared between all items of a backyard, or of a BOW when
+    bow_devices is set, in which case each BOW becomes a sub-device of its backyard.
+    """
+    topology = {}
+    shared_links = shared_links or {}
+    backyard_devices = {}
+    bow_device_infos = {}
+
+    for item_id, item in data.items():
+        backyard_id = item_id[:2]
+        backyard = data[backyard_id]
+        msp_system_id = backyard["systemId"]
+        backyard_name = backyard["BackyardName"]
+
+        device_info = backyard_devices.get(backyard_id)
+        if device_info is None:
+            device_info = backyard_device_info(msp_system_id, backyard_name)
+            backyard_devices[backyard_id] = device_info
+
+        bow_id = item_id[:4] if len(item_id) == 6 else None
+
+        name_prefix = f"{backyard_name} "
+        unique_id_prefix = f"{msp_system_id}"
+
+        if bow_id is not None:
+            bow = data[bow_id]
+            name_prefix = f"{name_prefix}{bow['Name']} "
+            unique_id_prefix = f"{unique_id_prefix}_{bow['systemId']}"
+
+        unique_id_prefix = f"{unique_id_prefix}_{item['systemId']}"
+
+        if item.get("Name") is not None:
+            name_prefix = f"{name_prefix} {item['Name']}"
+
+        device_bow_id = bow_id
+        if device_bow_id is None and len(item_id) == 4 and item_id[2] == "BOWS":
+            device_bow_id = item_id
+
+        if bow_devices and device_bow_id is not None:
+            device_info = bow_device_infos.get(device_bow_id)
+            if device_info is None:
+                bow = data[device_bow_id]
+                device_info = DeviceInfo(
+                    identifiers={(DOMAIN, f"{msp_system_id}_{bow['systemId']}")},
+                    manufacturer="Hayward",
+                    model="OmniLogic Body of Water",
+                    name=f"{backyard_name} {bow['Name']}",
+                    via_device=(DOMAIN, msp_system_id),
+                )
+                bow_device_infos[device_bow_id] = device_info
+
+        topology[item_id] = TopologyNode(
+            backyard_id=backyard_id,
+            bow_id=bow_id,
+            msp_system_id=msp_system_id,
+            backyard_name=backyard_name,
+            name_prefix=name_prefix,
+            unique_id_prefix=unique_id_prefix,
+            device_info=device_info,
+            shared_bows=tuple(shared_links.get(item_id, ())),
+        )
+
+    return topology
@@ -0,0 +1,406 @@
+"""Opt-in tracing spans for Omnilogic cloud calls and coordinator stages."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextvars import ContextVar
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import CONF_OTLP_ENDPOINT, CONF_TRACE_FILE, DOMAIN
+from .logs import RateLimitedLogger
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_DIRECTORY = "omnilogic_traces"
+# The trace file is rotated once it grows past this size, keeping one old file.
+MAX_TRACE_FILE_SIZE = 10_000_000
+# Finished spans kept until their trace ends, in case a trace never does.
+MAX_PENDING_SPANS = 1000
+OTLP_TIMEOUT = 10
+OTLP_KIND_INTERNAL = 1
+OTLP_KIND_CLIENT = 3
+OTLP_STATUS_OK = 1
+OTLP_STATUS_ERROR = 2
+
+# The omnilogic client methods that call the cloud.
+TRACED_METHODS = (
+    "connect",
+    "get_telemetry_data",
+    "get_msp_config_file",
+    "set_relay_valve",
+    "set_lightshow",
+    "set_lightshowv2",
+    "set_heater_temperature",
+    "set_heater_onoff",
+    "set_chlor_params",
+    "set_superchlorination",
+    "set_equipment",
+    "set_pump_speed",
+    "set_spillover_speed",
+)
+
+# The entity whose service call is being handled, if any.
+current_entity: ContextVar[str | None] = ContextVar(
+    f"{DOMAIN}_current_entity", default=None
+)
+_current_span: ContextVar["Span | None"] = ContextVar(
+    f"{DOMAIN}_current_span", default=None
+)
+
+
+class Span:
+    """A timed operation, nested in the span that was current when it started."""
+
+    __slots__ = (
+        "_tracer",
+        "_token",
+        "name",
+        "client",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "end",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, tracer: Tracer, name: str, client: bool, attributes: dict) -> None:
+        """Initialize the span."""
+        self._tracer = tracer
+        self._token = None
+        self.name = name
+        self.client = client
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = secrets.token_hex(8)
+        self.start = self.end = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def __enter__(self) -> Span:
+        """Start the span and make it current."""
+        self.start = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        """End the span, recording an exception as its outcome."""
+        self.end = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None and self.error is None:
+            self.error = f"{type(exc).__name__}: {exc}"
+        self._tracer.finish(self)
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def add(self, key: str, value: int) -> None:
+        """Add to a counting attribute."""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def fail(self, error: str) -> None:
+        """Record that the operation failed without raising."""
+        self.error = error
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the span as a JSON-lines record."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start / 1e9,
+            "duration": (self.end - self.start) / 1e9,
+            "outcome": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def as_otlp(self) -> dict[str, Any]:
+        """Return the span in the OTLP JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": OTLP_KIND_CLIENT if self.client else OTLP_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": otlp_attributes(self.attributes),
+            "status": (
+                {"code": OTLP_STATUS_ERROR, "message": self.error}
+                if self.error
+                else {"code": OTLP_STATUS_OK}
+            ),
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NullSpan:
+    """Stand in for a span while tracing is off."""
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        pass
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def add(self, key: str, value: int) -> None:
+        pass
+
+    def fail(self, error: str) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return attributes as OTLP key-values."""
+    result = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        result.append({"key": key, "value": encoded})
+    return result
+
+
+class JsonLinesExporter:
+    """Append finished spans to a JSON-lines file, written in the executor."""
+
+    def __init__(self, hass: HomeAssistant, path: str, resource: dict) -> None:
+        """Initialize the exporter."""
+        self._hass = hass
+        self.path = path
+        self._resource = resource
+        self._lock = threading.Lock()
+
+    @callback
+    def export(self, spans: list[Span]) -> None:
+        """Write a batch of spans."""
+        lines = "".join(
+            json.dumps({**self._resource, **span.as_dict()}, default=str) + "\n"
+            for span in spans
+        )
+        self._hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: str) -> None:
+        """Append lines to the file, rotating it when it grew too large."""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                if (
+                    os.path.exists(self.path)
+                    and os.path.getsize(self.path) > MAX_TRACE_FILE_SIZE
+                ):
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(lines)
+            except OSError as error:
+                _LOGGER.warning("Could not write traces %s: %s", self.path, error)
+
+
+class OtlpExporter:
+    """Post finished spans to an OpenTelemetry collector over OTLP/HTTP JSON."""
+
+    def __init__(self, hass: HomeAssistant, endpoint: str, resource: dict) -> None:
+        """Initialize the exporter."""
+        self._hass = hass
+        endpoint = endpoint.rstrip("/")
+        if not endpoint.endswith("/v1/traces"):
+            endpoint += "/v1/traces"
+        self.endpoint = endpoint
+        self._resource = {"attributes": otlp_attributes(resource)}
+        self._log = RateLimitedLogger(_LOGGER)
+
+    @callback
+    def export(self, spans: list[Span]) -> None:
+        """Post a batch of spans in the background."""
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __package__},
+                            "spans": [span.as_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self._hass.async_create_background_task(
+            self._async_post(payload), f"{DOMAIN} trace export"
+        )
+
+    async def _async_post(self, payload: dict) -> None:
+        """Post one batch, logging failures at most every few minutes."""
+        session = async_get_clientsession(self._hass)
+        try:
+            async with session.post(
+                self.endpoint,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=OTLP_TIMEOUT),
+            ) as resp:
+                if resp.status >= 300:
+                    self._log.log(
+                        logging.WARNING,
+                        "status",
+                        "Trace collector %s answered HTTP %s",
+                        self.endpoint,
+                        resp.status,
+                    )
+        except (aiohttp.ClientError, TimeoutError) as error:
+            self._log.log(
+                logging.WARNING,
+                "error",
+                "Could not send traces to %s: %s",
+                self.endpoint,
+                error,
+            )
+
+
+class Tracer:
+    """Create spans and hand each finished trace to the configured exporters.
+
+    While no exporter is configured, span returns a shared no-op span, so traced
+    code costs a lookup and a call.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the tracer."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self.exporters: list[JsonLinesExporter | OtlpExporter] = []
+        self._pending: list[Span] = []
+        self._options: tuple | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Return True while spans are exported."""
+        return bool(self.exporters)
+
+    @callback
+    def async_apply_options(self, options) -> None:
+        """Set up the exporters chosen in the options."""
+        trace_file = options.get(CONF_TRACE_FILE, False)
+        endpoint = options.get(CONF_OTLP_ENDPOINT, "").strip()
+        if (trace_file, endpoint) == self._options:
+            return
+        self._options = (trace_file, endpoint)
+
+        # Spans from several installations are told apart by these.
+        resource = {
+            "service.name": DOMAIN,
+            "service.instance.id": self._entry_id,
+            "site": self._hass.config.location_name,
+        }
+        self.exporters = []
+        self._pending = []
+        if trace_file:
+            path = self._hass.config.path(TRACE_DIRECTORY, f"{self._entry_id}.jsonl")
+            self.exporters.append(JsonLinesExporter(self._hass, path, resource))
+        if endpoint:
+            self.exporters.append(OtlpExporter(self._hass, endpoint, resource))
+
+    def span(self, name: str, client: bool = False, **attributes: Any) -> Span | _NullSpan:
+        """Return a span to use as a context manager."""
+        if not self.exporters:
+            return NULL_SPAN
+        return Span(self, name, client, attributes)
+
+    def finish(self, span: Span) -> None:
+        """Keep a finished span, exporting its trace once the root span finished."""
+        if len(self._pending) < MAX_PENDING_SPANS:
+            self._pending.append(span)
+        if span.parent_id is None:
+            spans = [item for item in self._pending if item.trace_id == span.trace_id]
+            self._pending = [
+                item for item in self._pending if item.trace_id != span.trace_id
+            ]
+            for exporter in self.exporters:
+                exporter.export(spans)
+
+    def instrument(self, api: Any) -> None:
+        """Wrap the cloud calls of an omnilogic client in client spans."""
+        for method in TRACED_METHODS:
+            func = getattr(api, method, None)
+            if func is not None:
+                setattr(api, method, self._traced(method, func))
+
+    def _traced(self, method: str, func: Callable) -> Callable:
+        """Return a cloud call wrapped in a span."""
+
+        @functools.wraps(func)
+        async def traced(*args: Any, **kwargs: Any) -> Any:
+            with self.span(f"api.{method}", client=True) as span:
+                result = await func(*args, **kwargs)
+                success = result[0] if isinstance(result, tuple) else result
+                if success is False:
+                    span.fail("The cloud rejected the command")
+                return result
+
+        return traced
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Return a trace config adding HTTP details to the current span."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
+        trace_config.on_response_chunk_received.append(
+            self._on_response_chunk_received
+        )
+        return trace_config
+
+    async def _on_request_start(self, session, context: SimpleNamespace, params) -> None:
+        """Count a request."""
+        if (span := _current_span.get()) is not None:
+            span.add("http.requests", 1)
+
+    async def _on_request_end(self, session, context: SimpleNamespace, params) -> None:
+        """Record the status of the response."""
+        if (span := _current_span.get()) is not None:
+            span.set("http.status_code", params.response.status)
+
+    async def _on_request_chunk_sent(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count the bytes of a request body."""
+        if (span := _current_span.get()) is not None:
+            span.add("http.request_size", len(params.chunk))
+
+    async def _on_response_chunk_received(
+        self, session, context: SimpleNamespace, params
+    ) -> None:
+        """Count the bytes of a response body."""
+        if (span := _current_span.get()) is not None:
+            span.add("http.response_size", len(params.chunk))
@@ -13,11 +13,12 @@ from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from .accessors import BACKYARD, BOW, FieldPath, yes_no
 from .common import OmniLogicEntity, OmniLogicUpdateCoordinator, check_guard
 from .const import COORDINATOR, DOMAIN
 
 SUPPORT_FLAGS_HEATER = WaterHeaterEntityFeature.TARGET_TEMPERATURE | WaterHeaterEntityFeature.OPERATION_MODE
-OPERATION_LIST = [STATE_ON, STATE_OFF]
+OPERATION_LIST = (STATE_ON, STATE_OFF)
 
 
 async def async_setup_entry(
@@ -48,6 +49,7 @@ async def async_setup_entry(
                     kind=entity_setting["kind"],
                     item_id=item_id,
                     icon=entity_setting["icon"],
+                    fields=entity_setting["fields"],
                 )
 
                 entities.append(entity)
@@ -58,6 +60,10 @@ async def async_setup_entry(
 class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
     """Define an Omnilogic Water Heater entity."""
 
+    _attr_temperature_unit = UnitOfTemperature.FAHRENHEIT
+    _attr_supported_features = SUPPORT_FLAGS_HEATER
+    _attr_operation_list = OPERATION_LIST
+
     def __init__(
         self,
         coordinator: OmniLogicUpdateCoordinator,
@@ -66,6 +72,7 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
         icon: str,
         item_id: tuple,
         state_key: str,
+        fields: dict,
     ):
         """Initialize Entities."""
         super().__init__(
@@ -74,6 +81,7 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
             name=name,
             item_id=item_id,
             icon=icon,
+            fields=fields,
         )
 
         self._state_key = state_key
@@ -81,52 +89,25 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
             "systemId"
         ]
 
-    @property
-    def temperature_unit(self):
-        """Return the unit of measure for the target temp."""
-        return UnitOfTemperature.FAHRENHEIT
-
     @property
     def target_temperature(self):
         """Return the target temperature."""
-        return float(
-            self.coordinator.data[self._item_id]["Operation"]["VirtualHeater"][
-                "Current-Set-Point"
-            ]
-        )
+        return self._field("target_temperature")
 
     @property
     def max_temp(self):
         """Return the max temperature setting."""
-        return float(
-            self.coordinator.data[self._item_id]["Operation"]["VirtualHeater"][
-                "Max-Settable-Water-Temp"
-            ]
-        )
+        return self._field("max_temp")
 
     @property
     def min_temp(self):
         """Return the min temperature setting."""
-        return float(
-            self.coordinator.data[self._item_id]["Operation"]["VirtualHeater"][
-                "Min-Settable-Water-Temp"
-            ]
-        )
-
-    @property
-    def supported_features(self):
-        """Return the supported features of Omnilogic Heater."""
-        return SUPPORT_FLAGS_HEATER
-
-    @property
-    def operation_list(self):
-        """Return the operation list for the Heater."""
-        return OPERATION_LIST
+        return self._field("min_temp")
 
     @property
     def current_operation(self):
         """Return the current operation mode of the Heater."""
-        if self.coordinator.data[self._item_id[:4]]["VirtualHeater"]["enable"] == "yes":
+        if self._field("enabled"):
             return STATE_ON
         else:
             return STATE_OFF
@@ -134,11 +115,12 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
     @property
     def current_temperature(self):
         """Return the current water temperature."""
-        backyard_id = self._item_id[:2]
-        bow_id = self._item_id[:4]
+        temperature = self._field("water_temperature")
 
-        temperature = float(self.coordinator.data[bow_id]["waterTemp"])
-        if self.coordinator.data[backyard_id]["Unit-of-Measurement"] == "Metric":
+        if temperature is None:
+            hayward_temperature = None
+            hayward_unit_of_measure = None
+        elif self._field("unit_of_measurement") == "Metric":
             hayward_temperature = round((temperature - 32) * 5 / 9, 1)
             hayward_unit_of_measure = UnitOfTemperature.CELSIUS
         else:
@@ -153,7 +135,11 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
     @property
     def state(self):
         """Return the current state of the heater."""
-        if self.coordinator.data[self._item_id]["heaterState"] == "0":
+        heater_state = self._field("heater_state")
+
+        if heater_state is None:
+            return None
+        if heater_state == "0":
             return STATE_OFF
         else:
             return STATE_ON
@@ -161,11 +147,19 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
     async def async_set_temperature(self, **kwargs):
         """Set the water heater temperature set-point."""
 
-        success = await self.coordinator.api.set_heater_temperature(
+        temperature = int(kwargs[ATTR_TEMPERATURE])
+
+        success = await self.coordinator.async_send_command(
+            self._item_id,
+            "set_heater_temperature",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._equipment_id),
-            int(kwargs[ATTR_TEMPERATURE]),
+            temperature,
+            confirm=lambda item: int(
+                item["Operation"]["VirtualHeater"]["Current-Set-Point"]
+            )
+            == temperature,
         )
 
         if success:
@@ -174,11 +168,19 @@ class OmniLogicHeaterControl(OmniLogicEntity, WaterHeaterEntity):
     async def async_set_operation_mode(self, operation_mode):
         """Set the water heater operating mode."""
 
-        success = await self.coordinator.api.set_heater_onoff(
+        enable = operation_mode != "off"
+
+        success = await self.coordinator.async_send_command(
+            self._item_id,
+            "set_heater_onoff",
             int(self._item_id[1]),
             int(self._item_id[3]),
             int(self._equipment_id),
-            operation_mode != "off",
+            enable,
+            # The live state is in the BOW's telemetry; the heater item only holds
+            # the configured value.
+            confirm=lambda bow: (bow["VirtualHeater"]["enable"] == "yes") == enable,
+            confirm_id=self._item_id[:4],
         )
 
         if success:
@@ -193,6 +195,21 @@ WATER_HEATER_TYPES = {
             "kind": "heater",
             "icon": "mdi:water-boiler",
             "guard_condition": [],
+            "fields": {
+                "target_temperature": FieldPath(
+                    "Operation", "VirtualHeater", "Current-Set-Point", converter=float
+                ),
+                "max_temp": FieldPath(
+                    "Operation", "VirtualHeater", "Max-Settable-Water-Temp", converter=float
+                ),
+                "min_temp": FieldPath(
+                    "Operation", "VirtualHeater", "Min-Settable-Water-Temp", converter=float
+                ),
+                "enabled": FieldPath("VirtualHeater", "enable", converter=yes_no, anchor=BOW),
+                "water_temperature": FieldPath("waterTemp", converter=float, anchor=BOW),
+                "unit_of_measurement": FieldPath("Unit-of-Measurement", anchor=BACKYARD),
+                "heater_state": FieldPath("heaterState"),
+            },
         },
     ],
 }
@@ -0,0 +1,167 @@
+"""Websocket API streaming Omnilogic telemetry to dashboards."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.util import dt as dt_util
+
+from .const import ALL_ITEM_KINDS, COORDINATOR, DOMAIN, SIGNAL_TELEMETRY_UPDATED
+from .telemetry import changed_fields
+
+
+def item_key(item_id: tuple) -> str:
+    """Return the key of an item in websocket messages."""
+    return "/".join(str(part) for part in item_id)
+
+
+def item_values(item: dict) -> dict[str, Any]:
+    """Return the fields of an item without the child items nested in it."""
+    return {
+        field: value for field, value in item.items() if field not in ALL_ITEM_KINDS
+    }
+
+
+def describe_item(coordinator, item_id: tuple) -> dict[str, Any]:
+    """Return an item with where it sits in the topology."""
+    node = coordinator.topology.get(item_id)
+    description = {
+        "item_id": list(item_id),
+        "values": item_values(coordinator.data[item_id]),
+    }
+    if node is not None:
+        description.update(
+            {
+                "backyard": item_key(node.backyard_id),
+                "bow": item_key(node.bow_id) if node.bow_id else None,
+                "name": node.name_prefix.strip(),
+                "unique_id": node.unique_id_prefix,
+                "shared_with": [item_key(bow_id) for bow_id in node.shared_bows],
+            }
+        )
+    return description
+
+
+def snapshot(coordinator) -> dict[str, Any]:
+    """Return every item of an entry."""
+    return {
+        "items": {
+            item_key(item_id): describe_item(coordinator, item_id)
+            for item_id in coordinator.data
+        }
+    }
+
+
+def delta(coordinator, previous: dict) -> dict[str, Any]:
+    """Return what changed in an entry's telemetry since the previous data."""
+    data = coordinator.data
+    changed = {}
+    added = {}
+
+    for item_id, item in data.items():
+        old = previous.get(item_id)
+        if old is None:
+            added[item_key(item_id)] = describe_item(coordinator, item_id)
+            continue
+        fields = changed_fields(old, item)
+        if fields:
+            changed[item_key(item_id)] = fields
+
+    removed = [item_key(item_id) for item_id in previous.keys() - data.keys()]
+
+    result = {}
+    if changed:
+        result["changed"] = changed
+    if added:
+        result["added"] = added
+    if removed:
+        result["removed"] = removed
+    return result
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "omnilogic/subscribe",
+        vol.Optional("entry_id"): str,
+        vol.Optional("history_hours"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }
+)
+@websocket_api.async_response
+async def websocket_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Send the telemetry of every entry, then the changes after each update.
+
+    The first event holds a snapshot with each item's topology and values, and the
+    numeric telemetry history of its backyards when asked for and kept. Every later
+    event holds only the changed fields, new items and removed items of the entries
+    that were updated.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_ids = [msg["entry_id"]] if "entry_id" in msg else list(entries)
+    if any(entry_id not in entries for entry_id in entry_ids):
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Entry not loaded")
+        return
+
+    history = {}
+    if msg.get("history_hours"):
+        since = int(dt_util.utcnow().timestamp() - msg["history_hours"] * 3600)
+        for entry_id in entry_ids:
+            coordinator = entries[entry_id][COORDINATOR]
+            if coordinator.history is None:
+                continue
+            for backyard_id in list(coordinator.history.rings):
+                samples = await coordinator.history.async_samples(
+                    backyard_id, since=since
+                )
+                history[item_key(backyard_id)] = samples
+
+    # Nothing is awaited from here on, so no update falls between the snapshot and
+    # the subscription.
+    previous = {}
+    event = {"entries": {}}
+    for entry_id in entry_ids:
+        coordinator = entries[entry_id][COORDINATOR]
+        previous[entry_id] = coordinator.data
+        event["entries"][entry_id] = snapshot(coordinator)
+    if history:
+        event["history"] = history
+
+    @callback
+    def async_telemetry_updated(entry_id: str) -> None:
+        """Send the changes of an updated entry."""
+        if entry_id not in previous:
+            if "entry_id" in msg:
+                return
+            # An entry loaded after subscribing is sent in full.
+            previous[entry_id] = {}
+        entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+        if entry_data is None:
+            return
+
+        coordinator = entry_data[COORDINATOR]
+        changes = delta(coordinator, previous[entry_id])
+        previous[entry_id] = coordinator.data
+        if changes:
+            connection.send_message(
+                websocket_api.event_message(
+                    msg["id"], {"entries": {entry_id: changes}}
+                )
+            )
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass, SIGNAL_TELEMETRY_UPDATED, async_telemetry_updated
+    )
+    connection.send_result(msg["id"])
+    connection.send_message(websocket_api.event_message(msg["id"], event))
@@ -0,0 +1,322 @@
+"""Compare the library and streaming telemetry paths on a large synthetic payload.
+
+The library path decodes the whole response, parses it with ElementTree, builds
+the nested backyard tree and then flattens it. The streaming path feeds the raw
+response to the incremental parser in network-sized chunks and stores flattened
+items directly.
+
+Both paths must produce the same items with the same values, apart from fields
+the library is known to name differently, or the benchmark exits non-zero.
+
+Run from the repository root in an environment with Home Assistant and the
+omnilogic library installed:
+
+    python scripts/benchmark_telemetry.py --bows 20 --equipment 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import aiohttp
+from omnilogic import OmniLogic
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from custom_components.omnilogic.const import ALL_ITEM_KINDS  # noqa: E402
+from custom_components.omnilogic.streaming import (  # noqa: E402
+    CHUNK_SIZE,
+    SYSTEM_FIELDS,
+    SiteConfig,
+    TelemetryStreamParser,
+)
+from custom_components.omnilogic.telemetry import (  # noqa: E402
+    TelemetryFlattener,
+    flatten_telemetry,
+)
+
+MSP_SYSTEM_ID = "10000"
+# Fields the library stores under another name than the streaming parser. The
+# library misspells the maximum speed of pumps in a BOW with several pumps.
+RENAMED_FIELDS = {"Max-Pump_Speed": "Max-Pump-Speed"}
+
+
+def build_payload(bows: int, equipment: int) -> tuple[bytes, dict]:
+    """Return a telemetry response and the matching library MSP config item."""
+    next_id = iter(range(1, 1_000_000))
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" ?>',
+        '<STATUS version="1.11">',
+        f'<Backyard systemId="0" statusVersion="11" airTemp="75" status="1" '
+        f'state="1" configUpdatedTime="2024-01-01 00:00:00" datetime="2024-01-01T00:00:00"/>',
+    ]
+    bow_configs = []
+
+    for bow_index in range(bows):
+        bow_id = str(next(next_id))
+        ids = {kind: str(next(next_id)) for kind in ("filter", "heater", "chlor", "csad")}
+        virtual_heater_id = str(next(next_id))
+        lights = [str(next(next_id)) for _ in range(equipment)]
+        relays = [str(next(next_id)) for _ in range(equipment)]
+        pumps = [str(next(next_id)) for _ in range(equipment)]
+
+        lines += [
+            f'<BodyOfWater systemId="{bow_id}" waterTemp="82" flow="255"/>',
+            f'<Filter systemId="{ids["filter"]}" valvePosition="1" filterSpeed="60" '
+            f'filterState="1" lastSpeed="60" whyFilterIsOn="14" fpOverride="0"/>',
+            f'<VirtualHeater systemId="{virtual_heater_id}" Current-Set-Point="84" '
+            f'enable="yes" SolarSetPoint="84" Mode="0" SilentMode="0" whyHeaterIsOn="0"/>',
+            f'<Heater systemId="{ids["heater"]}" heaterState="0" temp="65" enable="yes" '
+            f'priority="254" maintainFor="24"/>',
+            f'<Chlorinator systemId="{ids["chlor"]}" status="68" instantSaltLevel="3200" '
+            f'avgSaltLevel="3200" chlrAlert="0" chlrError="0" sc="0" '
+            f'operatingState="1" Timed-Percent="50" operatingMode="1" enable="1"/>',
+            f'<CSAD systemId="{ids["csad"]}" status="1" ph="7.4" orp="700" mode="1"/>',
+        ]
+        lines += [
+            f'<ColorLogic-Light systemId="{light}" lightState="6" currentShow="5" '
+            f'speed="4" brightness="4" specialEffect="0"/>'
+            for light in lights
+        ]
+        lines += [f'<Relay systemId="{relay}" relayState="0"/>' for relay in relays]
+        lines += [
+            f'<Pump systemId="{pump}" pumpState="0" pumpSpeed="0" lastSpeed="50" '
+            f'whyOn="0"/>'
+            for pump in pumps
+        ]
+
+        bow_configs.append(
+            {
+                "System-Id": bow_id,
+                "Name": f"Pool {bow_index}",
+                "Type": "BOW_POOL",
+                "Supports-Spillover": "no",
+                "Filter": {
+                    "System-Id": ids["filter"],
+                    "Name": "Filter Pump",
+                    "Shared-Type": "BOW_NO_EQUIPMENT_SHARE",
+                    "Filter-Type": "FMT_VARIABLE_SPEED_PUMP",
+                    "Max-Pump-Speed": "100",
+                    "Min-Pump-Speed": "18",
+                    "Max-Pump-RPM": "3450",
+                    "Min-Pump-RPM": "600",
+                    "Priming-Enabled": "yes",
+                },
+                "Chlorinator": {
+                    "System-Id": ids["chlor"],
+                    "Name": "Chlorinator",
+                    "Shared-Type": "BOW_NO_EQUIPMENT_SHARE",
+                    "Operation": {
+                        "Chlorinator-Equipment": {
+                            "System-Id": str(next(next_id)),
+                            "Name": "Turbo Cell",
+                        }
+                    },
+                },
+                "Pump": [
+                    {
+                        "System-Id": pump,
+                        "Name": f"Pump {pump}",
+                        "Type": "PMP_VARIABLE_SPEED_PUMP",
+                        "Function": "PMP_WATER_FEATURE",
+                        "Min-Pump-Speed": "18",
+                        "Max-Pump-Speed": "100",
+                    }
+                    for pump in pumps
+                ],
+                "Heaters": [
+                    {
+                        "System-Id": virtual_heater_id,
+                        "Shared-Type": "BOW_NO_EQUIPMENT_SHARE",
+                        "Enabled": "yes",
+                        "Current-Set-Point": "84",
+                        "Max-Water-Temp": "104",
+                        "Min-Settable-Water-Temp": "65",
+                        "Max-Settable-Water-Temp": "104",
+                        "Operation": {
+                            "Heater-Equipment": {
+                                "System-Id": ids["heater"],
+                                "Name": "Gas Heater",
+                                "Type": "PET_HEATER",
+                                "Enabled": "yes",
+                            }
+                        },
+                    }
+                ],
+                "Lights": [
+                    {
+                        "System-Id": light,
+                        "Name": f"Light {light}",
+                        "Type": "COLOR_LOGIC_UCL",
+                        "V2-Active": "yes",
+                    }
+                    for light in lights
+                ],
+                "Relays": [
+                    {
+                        "System-Id": relay,
+                        "Name": f"Relay {relay}",
+                        "Type": "RLY_HIGH_VOLTAGE_RELAY",
+                        "Function": "RLY_ACCESSORY",
+                    }
+                    for relay in relays
+                ],
+            }
+        )
+
+    lines.append("</STATUS>")
+
+    config_item = {
+        "MspSystemID": MSP_SYSTEM_ID,
+        "BackyardName": "Benchmark",
+        "System": {
+            "Msp-Vsp-Speed-Format": "Percent",
+            "Msp-Time-Format": "12 Hour Format",
+            "Units": "Standard",
+            "Msp-Chlor-Display": "Salt",
+            "Msp-Language": "English",
+        },
+        "Relays": [],
+        "Backyard": {
+            "Sensor": [{"Name": "AirSensor", "Units": "UNITS_FAHRENHEIT"}],
+            "BOWS": bow_configs,
+        },
+    }
+
+    return "\n".join(lines).encode(), config_item
+
+
+def library_telemetry(api: OmniLogic, payload: bytes, config_item: dict) -> dict:
+    """Return the nested telemetry of one site as get_telemetry_data builds it."""
+    site_telem = api.telemetry_to_json(payload.decode(), config_item, [{"BowID": "False"}])
+    site_telem["BackyardName"] = config_item["BackyardName"]
+    site_telem.update(
+        {field: config_item["System"][field] for field in SYSTEM_FIELDS}
+    )
+    site_telem["Unit-of-Measurement"] = config_item["System"]["Units"]
+    site_telem["Alarms"] = []
+    for sensor in config_item["Backyard"]["Sensor"]:
+        if sensor["Name"] == "AirSensor":
+            site_telem["Unit-of-Temperature"] = sensor["Units"]
+    return site_telem
+
+
+def library_path(api: OmniLogic, payload: bytes, config_item: dict) -> dict:
+    """Parse the payload the way the omnilogic library does and flatten it."""
+    return flatten_telemetry([library_telemetry(api, payload, config_item)])
+
+
+def streaming_path(payload: bytes, config_item: dict) -> dict:
+    """Feed the payload to the streaming parser in network-sized chunks."""
+    flattener = TelemetryFlattener()
+    parser = TelemetryStreamParser(flattener, SiteConfig(config_item), [])
+    for start in range(0, len(payload), CHUNK_SIZE):
+        parser.feed(payload[start : start + CHUNK_SIZE])
+    parser.close()
+    return flattener.items
+
+
+def compare(library: dict, streaming: dict) -> tuple[list[str], list[str]]:
+    """Return the differences between the items of both paths.
+
+    Fields in RENAMED_FIELDS are compared under their streaming name and reported
+    separately as notes. The child items nested in backyards and BOWs are compared
+    as items of their own.
+    """
+    differences = []
+    notes = set()
+
+    for item_id in library.keys() | streaming.keys():
+        if item_id not in streaming:
+            differences.append(f"{item_id}: only in the library path")
+            continue
+        if item_id not in library:
+            differences.append(f"{item_id}: only in the streaming path")
+            continue
+
+        library_fields = {}
+        for field, value in library[item_id].items():
+            if field in ALL_ITEM_KINDS:
+                continue
+            if field in RENAMED_FIELDS:
+                notes.add(f"{field} is stored as {RENAMED_FIELDS[field]}")
+                field = RENAMED_FIELDS[field]
+            library_fields[field] = value
+        streaming_fields = {
+            field: value
+            for field, value in streaming[item_id].items()
+            if field not in ALL_ITEM_KINDS
+        }
+
+        for field in sorted(library_fields.keys() | streaming_fields.keys()):
+            if library_fields.get(field) != streaming_fields.get(field):
+                differences.append(
+                    f"{item_id} {field}: library {library_fields.get(field)!r}, "
+                    f"streaming {streaming_fields.get(field)!r}"
+                )
+
+    return sorted(differences), sorted(notes)
+
+
+def measure(func, *args, repeat: int) -> tuple[float, int, dict]:
+    """Return the median latency, the peak traced memory and the last result."""
+    timings = []
+    for _ in range(repeat):
+        call_args = copy.deepcopy(args)
+        start = time.perf_counter()
+        result = func(*call_args)
+        timings.append(time.perf_counter() - start)
+
+    call_args = copy.deepcopy(args)
+    tracemalloc.start()
+    func(*call_args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak, result
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bows", type=int, default=20)
+    parser.add_argument("--equipment", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    payload, config_item = build_payload(args.bows, args.equipment)
+
+    async with aiohttp.ClientSession() as session:
+        api = OmniLogic("", "", session)
+        library = measure(
+            lambda payload, config_item: library_path(api, payload, config_item),
+            payload,
+            config_item,
+            repeat=args.repeat,
+        )
+
+    streaming = measure(streaming_path, payload, config_item, repeat=args.repeat)
+
+    print(f"Payload: {len(payload) / 1024:.0f} KiB, {len(library[2])} items")
+    for name, (latency, peak, _) in (("library", library), ("streaming", streaming)):
+        print(f"{name:>10}: {latency * 1000:8.1f} ms  peak {peak / 1024:8.0f} KiB")
+
+    differences, notes = compare(library[2], streaming[2])
+    for note in notes:
+        print(f"Note: the library path's {note}")
+    if differences:
+        print(f"{len(differences)} differences between the two paths:")
+        for difference in differences[:20]:
+            print(f"  {difference}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
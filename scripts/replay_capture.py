@@ -0,0 +1,95 @@
+"""Replay a traffic capture through the integration and print the entity states.
+
+Home Assistant is started in a temporary configuration directory and the
+integration is set up through a real config entry whose omnilogic client answers
+from the capture. Every captured telemetry response is then fed through the
+coordinator, and the states of the entry's entities after the last one are
+printed, or written as JSON to compare two runs.
+
+Run from the repository root in an environment with Home Assistant and the
+omnilogic library installed:
+
+    python scripts/replay_capture.py omnilogic_captures/<entry>_<time>.ndjson.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+from unittest.mock import patch
+
+from homeassistant import config_entries
+from homeassistant.helpers import entity_registry as er
+
+# Also puts the repository on the path, where the loader finds custom_components.
+from soak import DOMAIN, async_start_hass, config_entry
+
+from custom_components.omnilogic.capture import ReplayTransport, async_replay
+
+
+async def async_replay_capture(path: str, speed: float = 0) -> dict[str, str]:
+    """Replay a capture and return the state of each entity of the entry."""
+    transport = ReplayTransport.from_file(path)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        with patch(
+            "custom_components.omnilogic.OmniLogic",
+            lambda username, password, session: transport,
+        ):
+            hass = await async_start_hass(config_dir)
+            entry = config_entry()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            if entry.state is not config_entries.ConfigEntryState.LOADED:
+                await hass.async_stop()
+                raise RuntimeError(f"Setup failed: {entry.state}")
+
+            coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+            await async_replay(coordinator, transport, speed)
+            await hass.async_block_till_done()
+
+            states = {}
+            for registry_entry in er.async_entries_for_config_entry(
+                er.async_get(hass), entry.entry_id
+            ):
+                state = hass.states.get(registry_entry.entity_id)
+                if state is not None:
+                    states[registry_entry.entity_id] = state.state
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop()
+
+    return dict(sorted(states.items()))
+
+
+async def main() -> int:
+    """Run the replay and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0,
+        help="replay speed relative to the capture, 0 for back to back",
+    )
+    parser.add_argument("--output", help="write the states to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    states = await async_replay_capture(args.capture, args.speed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(states, file, indent=2)
+    else:
+        for entity_id, state in states.items():
+            print(f"{entity_id}: {state}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,324 @@
+"""Soak the integration with synthetic polls and commands and watch for leaks.
+
+Home Assistant is started in a temporary configuration directory and the
+integration is set up through a real config entry. The omnilogic client is
+replaced by a synthetic one whose telemetry changes on every poll. The run then
+polls the coordinator, sends commands through the entity services, raises and
+clears alarms and reloads the entry, and takes tracemalloc measurements along the
+way. It exits non-zero when traced memory or listener counts keep growing after
+the warm-up.
+
+Run from the repository root in an environment with Home Assistant and the
+omnilogic library installed:
+
+    python scripts/soak.py --polls 100000 --commands 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import gc
+import inspect
+import logging
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import MappingProxyType
+from unittest.mock import patch
+
+import aiohttp
+from omnilogic import OmniLogic
+
+from homeassistant import bootstrap, config_entries, loader
+from homeassistant.const import (
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+# Also puts the repository on the path, where the loader finds custom_components.
+from benchmark_telemetry import MSP_SYSTEM_ID, build_payload, library_telemetry
+
+DOMAIN = "omnilogic"
+VARYING_FIELDS = {
+    "airTemp": (60, 90),
+    "waterTemp": (70, 95),
+    "filterSpeed": (0, 100),
+    "pumpSpeed": (0, 100),
+    "instantSaltLevel": (2800, 3600),
+    "avgSaltLevel": (2800, 3600),
+    "ph": (70, 80),
+    "orp": (600, 800),
+}
+COMMANDS = {
+    "switch": [("turn_on", {}), ("turn_off", {})],
+    "light": [("turn_on", {}), ("turn_off", {})],
+    "water_heater": [("set_temperature", {"temperature": 84})],
+}
+
+
+class SyntheticOmniLogic:
+    """A stand-in omnilogic client serving changing synthetic telemetry."""
+
+    template: list = []
+
+    def __init__(self, username, password, session=None) -> None:
+        """Initialize the client."""
+        self.username = username
+        self.password = password
+        self.token = "soak"
+        self.systems = [{"MspSystemID": MSP_SYSTEM_ID, "BackyardName": "Soak"}]
+        self.polls = 0
+        self.commands = 0
+        self._rng = random.Random(0)
+
+    async def connect(self) -> bool:
+        """Pretend to log in."""
+        return True
+
+    async def get_telemetry_data(self) -> list:
+        """Return a fresh copy of the telemetry with changed readings."""
+        self.polls += 1
+        data = copy.deepcopy(self.template)
+        self._vary(data)
+
+        # Raise an alarm on the first relay for a stretch of polls, then clear it.
+        if self.polls // 50 % 2:
+            backyard = data[0]
+            bow = backyard["BOWS"][0]
+            relay = bow["Relays"][0]
+            alarm = {
+                "BowID": bow["systemId"],
+                "EquipmentID": relay["systemId"],
+                "Code": "1",
+                "Message": "Soak alarm",
+                "Severity": "1",
+            }
+            relay["Alarms"] = [alarm]
+            backyard["Alarms"] = [alarm]
+
+        return data
+
+    async def get_msp_config_file(self) -> list:
+        """Return no MSP configuration."""
+        return []
+
+    def _vary(self, node) -> None:
+        """Change every varying reading in the telemetry."""
+        if isinstance(node, list):
+            for item in node:
+                self._vary(item)
+        elif isinstance(node, dict):
+            for key, value in node.items():
+                if key in VARYING_FIELDS:
+                    node[key] = str(self._rng.randint(*VARYING_FIELDS[key]))
+                elif isinstance(value, (dict, list)):
+                    self._vary(value)
+
+    def __getattr__(self, name: str):
+        """Accept every command."""
+        if not name.startswith("set_"):
+            raise AttributeError(name)
+
+        async def command(*args):
+            self.commands += 1
+            return (True, None) if name == "set_chlor_params" else True
+
+        command.__name__ = name
+        return command
+
+
+async def build_template(bows: int, equipment: int) -> list:
+    """Build nested library telemetry from the benchmark's synthetic payload."""
+    payload, config_item = build_payload(bows, equipment)
+    async with aiohttp.ClientSession() as session:
+        return [library_telemetry(OmniLogic("", "", session), payload, config_item)]
+
+
+def config_entry() -> config_entries.ConfigEntry:
+    """Return the config entry of the soaked account."""
+    kwargs = {
+        "version": 1,
+        "minor_version": 1,
+        "domain": DOMAIN,
+        "title": "Omnilogic",
+        "data": {CONF_USERNAME: "soak@example.com", CONF_PASSWORD: "soak"},
+        "source": config_entries.SOURCE_USER,
+        "options": {},
+        "unique_id": "soak@example.com",
+    }
+    parameters = inspect.signature(config_entries.ConfigEntry).parameters
+    if "discovery_keys" in parameters:
+        kwargs["discovery_keys"] = MappingProxyType({})
+    if "subentries_data" in parameters:
+        kwargs["subentries_data"] = None
+    return config_entries.ConfigEntry(**kwargs)
+
+
+async def async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a bare Home Assistant storing its registries in config_dir."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    await hass.async_start()
+    return hass
+
+
+def counters(hass: HomeAssistant, entry_id: str) -> dict[str, int]:
+    """Return the listener and bookkeeping counts that must stay flat."""
+    coordinator = hass.data[DOMAIN][entry_id]["coordinator"]
+    return {
+        "coordinator listeners": len(coordinator._listeners),
+        # Stores listen for the final write only while a delayed save is pending.
+        "bus listeners": sum(
+            count
+            for event_type, count in hass.bus.async_listeners().items()
+            if event_type != EVENT_HOMEASSISTANT_FINAL_WRITE
+        ),
+        "field accessors": len(coordinator.fields._accessors),
+        "states": len(hass.states.async_all()),
+        "tasks": len(asyncio.all_tasks()),
+    }
+
+
+async def async_send_commands(
+    hass: HomeAssistant, entry_id: str, count: int, rng: random.Random
+) -> None:
+    """Send commands to random entities through their services."""
+    entities = [
+        entry.entity_id
+        for entry in er.async_entries_for_config_entry(er.async_get(hass), entry_id)
+        if entry.domain in COMMANDS
+    ]
+    for _ in range(count):
+        entity_id = rng.choice(entities)
+        service, data = rng.choice(COMMANDS[entity_id.split(".")[0]])
+        await hass.services.async_call(
+            entity_id.split(".")[0],
+            service,
+            {"entity_id": entity_id, **data},
+            blocking=True,
+        )
+
+
+async def main() -> int:
+    """Run the soak and return the exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=100_000)
+    parser.add_argument("--commands", type=int, default=5_000)
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1_000)
+    parser.add_argument("--bows", type=int, default=2)
+    parser.add_argument("--equipment", type=int, default=3)
+    parser.add_argument(
+        "--max-growth", type=int, default=1024, help="allowed growth in KiB"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    SyntheticOmniLogic.template = await build_template(args.bows, args.equipment)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        with patch("custom_components.omnilogic.OmniLogic", SyntheticOmniLogic):
+            # Entities replaced by a reload are freed only if their allocation was
+            # traced, so tracing starts before the entry is set up.
+            tracemalloc.start(10)
+            hass = await async_start_hass(config_dir)
+            entry = config_entry()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            if entry.state is not config_entries.ConfigEntryState.LOADED:
+                print(f"Setup failed: {entry.state}")
+                return 1
+            # Keep the per-poll debug logging of the coordinator out of the report.
+            logging.getLogger("custom_components.omnilogic").setLevel(logging.WARNING)
+
+            code = await async_soak(hass, entry, args)
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop()
+
+    return code
+
+
+async def async_soak(
+    hass: HomeAssistant, entry: config_entries.ConfigEntry, args
+) -> int:
+    """Drive polls, commands and reloads, and compare the checkpoints."""
+    rng = random.Random(0)
+    polls_per_checkpoint = max(args.polls // args.checkpoints, 1)
+    commands_per_checkpoint = args.commands // args.checkpoints
+    reload_checkpoints = set(
+        rng.sample(range(1, args.checkpoints), min(args.reloads, args.checkpoints - 1))
+    )
+
+    async def async_poll(count: int) -> None:
+        for _ in range(count):
+            await hass.data[DOMAIN][entry.entry_id]["coordinator"].async_refresh()
+        await hass.async_block_till_done()
+
+    await async_poll(args.warmup)
+    await async_send_commands(hass, entry.entry_id, commands_per_checkpoint, rng)
+    await hass.async_block_till_done()
+
+    gc.collect()
+    baseline_snapshot = tracemalloc.take_snapshot()
+    baseline_memory = tracemalloc.get_traced_memory()[0]
+    baseline = counters(hass, entry.entry_id)
+    print(f"{'checkpoint':>10} {'polls':>8} {'KiB':>8}  counters")
+    print(f"{0:>10} {0:>8} {baseline_memory / 1024:8.0f}  {baseline}")
+
+    started = time.monotonic()
+    for checkpoint in range(1, args.checkpoints + 1):
+        if checkpoint in reload_checkpoints:
+            await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+        await async_poll(polls_per_checkpoint)
+        await async_send_commands(hass, entry.entry_id, commands_per_checkpoint, rng)
+        await hass.async_block_till_done()
+
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        print(
+            f"{checkpoint:>10} {checkpoint * polls_per_checkpoint:>8} "
+            f"{memory / 1024:8.0f}  {counters(hass, entry.entry_id)}"
+        )
+
+    final = counters(hass, entry.entry_id)
+    final_memory = tracemalloc.get_traced_memory()[0]
+    final_snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    print(f"Soaked for {time.monotonic() - started:.0f} s")
+
+    failures = [
+        f"{name} grew from {baseline[name]} to {final[name]}"
+        for name in baseline
+        if final[name] > baseline[name]
+    ]
+    growth = (final_memory - baseline_memory) / 1024
+    if growth > args.max_growth:
+        failures.append(f"traced memory grew by {growth:.0f} KiB")
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        for stat in final_snapshot.compare_to(baseline_snapshot, "traceback")[:10]:
+            print(stat)
+            for line in stat.traceback.format()[-6:]:
+                print(f"    {line}")
+        return 1
+
+    print(f"OK: traced memory changed by {growth:.0f} KiB, counters stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
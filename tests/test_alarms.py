@@ -0,0 +1,49 @@
+"""Tests for the alarm index."""
+
+from custom_components.omnilogic.alarms import AlarmIndex
+
+BACKYARD = ("Backyard", "1")
+PUMP = ("Backyard", "1", "BOWS", "2", "Pumps", "5")
+HEATER = ("Backyard", "1", "BOWS", "2", "Heaters", "6")
+
+PUMP_ALARM = {"Code": "7", "EquipmentID": "5", "Message": "Pump fault"}
+HEATER_ALARM = {"Code": "9", "EquipmentID": "6", "Message": "Heater fault"}
+SITE_ALARM = {"Code": "3", "EquipmentID": "0", "Message": "Low battery"}
+
+
+def telemetry(site_alarms=(), pump_alarms=(), heater_alarms=()):
+    """Return flattened telemetry with the given alarms."""
+    return {
+        BACKYARD: {"BackyardName": "Home", "Alarms": list(site_alarms)},
+        PUMP: {"Name": "Pump", "Alarms": list(pump_alarms)},
+        HEATER: {"Name": "Heater", "Alarms": list(heater_alarms)},
+    }
+
+
+def test_diff_reports_raised_and_cleared():
+    """Alarms only in the new index are raised, those only in the old are cleared."""
+    previous = AlarmIndex.from_telemetry(telemetry(pump_alarms=[PUMP_ALARM]))
+    current = AlarmIndex.from_telemetry(telemetry(heater_alarms=[HEATER_ALARM]))
+
+    assert current.diff(previous) == ([(HEATER, "9")], [(PUMP, "7")])
+
+
+def test_diff_ignores_unchanged_alarms():
+    """An alarm present in both polls is neither raised nor cleared."""
+    data = telemetry(pump_alarms=[PUMP_ALARM])
+
+    assert AlarmIndex.from_telemetry(data).diff(
+        AlarmIndex.from_telemetry(data)
+    ) == ([], [])
+
+
+def test_site_alarm_of_equipment_is_not_duplicated():
+    """The site list repeats equipment alarms; only unmatched ones go to the backyard."""
+    alarms = AlarmIndex.from_telemetry(
+        telemetry(site_alarms=[PUMP_ALARM, SITE_ALARM], pump_alarms=[PUMP_ALARM])
+    )
+
+    assert set(alarms.alarms) == {(PUMP, "7"), (BACKYARD, "3")}
+    assert alarms.for_item(PUMP) == [PUMP_ALARM]
+    assert alarms.for_scope(PUMP[:4]) == [(PUMP, PUMP_ALARM)]
+    assert alarms.describe(BACKYARD, SITE_ALARM) == "Home: Low battery"
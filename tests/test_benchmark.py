@@ -0,0 +1,36 @@
+"""Tests that the library and streaming telemetry paths agree."""
+
+import aiohttp
+from benchmark_telemetry import build_payload, compare, library_path, streaming_path
+from omnilogic import OmniLogic
+
+
+async def flattened(bows: int, equipment: int) -> tuple[dict, dict]:
+    """Return the items of both paths for a synthetic payload."""
+    payload, config_item = build_payload(bows, equipment)
+    async with aiohttp.ClientSession() as session:
+        library = library_path(OmniLogic("", "", session), payload, config_item)
+    return library, streaming_path(payload, config_item)
+
+
+async def test_paths_produce_the_same_values():
+    """Both paths store the same items and values, up to known renames."""
+    library, streaming = await flattened(2, 3)
+
+    differences, notes = compare(library, streaming)
+
+    assert differences == []
+    assert notes == ["Max-Pump_Speed is stored as Max-Pump-Speed"]
+
+
+async def test_value_differences_are_reported():
+    """A value that differs between the paths is reported."""
+    library, streaming = await flattened(1, 1)
+    item_id = next(item_id for item_id in streaming if item_id[-2] == "Filter")
+    streaming[item_id]["filterSpeed"] = "0"
+
+    differences, _ = compare(library, streaming)
+
+    assert differences == [
+        f"{item_id} filterSpeed: library '60', streaming '0'"
+    ]
@@ -0,0 +1,65 @@
+"""Tests for traffic captures and their replay."""
+
+import copy
+from types import SimpleNamespace
+
+from replay_capture import async_replay_capture
+from soak import build_template
+
+from custom_components.omnilogic import capture
+from custom_components.omnilogic.capture import TrafficRecorder, read_capture
+
+
+def recorder(path) -> TrafficRecorder:
+    """Return a recorder writing synchronously to path."""
+    hass = SimpleNamespace(async_add_executor_job=lambda func, *args: func(*args))
+    return TrafficRecorder(hass, str(path))
+
+
+def test_capture_is_rotated(tmp_path, monkeypatch):
+    """A full capture is moved aside and the newest records are still read."""
+    monkeypatch.setattr(capture, "MAX_CAPTURE_FILE_SIZE", 100)
+    path = tmp_path / "capture.ndjson.gz"
+    traffic = recorder(path)
+    for poll in range(10):
+        traffic.record_telemetry([{"systemId": "1", "poll": poll, "pad": "x" * 50}])
+
+    polls = [record["data"][0]["poll"] for record in read_capture(str(path))]
+    assert (tmp_path / "capture.ndjson.gz.1").exists()
+    assert 2 <= len(polls) < 10
+    assert polls == list(range(10 - len(polls), 10))
+
+
+def test_capture_is_pseudonymized(tmp_path):
+    """System IDs are replaced consistently and credentials are removed."""
+    path = tmp_path / "capture.ndjson.gz"
+    traffic = recorder(path)
+    traffic.record_telemetry([{"systemId": "1234", "username": "pool@example.com"}])
+    traffic.record_command(
+        ("Backyard", "1234", "Relays", "99"), "set_relay_valve", (1234, 0, 99, 1), True
+    )
+
+    telemetry, command = read_capture(str(path))
+    assert telemetry["data"] == [{"systemId": "1", "username": "**REDACTED**"}]
+    assert command["item_id"] == ["Backyard", "1", "Relays", "2"]
+    assert command["args"] == ["1", "3", "2", 1]
+
+
+async def test_replay_sets_entity_states(tmp_path):
+    """Replaying a capture through the integration ends in its last telemetry."""
+    template = await build_template(1, 1)
+    path = tmp_path / "capture.ndjson.gz"
+    traffic = recorder(path)
+    for water_temp, filter_state in (("80", "1"), ("81", "1"), ("83", "0")):
+        telemetry = copy.deepcopy(template)
+        bow = telemetry[0]["BOWS"][0]
+        bow["waterTemp"] = water_temp
+        bow["Filter"]["filterState"] = filter_state
+        traffic.record_telemetry(telemetry)
+
+    states = await async_replay_capture(str(path))
+
+    # 83 °F in the metric unit system Home Assistant starts with.
+    assert states["sensor.benchmark_pool_0_water_temperature"] == "28"
+    assert states["switch.benchmark_pool_0_filter_pump"] == "off"
+    assert states["switch.benchmark_pool_0_chlorinator"] == "on"
@@ -0,0 +1,147 @@
+"""Tests for the config and options flows."""
+
+from unittest.mock import patch
+
+from omnilogic import LoginException
+import pytest
+
+from homeassistant.config_entries import SOURCE_USER, ConfigEntryState, OptionsFlow
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components import omnilogic
+from custom_components.omnilogic import config_flow
+from custom_components.omnilogic.config_flow import (
+    CONF_INCLUDED_BOWS,
+    CONF_INCLUDED_KINDS,
+    OptionsFlowHandler,
+)
+from custom_components.omnilogic.const import (
+    CONF_EXCLUDED_BOWS,
+    CONF_EXCLUDED_KINDS,
+    DOMAIN,
+    SELECTABLE_ITEM_KINDS,
+)
+from soak import SyntheticOmniLogic, async_start_hass, build_template, config_entry
+
+
+class RejectedLogin(SyntheticOmniLogic):
+    """A client whose credentials are refused."""
+
+    async def connect(self) -> bool:
+        raise LoginException("Failed to authenticate")
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a running Home Assistant."""
+    hass = await async_start_hass(str(tmp_path))
+    yield hass
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_stop()
+
+
+@pytest.fixture(autouse=True)
+def options_flow_config_entry():
+    """Provide the config_entry of options flows on Home Assistant before 2024.11."""
+    if hasattr(OptionsFlow, "config_entry"):
+        yield
+        return
+
+    def config_entry(flow):
+        return flow.hass.config_entries.async_get_entry(flow.handler)
+
+    with patch.object(
+        OptionsFlowHandler, "config_entry", property(config_entry), create=True
+    ):
+        yield
+
+
+async def async_add_entry(hass):
+    """Add the soak entry on two synthetic BOWs and return it."""
+    SyntheticOmniLogic.template = await build_template(2, 2)
+    entry = config_entry()
+    with patch.object(omnilogic, "OmniLogic", SyntheticOmniLogic):
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+    return entry
+
+
+def bow_ids(hass, entry):
+    """Return the system ids of the BOWs in the entry's telemetry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    return {
+        item_id[3]
+        for item_id in coordinator.data
+        if len(item_id) > 3 and item_id[2] == "BOWS"
+    }
+
+
+async def async_submit_options(hass, entry, **changes):
+    """Open the options flow, submit its defaults with changes and return the form."""
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    user_input = result["data_schema"]({})
+    user_input.update(changes)
+    with patch.object(omnilogic, "OmniLogic", SyntheticOmniLogic):
+        await hass.config_entries.options.async_configure(result["flow_id"], user_input)
+        await hass.async_block_till_done()
+    return result
+
+
+async def test_user_step_reports_rejected_login(hass):
+    """Refused credentials keep the form open with an error."""
+    with patch.object(config_flow, "OmniLogic", RejectedLogin):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": SOURCE_USER},
+            data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "wrong"},
+        )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+
+
+async def test_excluding_a_bow_removes_its_entities(hass):
+    """A BOW left out in the options is stored as excluded and not set up."""
+    entry = await async_add_entry(hass)
+    available = hass.data[DOMAIN][entry.entry_id]["coordinator"].available_bows
+    kept, left_out = sorted(available)
+    assert bow_ids(hass, entry) == {kept, left_out}
+
+    await async_submit_options(hass, entry, **{CONF_INCLUDED_BOWS: [kept]})
+
+    assert entry.options[CONF_EXCLUDED_BOWS] == [left_out]
+    assert entry.state is ConfigEntryState.LOADED
+    assert bow_ids(hass, entry) == {kept}
+
+
+async def test_excluding_a_kind_is_stored(hass):
+    """Kinds left out in the options are stored as excluded."""
+    entry = await async_add_entry(hass)
+    included = [kind for kind in SELECTABLE_ITEM_KINDS if kind != "Pumps"]
+
+    await async_submit_options(hass, entry, **{CONF_INCLUDED_KINDS: included})
+
+    assert entry.options[CONF_EXCLUDED_KINDS] == ["Pumps"]
+    assert entry.state is ConfigEntryState.LOADED
+
+
+async def test_options_keep_bow_exclusions_while_not_loaded(hass):
+    """Without a loaded entry the BOWs are unknown, so exclusions are kept."""
+    entry = config_entry()
+    with patch.object(omnilogic, "OmniLogic", RejectedLogin):
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.SETUP_ERROR
+    hass.config_entries.async_update_entry(
+        entry, options={CONF_EXCLUDED_BOWS: ["2"], CONF_EXCLUDED_KINDS: ["Pumps"]}
+    )
+
+    with patch.object(omnilogic, "OmniLogic", RejectedLogin):
+        result = await async_submit_options(hass, entry)
+
+    assert CONF_INCLUDED_BOWS not in result["data_schema"].schema
+    assert entry.options[CONF_EXCLUDED_BOWS] == ["2"]
+    assert entry.options[CONF_EXCLUDED_KINDS] == ["Pumps"]
@@ -0,0 +1,132 @@
+"""Tests for the telemetry history ring."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.omnilogic.history import (
+    HistoryRing,
+    TelemetryHistory,
+    numeric_fields,
+)
+
+
+def test_ring_wraps_around(tmp_path):
+    """Once full, the oldest samples are overwritten."""
+    ring = HistoryRing(str(tmp_path / "1.ring"), capacity=4)
+    ring.open()
+    for timestamp in range(6):
+        ring.append(timestamp, "temp" if timestamp % 2 else "speed", float(timestamp))
+    ring.write_header()
+
+    assert ring.samples() == [
+        (2, "speed", 2.0),
+        (3, "temp", 3.0),
+        (4, "speed", 4.0),
+        (5, "temp", 5.0),
+    ]
+    assert ring.samples({"temp"}) == [(3, "temp", 3.0), (5, "temp", 5.0)]
+    assert ring.samples(since=4) == [(4, "speed", 4.0), (5, "temp", 5.0)]
+    ring.close()
+
+
+def test_ring_is_reopened(tmp_path):
+    """Samples and the field index survive closing the ring."""
+    path = str(tmp_path / "1.ring")
+    ring = HistoryRing(path, capacity=3)
+    ring.open()
+    for timestamp in range(5):
+        ring.append(timestamp, "temp", float(timestamp))
+    ring.write_header()
+    ring.close()
+
+    reopened = HistoryRing(path, capacity=3)
+    reopened.open()
+    assert reopened.samples() == [(2, "temp", 2.0), (3, "temp", 3.0), (4, "temp", 4.0)]
+    reopened.close()
+
+
+def test_ring_of_another_capacity_starts_over(tmp_path):
+    """A ring file of a different size is not read."""
+    path = str(tmp_path / "1.ring")
+    ring = HistoryRing(path, capacity=3)
+    ring.open()
+    ring.append(1, "temp", 1.0)
+    ring.write_header()
+    ring.close()
+
+    resized = HistoryRing(path, capacity=5)
+    resized.open()
+    assert resized.samples() == []
+    resized.close()
+
+
+def test_numeric_fields_skip_configuration():
+    """Only numeric telemetry attributes are recorded."""
+    item = {
+        "systemId": "4",
+        "pumpSpeed": "50",
+        "Max-Pump-Speed": "100",
+        "pumpState": "on",
+    }
+
+    assert list(numeric_fields(item)) == [("pumpSpeed", 50.0)]
+
+
+@pytest.fixture
+def hass(tmp_path):
+    """Return the parts of Home Assistant the history uses."""
+    return SimpleNamespace(
+        config=SimpleNamespace(path=lambda *parts: str(tmp_path.joinpath(*parts))),
+        async_add_executor_job=lambda func, *args: asyncio.get_running_loop()
+        .run_in_executor(None, func, *args),
+    )
+
+
+async def test_polls_are_recorded_per_backyard(hass):
+    """Each poll's numeric fields go to the ring of their backyard."""
+    history = TelemetryHistory(hass, capacity=100)
+    await history.async_record(
+        {
+            ("Backyard", "1"): {"airTemp": "70"},
+            ("Backyard", "1", "BOWS", "2"): {"waterTemp": "80"},
+            ("Backyard", "3"): {"airTemp": "60"},
+        }
+    )
+
+    samples = await history.async_samples(("Backyard", "1"))
+    assert [(key, value) for _, key, value in samples] == [
+        ("Backyard/1:airTemp", 70.0),
+        ("Backyard/1/BOWS/2:waterTemp", 80.0),
+    ]
+    assert len(await history.async_samples(("Backyard", "3"))) == 1
+    await history.async_close()
+
+
+async def test_reads_run_alongside_writes(hass):
+    """Reading while polls are written never sees a torn ring."""
+    history = TelemetryHistory(hass, capacity=50)
+    backyard = ("Backyard", "1")
+    data = {backyard: {f"field{index}": str(index) for index in range(20)}}
+    await history.async_record(data)
+
+    results = await asyncio.gather(
+        *(history.async_record(data) for _ in range(20)),
+        *(history.async_samples(backyard) for _ in range(20)),
+    )
+
+    for samples in results[20:]:
+        assert len(samples) in (40, 50)
+    await history.async_close()
+
+
+async def test_reading_a_closed_ring_returns_nothing(hass):
+    """A read that starts after the ring was closed returns no samples."""
+    history = TelemetryHistory(hass, capacity=10)
+    await history.async_record({("Backyard", "1"): {"airTemp": "70"}})
+    ring = history.rings[("Backyard", "1")]
+    await history.async_close()
+
+    assert ring.samples() == []
+    ring.record(1, [("Backyard/1:airTemp", 71.0)])
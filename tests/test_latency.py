@@ -0,0 +1,59 @@
+"""Tests for the command latency histograms."""
+
+import pytest
+
+from custom_components.omnilogic.latency import BUCKETS, LatencyHistogram
+
+
+def histogram(*samples):
+    """Return a histogram of the samples."""
+    result = LatencyHistogram()
+    for sample in samples:
+        result.add(sample)
+    return result
+
+
+def test_empty_histogram_has_no_quantiles():
+    """Quantiles of an empty histogram are unknown."""
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_quantile_interpolates_within_buckets():
+    """Quantiles are interpolated inside the bucket that holds their rank."""
+    latency = histogram(3, 4, 4, 6, 8, 12, 25, 40, 200)
+
+    assert latency.quantile(0.5) == 8.8
+    assert latency.quantile(0.9) == 182.0
+    assert latency.quantile(1.0) == 200
+
+
+def test_quantile_is_clamped_to_observed_range():
+    """Interpolation never goes below the minimum or above the maximum."""
+    latency = histogram(4.5, 4.6)
+
+    assert latency.quantile(0.0) == 4.5
+    assert latency.quantile(1.0) == 4.6
+
+
+def test_merge_and_round_trip():
+    """Merged histograms add up and survive being stored."""
+    merged = histogram(0.0, 3)
+    merged.merge(histogram(500))
+    merged.timeouts = 2
+
+    restored = LatencyHistogram.from_dict(merged.to_dict())
+
+    assert restored.count == 3
+    assert restored.minimum == 0.0
+    assert restored.maximum == 500
+    assert restored.counts[-1] == 1
+    assert restored.summary()["timeouts"] == 2
+    assert restored.summary()["mean"] == pytest.approx(167.7)
+
+
+def test_stored_histogram_with_other_buckets_starts_over():
+    """A histogram stored with a different bucket layout is discarded."""
+    stored = histogram(3).to_dict()
+    stored["counts"] = [1] * (len(BUCKETS) + 2)
+
+    assert LatencyHistogram.from_dict(stored).count == 0
@@ -0,0 +1,52 @@
+"""Tests for the poll flight recorder."""
+
+import time
+
+from custom_components.omnilogic.logs import FlightRecorder
+
+RELAY = ("Backyard", "1", "BOWS", "2", "Relays", "3")
+PUMP = ("Backyard", "1", "BOWS", "2", "Pumps", "4")
+
+
+def record(recorder, data, previous=None) -> dict:
+    """Record a poll and return its record."""
+    recorder.async_record_poll(time.monotonic(), "ok", data, previous)
+    return recorder.polls[-1]
+
+
+def test_unchanged_telemetry_keeps_its_hash():
+    """A poll without changes has the same hash as the one before it."""
+    recorder = FlightRecorder()
+    first = {RELAY: {"relayState": "0"}}
+    second = {RELAY: {"relayState": "0"}}
+
+    assert record(recorder, first)["payload_hash"] == (
+        record(recorder, second, first)["payload_hash"]
+    )
+
+
+def test_changes_give_a_new_hash():
+    """Changed fields and added items each change the hash."""
+    recorder = FlightRecorder()
+    first = {RELAY: {"relayState": "0"}}
+    second = {RELAY: {"relayState": "1"}}
+    third = {RELAY: {"relayState": "1"}, PUMP: {"pumpSpeed": "50"}}
+
+    hashes = [
+        record(recorder, first)["payload_hash"],
+        record(recorder, second, first)["payload_hash"],
+        record(recorder, third, second)["payload_hash"],
+    ]
+
+    assert len(set(hashes)) == 3
+    assert recorder.polls[-1]["added"] == 1
+
+
+def test_stale_poll_keeps_the_hash():
+    """Telemetry kept through a failed poll is recorded with its earlier hash."""
+    recorder = FlightRecorder()
+    data = {RELAY: {"relayState": "0"}}
+
+    assert record(recorder, data)["payload_hash"] == (
+        record(recorder, data)["payload_hash"]
+    )
@@ -0,0 +1,255 @@
+"""Tests for the refresh planner."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.omnilogic import refresh
+from custom_components.omnilogic.refresh import (
+    CONFIRM_MARGIN,
+    CONFIRM_TIMEOUT,
+    DEFAULT_CONFIRM_DELAY,
+    FIRST_TRY_FACTOR,
+    MAX_COALESCE_WINDOW,
+    MAX_CONFIRM_DELAY,
+    MIN_CONFIRM_DELAY,
+    RefreshPlanner,
+)
+
+RELAY = ("Backyard", "1", "BOWS", "2", "Relays", "3")
+HEATER = ("Backyard", "1", "BOWS", "2", "Heaters", "4")
+
+
+class Clock:
+    """A monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the planner's clock."""
+    clock = Clock()
+    monkeypatch.setattr(refresh.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    """Record the refresh timers the planner sets instead of running them."""
+    timers = []
+
+    def call_later(hass, delay, action):
+        timer = SimpleNamespace(delay=delay, action=action, cancelled=False)
+        timers.append(timer)
+
+        def cancel():
+            timer.cancelled = True
+
+        return cancel
+
+    monkeypatch.setattr(refresh, "async_call_later", call_later)
+    return timers
+
+
+@pytest.fixture
+def coordinator():
+    """Return a stand-in coordinator."""
+    return SimpleNamespace(command_latency=MagicMock(), async_refresh=AsyncMock())
+
+
+@pytest.fixture
+def planner(clock, timers, coordinator):
+    """Return a planner on the stand-ins."""
+    return RefreshPlanner(None, coordinator)
+
+
+def active(timers):
+    """Return the timers that were not cancelled."""
+    return [timer for timer in timers if not timer.cancelled]
+
+
+def test_default_delay_without_samples(planner, timers):
+    """A kind without measurements is refreshed after the default delay."""
+    planner.async_request_refresh(RELAY, lambda item: True)
+
+    assert [timer.delay for timer in active(timers)] == [
+        DEFAULT_CONFIRM_DELAY + CONFIRM_MARGIN
+    ]
+    assert planner.pending_count == 1
+
+
+def test_confirmation_delay_is_bounded(planner):
+    """Learned delays stay within the configured bounds."""
+    planner._latency["Relays"] = 0.0
+    planner._latency["Heaters"] = 1000.0
+
+    assert planner.confirmation_delay("Relays") == MIN_CONFIRM_DELAY
+    assert planner.confirmation_delay("Heaters") == MAX_CONFIRM_DELAY
+
+
+def test_burst_keeps_one_timer_for_the_slowest_kind(planner, timers, clock):
+    """Commands in a burst share a timer that covers the slowest of them."""
+    planner._latency["Heaters"] = 20.0
+    planner.async_request_refresh(HEATER, lambda item: True)
+    clock.now += 1
+    planner.async_request_refresh(RELAY, lambda item: True)
+
+    assert len(active(timers)) == 1
+    assert active(timers)[0].delay == 20.0 + CONFIRM_MARGIN
+
+
+def test_burst_never_waits_past_the_window(planner, timers, clock):
+    """A long burst is refreshed at most MAX_COALESCE_WINDOW after it started."""
+    planner._latency["Heaters"] = 20.0
+    for _ in range(3):
+        planner.async_request_refresh(HEATER, lambda item: True)
+        clock.now += 10
+
+    assert len(active(timers)) == 1
+    assert planner._refresh_at == 1000.0 + MAX_COALESCE_WINDOW
+
+
+def test_confirmed_command_is_measured(planner, clock, coordinator):
+    """A confirmation on the first refresh is scaled down and recorded."""
+    planner.async_request_refresh(RELAY, lambda item: item["relayState"] == "1")
+    clock.now += 10
+    planner.async_process_update({RELAY: {"relayState": "1"}})
+
+    assert planner.pending_count == 0
+    assert planner.learned_latency["Relays"] == 10 * FIRST_TRY_FACTOR
+    coordinator.command_latency.async_record.assert_called_once_with("Relays", 10)
+
+
+def test_confirmation_read_from_another_item(planner, clock, coordinator):
+    """A change that shows up on another item is confirmed from that item."""
+    bow = HEATER[:4]
+    planner.async_request_refresh(
+        HEATER, lambda item: item["VirtualHeater"]["enable"] == "yes", bow
+    )
+    clock.now += 6
+    planner.async_process_update(
+        {
+            HEATER: {"Operation": {"VirtualHeater": {"enable": "no"}}},
+            bow: {"VirtualHeater": {"enable": "yes"}},
+        }
+    )
+
+    assert planner.pending_count == 0
+    coordinator.command_latency.async_record.assert_called_once_with("Heaters", 6)
+
+
+def test_unconfirmed_command_is_retried(planner, timers, clock):
+    """A command still unconfirmed after a refresh gets another one."""
+    planner.async_request_refresh(RELAY, lambda item: item["relayState"] == "1")
+    planner._cancel()
+    clock.now += 6
+    planner.async_process_update({RELAY: {"relayState": "0"}})
+
+    assert planner.pending_count == 1
+    assert len(active(timers)) == 1
+
+
+def test_missing_fields_do_not_confirm(planner, clock):
+    """A check that raises on incomplete telemetry counts as unconfirmed."""
+    planner.async_request_refresh(RELAY, lambda item: item["relayState"] == "1")
+    clock.now += 6
+    planner.async_process_update({RELAY: {}})
+
+    assert planner.pending_count == 1
+
+
+def test_command_times_out(planner, clock, coordinator):
+    """A command never confirmed is dropped and counted as a timeout."""
+    planner.async_request_refresh(RELAY, lambda item: item["relayState"] == "1")
+    clock.now += CONFIRM_TIMEOUT + 1
+    planner.async_process_update({RELAY: {"relayState": "0"}})
+
+    assert planner.pending_count == 0
+    coordinator.command_latency.async_record_timeout.assert_called_once_with("Relays")
+
+
+async def test_timer_refreshes_the_coordinator(planner, timers, coordinator):
+    """The planned refresh runs a coordinator refresh."""
+    planner.async_request_refresh(RELAY)
+    await active(timers)[0].action(None)
+
+    coordinator.async_refresh.assert_awaited_once()
+
+
+def test_shutdown_cancels_the_timer(planner, timers):
+    """Shutting down cancels the planned refresh and forgets pending commands."""
+    planner.async_request_refresh(RELAY, lambda item: True)
+    planner.async_shutdown()
+
+    assert not active(timers)
+    assert planner.pending_count == 0
+
+
+def test_pending_kinds(planner, clock):
+    """The kinds of unconfirmed commands are reported until they are confirmed."""
+    planner.async_request_refresh(HEATER, lambda item: item["temp"] == "90")
+    planner.async_request_refresh(RELAY)
+
+    assert planner.pending_kinds == {"Heaters"}
+
+    clock.now += 6
+    planner.async_process_update({HEATER: {"temp": "90"}})
+    assert planner.pending_kinds == set()
+
+
+def test_stale_poll_neither_confirms_nor_times_out(planner, timers, clock, coordinator):
+    """Telemetry kept through a timeout is not checked against pending commands."""
+    planner.async_request_refresh(RELAY, lambda item: item["relayState"] == "1")
+    planner._cancel()
+    clock.now += 6
+    planner.async_process_update({RELAY: {"relayState": "1"}}, stale=True)
+    clock.now += CONFIRM_TIMEOUT
+    planner.async_process_update({RELAY: {"relayState": "0"}}, stale=True)
+
+    assert planner.pending_count == 1
+    assert len(active(timers)) == 1
+    coordinator.command_latency.async_record.assert_not_called()
+    coordinator.command_latency.async_record_timeout.assert_not_called()
+    assert planner.learned_latency == {}
+
+
+def test_commands_on_one_item_are_confirmed_separately(planner, clock, coordinator):
+    """Different commands on one item each wait for their own confirmation."""
+    planner.async_request_refresh(
+        RELAY, lambda item: item["lightState"] == "1", method="set_relay_valve"
+    )
+    planner.async_request_refresh(
+        RELAY, lambda item: item["currentShow"] == "4", method="set_lightshow"
+    )
+    assert planner.pending_count == 2
+
+    clock.now += 6
+    planner.async_process_update({RELAY: {"lightState": "1", "currentShow": "0"}})
+    assert planner.pending_count == 1
+
+    clock.now += 6
+    planner.async_process_update({RELAY: {"lightState": "1", "currentShow": "4"}})
+    assert planner.pending_count == 0
+    assert coordinator.command_latency.async_record.call_count == 2
+
+
+def test_repeated_command_supersedes_the_earlier_one(planner, clock, coordinator):
+    """A later command of the same method on an item replaces the earlier one."""
+    planner.async_request_refresh(
+        RELAY, lambda item: item["relayState"] == "1", method="set_relay_valve"
+    )
+    planner.async_request_refresh(
+        RELAY, lambda item: item["relayState"] == "0", method="set_relay_valve"
+    )
+    assert planner.pending_count == 1
+
+    clock.now += 6
+    planner.async_process_update({RELAY: {"relayState": "0"}})
+    assert planner.pending_count == 0
+    coordinator.command_latency.async_record_timeout.assert_not_called()
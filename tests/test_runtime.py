@@ -0,0 +1,71 @@
+"""Tests for the runtime and energy accumulator."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.omnilogic import runtime
+from custom_components.omnilogic.runtime import RuntimeAccumulator
+
+PUMP = ("Backyard", "1", "BOWS", "2", "Pumps", "3")
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class NullStore:
+    """A Store that keeps nothing."""
+
+    def __init__(self, hass, version, key) -> None:
+        """Initialize the store."""
+
+    async def async_load(self):
+        """Return nothing stored."""
+
+    def async_delay_save(self, data_func, delay) -> None:
+        """Save nothing."""
+
+
+@pytest.fixture
+def accumulator(monkeypatch):
+    """Return an accumulator without storage."""
+    monkeypatch.setattr(runtime, "Store", NullStore)
+    return RuntimeAccumulator(None, "entry")
+
+
+def poll(accumulator, seconds, state="1", speed="100"):
+    """Update the accumulator with a pump state some seconds after START."""
+    accumulator.async_update(
+        {PUMP: {"pumpState": state, "pumpSpeed": speed}},
+        1000,
+        START + timedelta(seconds=seconds),
+    )
+
+
+def test_running_time_and_energy_are_counted(accumulator):
+    """The state of a poll holds until the next one."""
+    poll(accumulator, 0)
+    poll(accumulator, 30)
+    poll(accumulator, 60, state="0")
+    poll(accumulator, 90, state="0")
+
+    totals = accumulator.totals[PUMP]
+    assert totals.runtime == 60
+    assert totals.energy == pytest.approx(1000 * 60 / 3_600_000)
+
+
+def test_time_without_fresh_telemetry_is_not_counted(accumulator):
+    """Stale polls and the gap they cover do not add runtime."""
+    poll(accumulator, 0)
+    accumulator.async_skip()
+    accumulator.async_skip()
+    poll(accumulator, 90)
+    poll(accumulator, 120)
+
+    assert accumulator.totals[PUMP].runtime == 30
+
+
+def test_long_gaps_are_not_counted(accumulator):
+    """A gap longer than MAX_GAP, such as a restart, is left out."""
+    poll(accumulator, 0)
+    poll(accumulator, runtime.MAX_GAP.total_seconds() + 1)
+
+    assert accumulator.totals[PUMP].runtime == 0
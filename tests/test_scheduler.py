@@ -0,0 +1,103 @@
+"""Tests for the request scheduler."""
+
+import asyncio
+
+from custom_components.omnilogic.scheduler import MAX_POLL_RESTARTS, RequestScheduler
+
+
+async def test_poll_waits_for_commands():
+    """A poll does not start while a command is in flight."""
+    scheduler = RequestScheduler()
+    release = asyncio.Event()
+    order = []
+
+    async def command():
+        order.append("command start")
+        await release.wait()
+        order.append("command end")
+
+    async def poll():
+        order.append("poll")
+        return "telemetry"
+
+    command_task = asyncio.create_task(scheduler.async_command(command))
+    await asyncio.sleep(0)
+    poll_task = asyncio.create_task(scheduler.async_poll(poll))
+    await asyncio.sleep(0)
+    assert order == ["command start"]
+
+    release.set()
+    await command_task
+    assert await poll_task == "telemetry"
+    assert order == ["command start", "command end", "poll"]
+
+
+async def test_command_preempts_running_poll():
+    """A command cancels a running poll, which starts over afterwards."""
+    scheduler = RequestScheduler()
+    started = []
+    slow = asyncio.Event()
+
+    async def poll():
+        started.append(len(started))
+        if len(started) == 1:
+            await slow.wait()
+        return len(started)
+
+    async def command():
+        return "sent"
+
+    poll_task = asyncio.create_task(scheduler.async_poll(poll))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert await scheduler.async_command(command) == "sent"
+    assert await poll_task == 2
+    assert scheduler.preempted_polls == 1
+    assert scheduler.commands_in_flight == 0
+
+
+async def test_poll_is_not_starved():
+    """After MAX_POLL_RESTARTS preemptions a poll runs to completion."""
+    scheduler = RequestScheduler()
+    started = 0
+    running = asyncio.Event()
+    finish = asyncio.Event()
+
+    async def poll():
+        nonlocal started
+        started += 1
+        running.set()
+        await finish.wait()
+        return started
+
+    async def command():
+        return None
+
+    poll_task = asyncio.create_task(scheduler.async_poll(poll))
+    for _ in range(MAX_POLL_RESTARTS + 1):
+        await running.wait()
+        running.clear()
+        await scheduler.async_command(command)
+        await asyncio.sleep(0)
+
+    finish.set()
+    assert await poll_task == MAX_POLL_RESTARTS + 1
+    assert scheduler.preempted_polls == MAX_POLL_RESTARTS
+
+
+async def test_cancelling_the_caller_cancels_the_poll():
+    """Cancelling the task awaiting a poll is not mistaken for a preemption."""
+    scheduler = RequestScheduler()
+    never = asyncio.Event()
+
+    async def poll():
+        await never.wait()
+
+    poll_task = asyncio.create_task(scheduler.async_poll(poll))
+    await asyncio.sleep(0)
+    poll_task.cancel()
+    await asyncio.gather(poll_task, return_exceptions=True)
+
+    assert poll_task.cancelled()
+    assert scheduler.preempted_polls == 0
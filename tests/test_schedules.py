@@ -0,0 +1,96 @@
+"""Tests for the schedule index."""
+
+from datetime import datetime
+
+from custom_components.omnilogic.schedules import ScheduleIndex
+
+# A Monday.
+MONDAY = datetime(2024, 1, 1)
+MONDAY_BIT = 1
+SATURDAY_BIT = 1 << 5
+SUNDAY_BIT = 1 << 6
+
+
+def schedule(start, end, days=0, enabled="yes", equipment_id="10"):
+    """Return an MSP schedule entry running from start to end, as (hour, minute)."""
+    return {
+        "enabled": enabled,
+        "days-active": str(days),
+        "start-hour": str(start[0]),
+        "start-minute": str(start[1]),
+        "end-hour": str(end[0]),
+        "end-minute": str(end[1]),
+        "equipment-id": equipment_id,
+    }
+
+
+def index(*schedules):
+    """Return the index of one backyard's schedules."""
+    return ScheduleIndex.from_msp_config([{"Schedules": {"sche": list(schedules)}}])
+
+
+def test_next_transition_same_day():
+    """The next start or end later on the same day is returned."""
+    schedules = index(schedule((8, 0), (10, 30)))
+
+    assert schedules.next_transition(MONDAY.replace(hour=7)) == MONDAY.replace(hour=8)
+    assert schedules.next_transition(MONDAY.replace(hour=9)) == MONDAY.replace(
+        hour=10, minute=30
+    )
+
+
+def test_transition_at_the_current_minute_is_skipped():
+    """A transition in the current minute has already happened."""
+    schedules = index(schedule((8, 0), (10, 0)))
+
+    assert schedules.next_transition(
+        MONDAY.replace(hour=8, second=30)
+    ) == MONDAY.replace(hour=10)
+
+
+def test_next_transition_wraps_to_the_next_day():
+    """After the last transition of the day, the first one of tomorrow is due."""
+    schedules = index(schedule((8, 0), (10, 0)))
+
+    assert schedules.next_transition(MONDAY.replace(hour=11)) == datetime(
+        2024, 1, 2, 8
+    )
+
+
+def test_days_mask_skips_inactive_days():
+    """A schedule active on Saturdays only is next due on Saturday."""
+    schedules = index(schedule((8, 0), (10, 0), days=SATURDAY_BIT))
+
+    assert schedules.next_transition(MONDAY) == datetime(2024, 1, 6, 8)
+
+
+def test_overnight_schedule_ends_the_next_day():
+    """A schedule past midnight ends on the day after each active day."""
+    schedules = index(schedule((22, 0), (2, 0), days=SUNDAY_BIT))
+
+    assert len(schedules) == 2
+    # Sunday's run ends at 2:00 on Monday.
+    assert schedules.next_transition(MONDAY) == MONDAY.replace(hour=2)
+    assert schedules.next_transition(MONDAY.replace(hour=3)) == datetime(
+        2024, 1, 7, 22
+    )
+
+
+def test_disabled_and_unreadable_schedules_are_ignored():
+    """Disabled schedules and schedules missing times are left out."""
+    broken = schedule((8, 0), (9, 0))
+    del broken["end-hour"]
+
+    schedules = index(schedule((8, 0), (9, 0), enabled="no"), broken)
+
+    assert len(schedules) == 0
+    assert schedules.next_transition(MONDAY) is None
+
+
+def test_single_schedule_is_not_a_list():
+    """The parsed XML holds a lone schedule as a dict."""
+    schedules = ScheduleIndex.from_msp_config(
+        [{"Schedules": {"sche": schedule((8, 0), (9, 0), days=MONDAY_BIT)}}]
+    )
+
+    assert len(schedules) == 2
@@ -0,0 +1,87 @@
+"""Tests for setting up and unloading a config entry."""
+
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components import omnilogic
+from custom_components.omnilogic.common import OmniLogicUpdateCoordinator
+from custom_components.omnilogic.runtime import RuntimeAccumulator
+from soak import SyntheticOmniLogic, async_start_hass, build_template, config_entry
+
+
+class FailingConnect(SyntheticOmniLogic):
+    """A client whose login never reaches the cloud."""
+
+    async def connect(self) -> bool:
+        raise aiohttp.ClientConnectionError("unreachable")
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a running Home Assistant."""
+    hass = await async_start_hass(str(tmp_path))
+    yield hass
+    await hass.async_stop()
+
+
+@pytest.fixture
+def sessions():
+    """Record the HTTP sessions the entry creates."""
+    sessions = []
+
+    def create_session(*args, **kwargs):
+        session, stats = omnilogic.session.create_session(*args, **kwargs)
+        sessions.append(session)
+        return session, stats
+
+    with patch.object(omnilogic, "create_session", create_session):
+        yield sessions
+
+
+async def async_setup(hass, client=SyntheticOmniLogic):
+    """Add the entry with the given client and return it once set up."""
+    SyntheticOmniLogic.template = await build_template(1, 2)
+    entry = config_entry()
+    with patch.object(omnilogic, "OmniLogic", client):
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+    return entry
+
+
+async def test_unload_closes_the_session(hass, sessions):
+    """The session of a loaded entry is closed when it is unloaded."""
+    entry = await async_setup(hass)
+    assert entry.state is ConfigEntryState.LOADED
+    assert not sessions[0].closed
+
+    await hass.config_entries.async_unload(entry.entry_id)
+    assert sessions[0].closed
+
+
+async def test_transport_error_retries_and_closes_the_session(hass, sessions):
+    """A connection error while logging in is retried with a new session."""
+    entry = await async_setup(hass, FailingConnect)
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert sessions[0].closed
+
+
+@pytest.mark.parametrize(
+    "target",
+    [
+        (RuntimeAccumulator, "async_load"),
+        (OmniLogicUpdateCoordinator, "async_config_entry_first_refresh"),
+    ],
+)
+async def test_unexpected_error_closes_the_session(hass, sessions, target):
+    """An unexpected error after logging in still closes the session."""
+    with patch.object(*target, side_effect=RuntimeError("boom")):
+        entry = await async_setup(hass)
+
+    assert entry.state is ConfigEntryState.SETUP_ERROR
+    assert sessions[0].closed
+    assert entry.entry_id not in hass.data.get(omnilogic.DOMAIN, {})
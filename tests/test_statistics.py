@@ -0,0 +1,104 @@
+"""Tests for the hourly statistics aggregator."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.omnilogic import statistics
+from custom_components.omnilogic.statistics import StatisticsAggregator
+
+HOUR_START = datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+STATISTIC_ID = "omnilogic:water_temperature"
+
+
+class MemoryStore:
+    """A Store keeping its data in memory, shared by every instance of a key."""
+
+    saved: dict[str, dict] = {}
+
+    def __init__(self, hass, version, key) -> None:
+        """Initialize the store."""
+        self.key = key
+
+    async def async_load(self):
+        """Return the saved data."""
+        return self.saved.get(self.key)
+
+    async def async_save(self, data) -> None:
+        """Save data."""
+        self.saved[self.key] = data
+
+    def async_delay_save(self, data_func, delay) -> None:
+        """Save data right away."""
+        self.saved[self.key] = data_func()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the store and the aggregator's clock."""
+    monkeypatch.setattr(statistics, "Store", MemoryStore)
+    monkeypatch.setattr(MemoryStore, "saved", {})
+    clock = SimpleNamespace(now=HOUR_START)
+    monkeypatch.setattr(statistics.dt_util, "utcnow", lambda: clock.now)
+    return clock
+
+
+def aggregator() -> StatisticsAggregator:
+    """Return an aggregator of a Home Assistant without the recorder."""
+    hass = SimpleNamespace(config=SimpleNamespace(components=set()))
+    return StatisticsAggregator(hass, "entry")
+
+
+def add(stats: StatisticsAggregator, value: float, clock) -> None:
+    """Add a water temperature reading at the current time."""
+    stats.async_add(STATISTIC_ID, "Water temperature", "°F", value, clock.now)
+
+
+async def test_open_hour_is_not_imported(clock):
+    """Only finished hours are moved to the import queue."""
+    stats = aggregator()
+    add(stats, 80, clock)
+    clock.now += timedelta(minutes=30)
+    stats.async_flush()
+
+    assert stats.series[STATISTIC_ID].pending == []
+
+
+async def test_reload_resumes_the_open_hour(clock):
+    """An hour spanning a reload is imported once with the readings of both halves."""
+    stats = aggregator()
+    add(stats, 80, clock)
+    clock.now += timedelta(minutes=30)
+    stats.async_flush()
+    await stats.async_save()
+
+    reloaded = aggregator()
+    await reloaded.async_load()
+    add(reloaded, 90, clock)
+    clock.now += timedelta(minutes=30)
+    add(reloaded, 90, clock)
+    reloaded.async_flush()
+
+    [hour] = reloaded.series[STATISTIC_ID].pending
+    assert hour["start"] == HOUR_START
+    assert hour["mean"] == 85
+    assert (hour["min"], hour["max"]) == (80, 90)
+
+
+async def test_time_before_a_restart_is_a_gap(clock):
+    """The last reading before a restart does not count for the time it was down."""
+    stats = aggregator()
+    add(stats, 80, clock)
+    clock.now += timedelta(minutes=10)
+    stats.async_flush()
+
+    reloaded = aggregator()
+    await reloaded.async_load()
+    clock.now += timedelta(minutes=40)
+    add(reloaded, 90, clock)
+    clock.now += timedelta(minutes=10)
+    reloaded.async_flush()
+
+    [hour] = reloaded.series[STATISTIC_ID].pending
+    assert hour["mean"] == 85
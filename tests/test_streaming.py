@@ -0,0 +1,164 @@
+"""Tests for the streaming telemetry client."""
+
+import copy
+from datetime import datetime, timedelta
+
+import aiohttp
+from omnilogic import OmniLogicException
+import pytest
+
+from custom_components.omnilogic.streaming import StreamingTelemetryClient
+from custom_components.omnilogic.telemetry import TelemetryFlattener
+from benchmark_telemetry import MSP_SYSTEM_ID, build_payload
+
+
+class FakeResponse:
+    """A telemetry response read in chunks."""
+
+    status = 200
+
+    def __init__(self, payload: bytes) -> None:
+        """Initialize the response."""
+        self.content = self
+        self._payload = payload
+
+    async def iter_chunked(self, size):
+        """Yield the payload in chunks."""
+        for start in range(0, len(self._payload), size):
+            yield self._payload[start : start + size]
+
+    async def __aenter__(self):
+        """Return the response."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Release nothing."""
+
+
+class FakeSession:
+    """A session that answers every telemetry request with the same payload."""
+
+    def __init__(self, payload: bytes) -> None:
+        """Initialize the session."""
+        self.payload = payload
+        self.requests = 0
+
+    def post(self, url, data, headers):
+        """Return the telemetry response."""
+        self.requests += 1
+        return FakeResponse(self.payload)
+
+
+class FakeApi:
+    """The parts of the omnilogic library the streaming client uses."""
+
+    def __init__(self, config_item: dict) -> None:
+        """Initialize the library stand-in."""
+        self.token = "token"
+        self.token_expiry = datetime.now() + timedelta(hours=1)
+        self.systems = [{"MspSystemID": MSP_SYSTEM_ID}]
+        self.config_item = config_item
+        self.config_reads = 0
+        self.alarms = [{"BowID": "False"}]
+
+    async def get_msp_config_file(self):
+        """Return a freshly parsed copy of the MSP configuration."""
+        self.config_reads += 1
+        return [copy.deepcopy(self.config_item)]
+
+    async def call_api(self, method, params):
+        """Answer the alarm list request."""
+        return ""
+
+    def alarms_to_json(self, response):
+        """Return the alarm list, by default the library's marker for no alarms."""
+        return self.alarms
+
+    def buildRequest(self, method, params):
+        """Return the request body."""
+        return method
+
+
+@pytest.fixture
+def site():
+    """Return a one-BOW site, its client and the heater's item ID."""
+    payload, config_item = build_payload(1, 1)
+    api = FakeApi(config_item)
+    session = FakeSession(payload)
+    heater_config = config_item["Backyard"]["BOWS"][0]["Heaters"][0]
+    heater_id = (
+        "Backyard",
+        "0",
+        "BOWS",
+        config_item["Backyard"]["BOWS"][0]["System-Id"],
+        "Heaters",
+        heater_config["Operation"]["Heater-Equipment"]["System-Id"],
+    )
+    return StreamingTelemetryClient(api, session), api, session, heater_config, heater_id
+
+
+async def fetch(client) -> dict:
+    """Return the flattened telemetry of one streaming poll."""
+    flattener = TelemetryFlattener()
+    await client.async_fetch(flattener)
+    return flattener.items
+
+
+def set_point(data, heater_id) -> str:
+    """Return the heater set-point of a poll."""
+    return data[heater_id]["Operation"]["VirtualHeater"]["Current-Set-Point"]
+
+
+async def test_telemetry_is_streamed_on_the_given_session(site):
+    """Telemetry is posted on the session passed to the client."""
+    client, api, session, _, heater_id = site
+
+    data = await fetch(client)
+
+    assert session.requests == 1
+    assert set_point(data, heater_id) == "84"
+
+
+async def test_configuration_is_cached(site):
+    """The MSP configuration is read once for consecutive polls."""
+    client, api, _, heater_config, heater_id = site
+    await fetch(client)
+    heater_config["Current-Set-Point"] = "90"
+
+    data = await fetch(client)
+
+    assert api.config_reads == 1
+    assert set_point(data, heater_id) == "84"
+
+
+async def test_set_point_change_shows_on_next_poll_after_invalidation(site):
+    """A set-point change shows up on the first poll after invalidating the config."""
+    client, api, _, heater_config, heater_id = site
+    await fetch(client)
+    heater_config["Current-Set-Point"] = "90"
+
+    client.invalidate_config()
+    data = await fetch(client)
+
+    assert api.config_reads == 2
+    assert set_point(data, heater_id) == "90"
+
+
+async def test_empty_alarm_list(site):
+    """An alarm list without any entry is read as no alarms."""
+    client, api, *_ = site
+    api.alarms = []
+
+    assert await fetch(client)
+
+
+async def test_transport_error_fails_the_poll(site):
+    """A connection error is raised as an OmniLogic error, like the library does."""
+    client, _, session, *_ = site
+
+    def post(url, data, headers):
+        raise aiohttp.ClientConnectionError("reset")
+
+    session.post = post
+    with pytest.raises(OmniLogicException):
+        await fetch(client)
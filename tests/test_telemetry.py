@@ -0,0 +1,96 @@
+"""Tests for the telemetry flattener."""
+
+from custom_components.omnilogic.telemetry import flatten_telemetry
+
+BACKYARD = ("Backyard", "1")
+POOL = BACKYARD + ("BOWS", "2")
+SPA = BACKYARD + ("BOWS", "3")
+
+
+def heater(status):
+    """Return a heater shared between the BOWs."""
+    return {
+        "systemId": "20",
+        "Name": "Heater",
+        "Shared-Type": "BOW_SHARED_EQUIPMENT",
+        "status": status,
+    }
+
+
+def tree(pool_heater=None, spa_heater=None):
+    """Return nested telemetry of a backyard with a pool and a spa."""
+    pool = {
+        "systemId": "2",
+        "Name": "Pool",
+        "Relays": [
+            {"systemId": "10", "Name": "Lights relay", "Type": "RLY_HIGH_VOLTAGE_RELAY"},
+            {"systemId": "11", "Name": "Valve", "Type": "RLY_VALVE_ACTUATOR"},
+        ],
+    }
+    spa = {"systemId": "3", "Name": "Spa", "Pumps": [{"systemId": "30"}]}
+    if pool_heater:
+        pool["Heaters"] = [pool_heater]
+    if spa_heater:
+        spa["Heaters"] = [spa_heater]
+    return [
+        {"systemId": "1", "BackyardName": "Home", "BOWS": [pool, spa]},
+    ]
+
+
+def test_tree_is_flattened_by_path():
+    """Every item is keyed by the kind and system ID of itself and its parents."""
+    data = flatten_telemetry(tree())
+
+    assert set(data) == {
+        BACKYARD,
+        POOL,
+        SPA,
+        POOL + ("Relays", "10"),
+        POOL + ("Relays", "11"),
+        SPA + ("Pumps", "30"),
+    }
+
+
+def test_shared_equipment_is_stored_once():
+    """Shared equipment is kept under the first BOW and linked to both."""
+    links = {}
+    data = flatten_telemetry(
+        tree(pool_heater=heater("0"), spa_heater=heater("0")), shared_links=links
+    )
+
+    assert POOL + ("Heaters", "20") in data
+    assert SPA + ("Heaters", "20") not in data
+    assert links == {POOL + ("Heaters", "20"): [POOL, SPA]}
+
+
+def test_shared_equipment_keeps_the_active_copy():
+    """The telemetry of the BOW where shared equipment runs wins."""
+    active = heater("1")
+    data = flatten_telemetry(tree(pool_heater=heater("0"), spa_heater=active))
+
+    assert data[POOL + ("Heaters", "20")] is active
+
+
+def test_excluded_bow_is_skipped_with_its_equipment():
+    """Nothing below an excluded BOW is flattened."""
+    data = flatten_telemetry(tree(), excluded_bows={"3"})
+
+    assert SPA not in data
+    assert SPA + ("Pumps", "30") not in data
+    assert POOL in data
+
+
+def test_excluded_kind_is_skipped():
+    """Items of an excluded kind are left out."""
+    data = flatten_telemetry(tree(), excluded_kinds={"Pumps"})
+
+    assert SPA in data
+    assert SPA + ("Pumps", "30") not in data
+
+
+def test_excluded_valve_actuators_keep_other_relays():
+    """Excluding valve actuators only drops relays of the valve actuator type."""
+    data = flatten_telemetry(tree(), excluded_kinds={"ValveActuators"})
+
+    assert POOL + ("Relays", "10") in data
+    assert POOL + ("Relays", "11") not in data